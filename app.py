@@ -8,6 +8,7 @@ from backend.routes.user_routes import user_bp
 from backend.routes.admin_routes import admin_bp
 from backend.routes.device_routes import device_bp
 from backend.utils.config import Config
+from backend.services.prompt_catalog import prompt_catalog
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +17,19 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def check_prompt_catalog():
+    """
+    Log prompts missing from the catalog. Workers never render them: the
+    catalog is built once per deploy (PROCFILE), not by every worker at boot.
+    """
+    missing = prompt_catalog.missing()
+    if missing:
+        logger.warning(
+            f"Prompt catalog is missing {len(missing)} clips "
+            f"({', '.join(f'{prompt_type}/{language}' for prompt_type, language in missing[:10])}"
+            f"{', ...' if len(missing) > 10 else ''}); run executables/build_prompt_catalog.py"
+        )
+
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
@@ -32,6 +46,10 @@ def create_app():
     # Create temp audio directory if it doesn't exist
     os.makedirs(app.config['AUDIO_UPLOAD_FOLDER'], exist_ok=True)
     
+    # Load the static prompt manifest so prompts are served without disk probes
+    prompt_catalog.load()
+    check_prompt_catalog()
+    
     # Register blueprints
     app.register_blueprint(voice_bp, url_prefix='/api/voice')
     app.register_blueprint(user_bp, url_prefix='/api/user')
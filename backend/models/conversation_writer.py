@@ -0,0 +1,179 @@
+import logging
+import queue
+import threading
+import time
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error: the document was already written by an earlier attempt
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ConversationWriteBuffer:
+    """
+    Write-behind queue for conversation turns.
+
+    Documents are buffered in memory and written by a background thread with
+    unordered insert_many batches, so requests don't wait on the database.
+    Documents must carry their own _id so retries are idempotent: a batch
+    that partially succeeded before a network error is simply re-sent and
+    the duplicate key errors for the already written part are ignored.
+    """
+
+    def __init__(self, collection, max_pending=10000, batch_size=100, flush_interval=0.2,
+                 max_retries=5, retry_backoff=0.5):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # Held while submitting and while closing, so nothing is queued after close
+        self._submit_lock = threading.Lock()
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def submit(self, document):
+        """
+        Queue a document for writing
+
+        Returns:
+            bool: False if the buffer is full or closed and the caller
+                  should write synchronously instead
+        """
+        with self._submit_lock:
+            if self._stopping:
+                return False
+
+            self._ensure_worker()
+            try:
+                self.queue.put_nowait(document)
+            except queue.Full:
+                self.rejected += 1
+                logger.warning("Conversation write buffer full, falling back to synchronous write")
+                return False
+
+            self.submitted += 1
+            return True
+
+    def _ensure_worker(self):
+        # Started lazily so the thread is created in the serving process,
+        # not in a parent that forks workers afterwards
+        if self._thread and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='conversation-writer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            if self._stopping and self.queue.empty():
+                # Nothing is queued once _stopping is set, so the queue stays empty
+                return
+            batch = self._collect_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _collect_batch(self):
+        """Wait for a document, then gather more until the batch is full or the flush interval passes"""
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stopping:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        attempt = 0
+        pending = batch
+        while pending:
+            try:
+                self.collection.insert_many(pending, ordered=False)
+                self.written += len(pending)
+                pending = []
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors', [])
+                duplicates = sum(1 for err in write_errors if err.get('code') == DUPLICATE_KEY_ERROR)
+                rejected = len(write_errors) - duplicates
+                self.written += len(pending) - rejected
+                if rejected:
+                    self.failed += rejected
+                    logger.error(f"Dropped {rejected} conversation documents rejected by MongoDB: {write_errors[0].get('errmsg')}")
+                pending = []
+            except PyMongoError as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.failed += len(pending)
+                    logger.error(f"Failed to write {len(pending)} conversations after {self.max_retries} retries: {e}")
+                    pending = []
+                else:
+                    self.retries += 1
+                    delay = self.retry_backoff * (2 ** (attempt - 1))
+                    logger.warning(f"Conversation batch write failed ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+
+        for _ in batch:
+            self.queue.task_done()
+
+    def flush(self, timeout=10):
+        """
+        Wait until all queued documents have been written
+
+        Returns:
+            bool: True if the buffer drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Stop accepting documents and write out everything still buffered"""
+        with self._submit_lock:
+            if self._stopping:
+                return
+            self._stopping = True
+        if not self.queue.empty():
+            self._ensure_worker()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        if not self.queue.empty():
+            logger.error(f"Conversation writer stopped with {self.queue.qsize()} unwritten documents")
+
+    def stats(self):
+        """Return write buffer statistics"""
+        return {
+            'pending': self.queue.qsize(),
+            'submitted': self.submitted,
+            'written': self.written,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rejected': self.rejected
+        }
@@ -1,7 +1,15 @@
-from pymongo import MongoClient
+import atexit
+from pymongo import MongoClient, ReturnDocument
+from bson import ObjectId
 from datetime import datetime
 import logging
 from backend.utils.config import Config
+from backend.models.session_context import SessionContextStore
+from backend.models.conversation_writer import ConversationWriteBuffer
+from backend.models.mongo_pool import PoolMetricsListener, build_client_options, get_read_preference
+from backend.models.records import (
+    DeviceRecord, DeviceCredentials, UserRecord, ConversationTurn, USER_LIST_PROJECTION
+)
 
 logger = logging.getLogger(__name__)
 
@@ -10,11 +18,43 @@ class DatabaseManager:
     
     def __init__(self):
         try:
-            self.client = MongoClient(Config.MONGODB_URL)
+            self.pool_metrics = PoolMetricsListener()
+            self.client = MongoClient(
+                Config.MONGODB_URL,
+                **build_client_options(event_listeners=[self.pool_metrics])
+            )
             self.db = self.client[Config.DB_NAME]
             self.users = self.db.users
             self.conversations = self.db.conversations
+            
+            # Analytics reads go to secondaries so they don't compete with live turn writes
+            self.analytics_db = self.client.get_database(
+                Config.DB_NAME,
+                read_preference=get_read_preference(Config.MONGO_ANALYTICS_READ_PREFERENCE)
+            )
+            self.analytics_users = self.analytics_db.users
+            self.analytics_conversations = self.analytics_db.conversations
+            self.conversation_summaries = self.db.conversation_summaries
             self.devices = self.db.devices
+            self.counters = self.db.counters
+            self.noise_profiles = self.db.noise_profiles
+            self._device_indexes_ready = False
+            self._conversation_indexes_ready = False
+            self._noise_profile_indexes_ready = False
+            
+            # Recent turns per session, kept in process to skip history reads
+            self.session_context = SessionContextStore()
+            
+            # Write-behind queue for conversation turns ('async' write mode)
+            self.conversation_writer = None
+            if Config.CONVERSATION_WRITE_MODE == 'async':
+                self.conversation_writer = ConversationWriteBuffer(
+                    self.conversations,
+                    max_pending=Config.CONVERSATION_WRITE_BUFFER_SIZE,
+                    batch_size=Config.CONVERSATION_WRITE_BATCH_SIZE,
+                    flush_interval=Config.CONVERSATION_WRITE_FLUSH_INTERVAL,
+                    max_retries=Config.CONVERSATION_WRITE_MAX_RETRIES
+                )
             logger.info("Connected to MongoDB successfully")
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
@@ -61,18 +101,29 @@ class DatabaseManager:
             logger.error(f"Failed to create user: {e}")
             raise
     
-    def get_user(self, phone):
-        """Get user by phone number"""
+    def get_user(self, phone, projection=None):
+        """Get user by phone number (optionally only the projected fields)"""
         try:
+            if projection:
+                return self.users.find_one({'phone': phone}, projection)
             return self.users.find_one({'phone': phone})
         except Exception as e:
             logger.error(f"Failed to get user: {e}")
             return None
     
+    def get_user_record(self, phone):
+        """Get user profile by phone number as a UserRecord"""
+        return UserRecord.from_document(self.get_user(phone, UserRecord.projection()))
+    
     def create_conversation(self, user_id, user_input, bot_response, device_id=None, session_id=None):
-        """Save conversation turn to database"""
+        """
+        Save conversation turn to database
+        In 'async' write mode the turn is queued for a background batch write
+        and this returns without waiting on MongoDB.
+        """
         try:
             conversation_data = {
+                '_id': ObjectId(),
                 'user_id': user_id,
                 'device_id': device_id,
                 'session_id': session_id,
@@ -80,32 +131,163 @@ class DatabaseManager:
                 'bot_response': bot_response,
                 'timestamp': datetime.utcnow()
             }
-            result = self.conversations.insert_one(conversation_data)
-            return result.inserted_id
+            
+            queued = self.conversation_writer is not None and self.conversation_writer.submit(conversation_data)
+            if not queued:
+                self.conversations.insert_one(conversation_data)
+            
+            # Write-through: keep the in-process session context current
+            if session_id:
+                self.session_context.append(
+                    user_id, session_id, ConversationTurn.from_document(conversation_data)
+                )
+            
+            return conversation_data['_id']
         except Exception as e:
             logger.error(f"Failed to save conversation: {e}")
             raise
     
     def get_conversation_history(self, user_id, session_id=None, limit=50):
-        """Get conversation history for a user"""
+        """Get conversation history for a user as ConversationTurn records, newest first"""
         try:
+            if session_id:
+                self.ensure_conversation_indexes()
+                cached = self.session_context.get_history(user_id, session_id, limit)
+                if cached is not None and self._session_context_current(user_id, session_id):
+                    return cached
+            
             query = {'user_id': user_id}
+            fetch_limit = limit
             if session_id:
                 query['session_id'] = session_id
+                # Read enough to seed the session context
+                fetch_limit = max(limit, self.session_context.max_turns)
             
-            conversations = self.conversations.find(query).sort('timestamp', -1).limit(limit)
-            return list(conversations)
+            cursor = self.conversations.find(query, ConversationTurn.projection())
+            conversations = [
+                ConversationTurn.from_document(doc)
+                for doc in cursor.sort('timestamp', -1).limit(fetch_limit)
+            ]
+            
+            if session_id:
+                self.session_context.seed(
+                    user_id, session_id, conversations,
+                    complete=len(conversations) < fetch_limit
+                )
+            
+            return conversations[:limit]
         except Exception as e:
             logger.error(f"Failed to get conversation history: {e}")
             return []
     
+    def _session_context_current(self, user_id, session_id):
+        """
+        Whether the cached turns of a session include its newest stored turn
+        (one indexed _id lookup); turns written through other workers make
+        the cache stale
+        """
+        if not Config.SESSION_CONTEXT_VALIDATE:
+            return True
+        latest = self.conversations.find_one(
+            {'user_id': user_id, 'session_id': session_id},
+            {'_id': 1},
+            sort=[('timestamp', -1)]
+        )
+        return self.session_context.is_current(user_id, session_id, latest['_id'] if latest else None)
+    
+    def ensure_conversation_indexes(self):
+        """Create the index session history reads use (idempotent, once per process)"""
+        if self._conversation_indexes_ready:
+            return
+        
+        self.conversations.create_index([('user_id', 1), ('session_id', 1), ('timestamp', -1)])
+        self._conversation_indexes_ready = True
+    
+    def ensure_noise_profile_indexes(self):
+        """Expire stored noise profiles NOISE_PROFILE_RETENTION after their last update (once per process)"""
+        if self._noise_profile_indexes_ready:
+            return
+        
+        try:
+            self.noise_profiles.create_index('updated_at', expireAfterSeconds=Config.NOISE_PROFILE_RETENTION)
+        except Exception as e:
+            # An index with another retention is still usable
+            logger.error(f"Failed to create noise profile index: {e}")
+        self._noise_profile_indexes_ready = True
+    
+    def get_noise_profile(self, kind, key):
+        """
+        Get the stored noise floor of a session or device
+        
+        Returns:
+            float: Level in dBFS, or None if none is stored
+        """
+        try:
+            profile = self.noise_profiles.find_one({'_id': f'{kind}:{key}'}, {'level_dbfs': 1, '_id': 0})
+            return profile['level_dbfs'] if profile else None
+        except Exception as e:
+            logger.error(f"Failed to get noise profile: {e}")
+            return None
+    
+    def save_noise_profile(self, kind, key, level_dbfs, replace=True):
+        """
+        Store the noise floor of a session or device
+        
+        Args:
+            level_dbfs: Level in dBFS
+            replace: Overwrite an existing profile (False keeps the first one stored)
+        """
+        try:
+            self.ensure_noise_profile_indexes()
+            fields = {'level_dbfs': level_dbfs, 'updated_at': datetime.utcnow()}
+            self.noise_profiles.update_one(
+                {'_id': f'{kind}:{key}'},
+                {'$set' if replace else '$setOnInsert': fields},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save noise profile: {e}")
+            return False
+    
+    def get_conversation_summary(self, user_id, session_id):
+        """Get the running summary document for a conversation session"""
+        try:
+            return self.conversation_summaries.find_one(
+                {'user_id': user_id, 'session_id': session_id},
+                {'summary': 1, 'covered_until': 1, 'turn_count': 1, '_id': 0}
+            )
+        except Exception as e:
+            logger.error(f"Failed to get conversation summary: {e}")
+            return None
+    
+    def save_conversation_summary(self, user_id, session_id, summary, covered_until, turns_added):
+        """Create or update the running summary for a conversation session"""
+        try:
+            self.conversation_summaries.update_one(
+                {'user_id': user_id, 'session_id': session_id},
+                {
+                    '$set': {
+                        'summary': summary,
+                        'covered_until': covered_until,
+                        'updated_at': datetime.utcnow()
+                    },
+                    '$inc': {'turn_count': turns_added}
+                },
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save conversation summary: {e}")
+            return False
+    
     def get_user_statistics(self):
         """Get user statistics for admin dashboard"""
         try:
-            total_users = self.users.count_documents({})
+            total_users = self.analytics_users.count_documents({})
             
             # Users by language
-            language_stats = list(self.users.aggregate([
+            language_stats = list(self.analytics_users.aggregate([
                 {"$group": {"_id": "$language", "count": {"$sum": 1}}},
                 {"$sort": {"count": -1}}
             ]))
@@ -113,13 +295,13 @@ class DatabaseManager:
             # Recent users (last 7 days)
             from datetime import datetime, timedelta
             seven_days_ago = datetime.utcnow() - timedelta(days=7)
-            recent_users = self.users.count_documents({
+            recent_users = self.analytics_users.count_documents({
                 "created_at": {"$gte": seven_days_ago}
             })
             
             # Users by date (last 30 days)
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            daily_users = list(self.users.aggregate([
+            daily_users = list(self.analytics_users.aggregate([
                 {"$match": {"created_at": {"$gte": thirty_days_ago}}},
                 {"$group": {
                     "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
@@ -141,12 +323,12 @@ class DatabaseManager:
     def get_conversation_statistics(self):
         """Get conversation statistics for admin dashboard"""
         try:
-            total_conversations = self.conversations.count_documents({})
+            total_conversations = self.analytics_conversations.count_documents({})
             
             # Conversations by date (last 30 days)
             from datetime import datetime, timedelta
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            daily_conversations = list(self.conversations.aggregate([
+            daily_conversations = list(self.analytics_conversations.aggregate([
                 {"$match": {"timestamp": {"$gte": thirty_days_ago}}},
                 {"$group": {
                     "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
@@ -156,7 +338,7 @@ class DatabaseManager:
             ]))
             
             # Average conversations per user
-            avg_conversations = list(self.conversations.aggregate([
+            avg_conversations = list(self.analytics_conversations.aggregate([
                 {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
                 {"$group": {"_id": None, "avg": {"$avg": "$count"}}}
             ]))
@@ -164,7 +346,7 @@ class DatabaseManager:
             avg_conv_per_user = avg_conversations[0]['avg'] if avg_conversations else 0
             
             # Most active users
-            active_users = list(self.conversations.aggregate([
+            active_users = list(self.analytics_conversations.aggregate([
                 {"$group": {"_id": "$user_id", "conversation_count": {"$sum": 1}}},
                 {"$lookup": {
                     "from": "users",
@@ -186,11 +368,11 @@ class DatabaseManager:
             logger.error(f"Failed to get conversation statistics: {e}")
             return None
     
-    def get_all_users(self, page=1, limit=20):
+    def get_all_users(self, page=1, limit=20, projection=USER_LIST_PROJECTION):
         """Get paginated user list for admin"""
         try:
             skip = (page - 1) * limit
-            users = list(self.users.find({}).sort('created_at', -1).skip(skip).limit(limit))
+            users = list(self.users.find({}, projection).sort('created_at', -1).skip(skip).limit(limit))
             total = self.users.count_documents({})
             
             return {
@@ -203,14 +385,14 @@ class DatabaseManager:
             logger.error(f"Failed to get users: {e}")
             return None
     
-    def get_user_conversations(self, user_id, page=1, limit=10):
+    def get_user_conversations(self, user_id, page=1, limit=10, projection=None):
         """Get conversations for a specific user"""
         try:
             skip = (page - 1) * limit
             # user_id is stored as string in the database, not ObjectId
             conversations = list(self.conversations.find({
                 'user_id': user_id
-            }).sort('timestamp', -1).skip(skip).limit(limit))
+            }, projection).sort('timestamp', -1).skip(skip).limit(limit))
             
             total = self.conversations.count_documents({'user_id': user_id})
             
@@ -224,7 +406,7 @@ class DatabaseManager:
             logger.error(f"Failed to get user conversations: {e}")
             return None
     
-    def search_users(self, query):
+    def search_users(self, query, projection=USER_LIST_PROJECTION):
         """Search users by name or phone"""
         try:
             search_filter = {
@@ -233,7 +415,7 @@ class DatabaseManager:
                     {"phone": {"$regex": query, "$options": "i"}}
                 ]
             }
-            users = list(self.users.find(search_filter).sort('created_at', -1).limit(50))
+            users = list(self.users.find(search_filter, projection).sort('created_at', -1).limit(50))
             return users
         except Exception as e:
             logger.error(f"Failed to search users: {e}")
@@ -241,16 +423,57 @@ class DatabaseManager:
     
     # ===== Device Management Methods =====
     
-    def get_next_device_id(self):
-        """Get the next available device ID (auto-increment starting from 1201)"""
+    def ensure_device_indexes(self):
+        """
+        Create the unique device_id index and seed the device ID counter
+        so it continues after existing devices (idempotent, once per process)
+        """
+        if self._device_indexes_ready:
+            return
+        
+        self.devices.create_index('device_id', unique=True)
+        self.devices.create_index('tokens_updated_at')
+        self.devices.create_index('config_updated_at')
+        
+        last_device = self.devices.find_one({}, {'device_id': 1, '_id': 0}, sort=[('device_id', -1)])
+        floor = last_device['device_id'] if last_device and 'device_id' in last_device else Config.DEVICE_ID_START - 1
+        self.counters.update_one(
+            {'_id': 'device_id'},
+            {'$max': {'seq': floor}},
+            upsert=True
+        )
+        self._device_indexes_ready = True
+    
+    def allocate_device_ids(self, count=1):
+        """
+        Atomically reserve `count` consecutive device IDs
+        IDs of devices that fail to insert are not reused.
+        
+        Returns:
+            list: Reserved device IDs in ascending order
+        """
         try:
-            # Find the highest device_id
-            last_device = self.devices.find_one(
-                sort=[('device_id', -1)]
+            self.ensure_device_indexes()
+            counter = self.counters.find_one_and_update(
+                {'_id': 'device_id'},
+                {'$inc': {'seq': count}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
             )
+            last_id = counter['seq']
+            return list(range(last_id - count + 1, last_id + 1))
+        except Exception as e:
+            logger.error(f"Failed to allocate device IDs: {e}")
+            raise
+    
+    def get_next_device_id(self):
+        """Preview the next device ID (auto-increment starting from 1201); does not reserve it"""
+        try:
+            self.ensure_device_indexes()
+            counter = self.counters.find_one({'_id': 'device_id'})
             
-            if last_device and 'device_id' in last_device:
-                return last_device['device_id'] + 1
+            if counter and 'seq' in counter:
+                return counter['seq'] + 1
             else:
                 # No devices yet, start from configured start value
                 return Config.DEVICE_ID_START
@@ -258,20 +481,28 @@ class DatabaseManager:
             logger.error(f"Failed to get next device ID: {e}")
             return Config.DEVICE_ID_START
     
+    def _build_device_document(self, device_id, device_name, password_hash, access_token, refresh_token, pipeline_type, llm_service):
+        now = datetime.utcnow()
+        return {
+            'device_id': device_id,
+            'device_name': device_name,
+            'password_hash': password_hash,
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'token_generation': 0,  # Bumped on login/logout to revoke older JWTs
+            'tokens_updated_at': now,
+            'pipeline_type': pipeline_type,  # 'library' or 'api'
+            'llm_service': llm_service,  # 'gemini', 'openai', 'azure_openai', 'vertex'
+            'created_at': now,
+            'last_login': now
+        }
+    
     def create_device(self, device_id, device_name, password_hash, access_token, refresh_token, pipeline_type='library', llm_service='gemini'):
         """Create a new device record"""
         try:
-            device_data = {
-                'device_id': device_id,
-                'device_name': device_name,
-                'password_hash': password_hash,
-                'access_token': access_token,
-                'refresh_token': refresh_token,
-                'pipeline_type': pipeline_type,  # 'library' or 'api'
-                'llm_service': llm_service,  # 'gemini', 'openai', 'azure_openai', 'vertex'
-                'created_at': datetime.utcnow(),
-                'last_login': datetime.utcnow()
-            }
+            device_data = self._build_device_document(
+                device_id, device_name, password_hash, access_token, refresh_token, pipeline_type, llm_service
+            )
             
             result = self.devices.insert_one(device_data)
             return result.inserted_id
@@ -279,19 +510,55 @@ class DatabaseManager:
             logger.error(f"Failed to create device: {e}")
             raise
     
-    def get_device_by_id(self, device_id):
-        """Get device by device_id"""
+    def create_devices(self, devices):
+        """
+        Create many device records in one unordered bulk insert
+        
+        Args:
+            devices: List of dicts with the create_device arguments
+            
+        Returns:
+            int: Number of devices inserted
+        """
         try:
-            return self.devices.find_one({'device_id': device_id})
+            documents = [
+                self._build_device_document(
+                    device['device_id'], device['device_name'], device['password_hash'],
+                    device['access_token'], device['refresh_token'],
+                    device.get('pipeline_type', 'library'), device.get('llm_service', 'gemini')
+                )
+                for device in devices
+            ]
+            if not documents:
+                return 0
+            
+            result = self.devices.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except Exception as e:
+            logger.error(f"Failed to create devices: {e}")
+            raise
+    
+    def get_device_by_id(self, device_id, projection=None):
+        """Get device by device_id (optionally only the projected fields)"""
+        try:
+            return self.devices.find_one({'device_id': device_id}, projection)
         except Exception as e:
             logger.error(f"Failed to get device: {e}")
             return None
     
+    def get_device_record(self, device_id):
+        """Get device profile (no credentials or tokens) as a DeviceRecord"""
+        return DeviceRecord.from_document(self.get_device_by_id(device_id, DeviceRecord.projection()))
+    
+    def get_device_credentials(self, device_id):
+        """Get the fields needed to verify a device login as DeviceCredentials"""
+        return DeviceCredentials.from_document(self.get_device_by_id(device_id, DeviceCredentials.projection()))
+    
     def get_device_by_token(self, token, token_type='access'):
-        """Get device by access or refresh token"""
+        """Get device profile (no credentials or tokens) by access or refresh token as a DeviceRecord"""
         try:
             field = f'{token_type}_token'
-            return self.devices.find_one({field: token})
+            return DeviceRecord.from_document(self.devices.find_one({field: token}, DeviceRecord.projection()))
         except Exception as e:
             logger.error(f"Failed to get device by token: {e}")
             return None
@@ -314,6 +581,18 @@ class DatabaseManager:
             logger.error(f"Failed to update device tokens: {e}")
             return False
     
+    def update_device_password_hash(self, device_id, password_hash):
+        """Replace a device's password hash (e.g. after a cost factor change)"""
+        try:
+            result = self.devices.update_one(
+                {'device_id': device_id},
+                {'$set': {'password_hash': password_hash}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error(f"Failed to update device password hash: {e}")
+            return False
+    
     def invalidate_device_tokens(self, device_id):
         """Invalidate device tokens (called on logout)"""
         try:
@@ -322,8 +601,10 @@ class DatabaseManager:
                 {
                     '$set': {
                         'access_token': None,
-                        'refresh_token': None
-                    }
+                        'refresh_token': None,
+                        'tokens_updated_at': datetime.utcnow()
+                    },
+                    '$inc': {'token_generation': 1}
                 }
             )
             return result.modified_count > 0
@@ -331,24 +612,73 @@ class DatabaseManager:
             logger.error(f"Failed to invalidate device tokens: {e}")
             return False
     
+    def bump_token_generation(self, device_id):
+        """
+        Start a new token generation for a device, revoking JWTs issued
+        under earlier generations
+        
+        Returns:
+            int: The new generation, or None if the device doesn't exist
+        """
+        try:
+            device = self.devices.find_one_and_update(
+                {'device_id': device_id},
+                {
+                    '$inc': {'token_generation': 1},
+                    '$set': {'tokens_updated_at': datetime.utcnow()}
+                },
+                projection={'token_generation': 1, '_id': 0},
+                return_document=ReturnDocument.AFTER
+            )
+            return device['token_generation'] if device else None
+        except Exception as e:
+            logger.error(f"Failed to bump token generation: {e}")
+            raise
+    
+    def get_token_generation(self, device_id):
+        """Get the current token generation of a device (None if it doesn't exist)"""
+        try:
+            device = self.devices.find_one({'device_id': device_id}, {'token_generation': 1, '_id': 0})
+            if device is None:
+                return None
+            return device.get('token_generation', 0)
+        except Exception as e:
+            logger.error(f"Failed to get token generation: {e}")
+            return None
+    
+    def get_token_generations_since(self, since):
+        """
+        Get token generations of devices whose tokens changed after `since`
+        
+        Returns:
+            dict: device_id -> token generation
+        """
+        self.ensure_device_indexes()
+        cursor = self.devices.find(
+            {'tokens_updated_at': {'$gt': since}},
+            {'device_id': 1, 'token_generation': 1, '_id': 0}
+        )
+        return {doc['device_id']: doc.get('token_generation', 0) for doc in cursor}
+    
     def get_device_pipeline_config(self, device_id):
         """Get pipeline configuration for a device"""
         try:
             device = self.devices.find_one(
                 {'device_id': device_id},
-                {'pipeline_type': 1, 'llm_service': 1, '_id': 0}
+                {'pipeline_type': 1, 'llm_service': 1, 'audio_profile': 1, '_id': 0}
             )
             if device:
                 return {
                     'pipeline_type': device.get('pipeline_type', 'library'),
-                    'llm_service': device.get('llm_service', 'gemini')
+                    'llm_service': device.get('llm_service', 'gemini'),
+                    'audio_profile': device.get('audio_profile')
                 }
             return None
         except Exception as e:
             logger.error(f"Failed to get device pipeline config: {e}")
             return None
     
-    def update_device_pipeline_config(self, device_id, pipeline_type=None, llm_service=None):
+    def update_device_pipeline_config(self, device_id, pipeline_type=None, llm_service=None, audio_profile=None):
         """Update pipeline configuration for a device"""
         try:
             update_data = {}
@@ -356,10 +686,15 @@ class DatabaseManager:
                 update_data['pipeline_type'] = pipeline_type
             if llm_service is not None:
                 update_data['llm_service'] = llm_service
+            if audio_profile is not None:
+                update_data['audio_profile'] = audio_profile
             
             if not update_data:
                 return False
             
+            # Lets other workers notice the change and drop cached pipelines
+            update_data['config_updated_at'] = datetime.utcnow()
+            
             result = self.devices.update_one(
                 {'device_id': device_id},
                 {'$set': update_data}
@@ -369,10 +704,32 @@ class DatabaseManager:
             logger.error(f"Failed to update device pipeline config: {e}")
             return False
     
+    def get_devices_config_updated_since(self, since):
+        """Get IDs of devices whose pipeline configuration changed after `since`"""
+        self.ensure_device_indexes()
+        cursor = self.devices.find(
+            {'config_updated_at': {'$gt': since}},
+            {'device_id': 1, '_id': 0}
+        )
+        return [doc['device_id'] for doc in cursor]
+    
+    def get_pool_stats(self):
+        """Get connection pool and in-process buffer statistics"""
+        return {
+            'pool': self.pool_metrics.stats(Config.MONGO_MAX_POOL_SIZE),
+            'session_context': self.session_context.stats(),
+            'conversation_writer': self.conversation_writer.stats() if self.conversation_writer else None
+        }
+    
     def close_connection(self):
         """Close database connection"""
+        if self.conversation_writer:
+            self.conversation_writer.close()
         if self.client:
             self.client.close()
 
 # Global database instance
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
+
+# Write out buffered conversation turns before the process exits
+atexit.register(db_manager.close_connection)
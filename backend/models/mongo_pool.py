@@ -0,0 +1,141 @@
+import importlib.util
+import logging
+import threading
+from pymongo import ReadPreference, monitoring
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Python packages pymongo needs for each wire compressor
+COMPRESSOR_MODULES = {
+    'zstd': 'zstandard',
+    'snappy': 'snappy',
+    'zlib': 'zlib'
+}
+
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primarypreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondarypreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST
+}
+
+
+def available_compressors(requested):
+    """Filter a comma separated compressor list down to those installed"""
+    compressors = []
+    for name in (requested or '').split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        module = COMPRESSOR_MODULES.get(name)
+        if module and importlib.util.find_spec(module):
+            compressors.append(name)
+        else:
+            logger.info(f"MongoDB compressor '{name}' not available, skipping")
+    return compressors
+
+
+def get_read_preference(name):
+    """Map a read preference name from configuration to a pymongo read preference"""
+    return READ_PREFERENCES.get((name or '').lower(), ReadPreference.PRIMARY)
+
+
+def build_client_options(event_listeners=None):
+    """Build MongoClient keyword arguments from configuration"""
+    options = {
+        'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': Config.MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': Config.MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': Config.MONGO_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': Config.MONGO_SOCKET_TIMEOUT_MS
+    }
+    options = {key: value for key, value in options.items() if value is not None}
+
+    compressors = available_compressors(Config.MONGO_COMPRESSORS)
+    if compressors:
+        options['compressors'] = ','.join(compressors)
+
+    if event_listeners:
+        options['event_listeners'] = event_listeners
+    return options
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool utilization counters across all servers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_open = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning(f"MongoDB connection checkout failed ({event.reason}) for {event.address}")
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self, max_pool_size=None):
+        """Return pool utilization counters"""
+        with self._lock:
+            stats = {
+                'connections_open': self.connections_open,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears
+            }
+        if max_pool_size:
+            stats['max_pool_size'] = max_pool_size
+            stats['utilization'] = round(stats['checked_out'] / max_pool_size, 4)
+        return stats
@@ -0,0 +1,74 @@
+"""Lightweight read-only records for projected MongoDB documents"""
+
+
+class Record:
+    """
+    Base class for typed records built from projected documents.
+
+    Each subclass lists its attributes in __slots__; the MongoDB field for
+    an attribute has the same name, except `id` which maps to `_id`.
+    Attributes missing from the document are None.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @staticmethod
+    def _field_name(name):
+        return '_id' if name == 'id' else name
+
+    @classmethod
+    def projection(cls):
+        """MongoDB projection selecting exactly the fields of this record"""
+        projection = {cls._field_name(name): 1 for name in cls.__slots__}
+        projection.setdefault('_id', 0)
+        return projection
+
+    @classmethod
+    def from_document(cls, document):
+        """Build a record from a MongoDB document (None stays None)"""
+        if document is None:
+            return None
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, document.get(cls._field_name(name)))
+        return record
+
+    def to_dict(self):
+        """Return the record as a plain dictionary"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+
+class DeviceRecord(Record):
+    """Device profile without credentials or tokens"""
+
+    __slots__ = ('device_id', 'device_name', 'pipeline_type', 'llm_service', 'created_at', 'last_login')
+
+
+class DeviceCredentials(Record):
+    """Fields needed to verify a device login"""
+
+    __slots__ = ('device_id', 'device_name', 'password_hash')
+
+
+class UserRecord(Record):
+    """User profile"""
+
+    __slots__ = ('id', 'name', 'phone', 'language', 'device_id', 'created_at')
+
+
+class ConversationTurn(Record):
+    """One user input and bot response pair"""
+
+    __slots__ = ('id', 'session_id', 'user_input', 'bot_response', 'timestamp')
+
+
+# Fields shown in the admin user list
+USER_LIST_PROJECTION = {'name': 1, 'phone': 1, 'language': 1, 'device_id': 1, 'created_at': 1}
@@ -0,0 +1,148 @@
+import logging
+import threading
+from backend.utils.cache import LRUCache
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Rough per-turn overhead (record, datetime, ObjectId) on top of the text itself
+TURN_OVERHEAD_BYTES = 256
+
+
+class SessionContext:
+    """
+    Last turns of one conversation session, newest first. Never mutated
+    once stored: append replaces it, so readers iterate turns without a lock.
+    """
+
+    __slots__ = ('turns', 'complete')
+
+    def __init__(self, turns, max_turns, complete):
+        self.turns = tuple(turns[:max_turns])
+        # True when turns holds the whole session, not just its tail
+        self.complete = complete
+
+
+class SessionContextStore:
+    """
+    In-process, write-through store of recent conversation turns keyed by
+    (user_id, session_id).
+
+    Entries are seeded from MongoDB on the first read of a session and kept
+    current by create_conversation, so later turns in the same worker are
+    served without reading them back. Turns written through another worker
+    never reach this store; callers check a hit against the newest turn id
+    in the database (is_current) before using it. Idle sessions expire and
+    the store is bounded by session count and approximate memory use.
+    """
+
+    def __init__(self, enabled=None, max_turns=None, idle_ttl=None, max_sessions=None, max_bytes=None):
+        self.enabled = Config.SESSION_CONTEXT_CACHE_ENABLED if enabled is None else enabled
+        self.max_turns = max_turns or Config.SESSION_CONTEXT_MAX_TURNS
+        self.cache = LRUCache(
+            maxsize=max_sessions or Config.SESSION_CONTEXT_MAX_SESSIONS,
+            ttl=idle_ttl or Config.SESSION_CONTEXT_IDLE_TTL,
+            sliding=True,
+            max_weight=max_bytes or Config.SESSION_CONTEXT_MAX_BYTES,
+            weigher=self._context_size
+        )
+        # Serializes append's read-modify-write of a session
+        self.lock = threading.Lock()
+        self.stale = 0
+
+    @staticmethod
+    def _context_size(context):
+        """Approximate memory held by a session context"""
+        size = 0
+        for turn in context.turns:
+            size += len(turn.user_input or '') + len(turn.bot_response or '')
+            size += TURN_OVERHEAD_BYTES
+        return size
+
+    def get_history(self, user_id, session_id, limit):
+        """
+        Get the latest turns of a session
+
+        Returns:
+            list: Up to `limit` turns, newest first, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        context = self.cache.get((user_id, session_id))
+        if context is None:
+            return None
+        if not context.complete and limit > len(context.turns):
+            # Caller wants more than we hold
+            return None
+
+        return list(context.turns[:limit])
+
+    def is_current(self, user_id, session_id, latest_id):
+        """
+        Check a cached session against the newest turn stored for it, and
+        drop it if that turn was written elsewhere (e.g. by another worker)
+
+        Args:
+            latest_id: Id of the session's newest turn in the database, or None
+
+        Returns:
+            bool: False if the cached session was stale and has been dropped
+        """
+        if latest_id is None:
+            return True
+        context = self.cache.get((user_id, session_id))
+        if context is None:
+            return False
+        if any(turn.id == latest_id for turn in context.turns):
+            return True
+
+        self.stale += 1
+        self.invalidate(user_id, session_id)
+        return False
+
+    def seed(self, user_id, session_id, turns, complete):
+        """
+        Populate a session from a database read
+
+        Args:
+            turns: Latest turns of the session, newest first
+            complete: Whether turns is the whole session
+        """
+        if not self.enabled:
+            return
+
+        turns = turns[:self.max_turns]
+        complete = complete and len(turns) < self.max_turns
+        self.cache.set((user_id, session_id), SessionContext(turns, self.max_turns, complete))
+
+    def append(self, user_id, session_id, turn):
+        """
+        Record a newly saved turn
+
+        Sessions not already cached are left alone: other workers may have
+        written earlier turns, so the next read seeds from the database.
+        """
+        if not self.enabled:
+            return
+
+        key = (user_id, session_id)
+        with self.lock:
+            context = self.cache.get(key)
+            if context is None:
+                return
+
+            complete = context.complete and len(context.turns) < self.max_turns
+            self.cache.set(key, SessionContext((turn,) + context.turns, self.max_turns, complete))
+
+    def invalidate(self, user_id, session_id):
+        """Drop a cached session"""
+        self.cache.pop((user_id, session_id))
+
+    def stats(self):
+        """Return cache statistics"""
+        stats = self.cache.stats()
+        stats['enabled'] = self.enabled
+        stats['max_turns'] = self.max_turns
+        stats['stale'] = self.stale
+        return stats
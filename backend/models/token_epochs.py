@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenEpochStore:
+    """
+    In-process map of device_id -> token generation used to revoke
+    stateless JWTs.
+
+    A token is valid only while its `gen` claim matches the device's current
+    generation. The map is refreshed by one cheap query for devices whose
+    tokens changed since the last sync, at most every `sync_interval`
+    seconds, so a login or logout in another worker takes effect here within
+    that interval. Devices not seen yet are loaded on first use.
+    """
+
+    def __init__(self, database, sync_interval=None, overlap=None):
+        self.database = database
+        self.sync_interval = sync_interval if sync_interval is not None else Config.DEVICE_TOKEN_SYNC_INTERVAL
+        # Re-read a little before the last sync to tolerate clock skew between hosts
+        self.overlap = timedelta(seconds=overlap if overlap is not None else Config.DEVICE_TOKEN_SYNC_OVERLAP)
+
+        self.generations = {}
+        self.last_sync = datetime.utcnow()
+        self.next_sync = time.monotonic() + self.sync_interval
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+
+        self.syncs = 0
+        self.sync_failures = 0
+        self.loads = 0
+
+    def _maybe_sync(self):
+        """Pull generation changes if the sync interval has passed"""
+        if time.monotonic() < self.next_sync:
+            return
+        # One thread syncs while the others keep using the current map
+        if not self.sync_lock.acquire(blocking=False):
+            return
+
+        try:
+            started = datetime.utcnow()
+            changes = self.database.get_token_generations_since(self.last_sync - self.overlap)
+            with self.lock:
+                for device_id, generation in changes.items():
+                    # Only track devices this worker has already seen
+                    if device_id in self.generations:
+                        self.generations[device_id] = generation
+            self.last_sync = started
+            self.syncs += 1
+        except Exception as e:
+            self.sync_failures += 1
+            logger.error(f"Failed to sync device token generations: {e}")
+        finally:
+            self.next_sync = time.monotonic() + self.sync_interval
+            self.sync_lock.release()
+
+    def current(self, device_id):
+        """
+        Get the current token generation of a device
+
+        Returns:
+            int: Generation, or None if the device doesn't exist
+        """
+        self._maybe_sync()
+
+        with self.lock:
+            generation = self.generations.get(device_id)
+        if generation is not None:
+            return generation
+
+        generation = self.database.get_token_generation(device_id)
+        self.loads += 1
+        if generation is not None:
+            self.set(device_id, generation)
+        return generation
+
+    def set(self, device_id, generation):
+        """Record a generation change made by this worker"""
+        with self.lock:
+            current = self.generations.get(device_id)
+            if current is None or generation > current:
+                self.generations[device_id] = generation
+
+    def invalidate(self, device_id):
+        """Forget a device so its generation is reloaded on next use"""
+        with self.lock:
+            self.generations.pop(device_id, None)
+
+    def stats(self):
+        """Return sync statistics"""
+        with self.lock:
+            devices = len(self.generations)
+        return {
+            'devices': devices,
+            'syncs': self.syncs,
+            'sync_failures': self.sync_failures,
+            'loads': self.loads,
+            'last_sync': self.last_sync.isoformat(),
+            'sync_interval': self.sync_interval
+        }
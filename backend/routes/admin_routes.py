@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify, render_template, session, redirect, url_for
+from flask import Blueprint, request, jsonify, render_template, session, redirect, url_for, Response
 import logging
 from backend.services.admin_service import admin_service
+from backend.services.device_auth_service import device_auth_service
 from backend.models.database import db_manager
+from backend.utils.config import Config
+from backend.utils.scratch_space import scratch_space
 from bson import ObjectId
 from datetime import datetime
 
@@ -265,6 +268,102 @@ def get_analytics():
         logger.error(f"Error getting analytics: {e}")
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
+@admin_bp.route('/admin/api/system/database')
+@require_admin_auth()
+def get_database_stats():
+    """API endpoint for MongoDB pool utilization and write buffer metrics"""
+    try:
+        return jsonify({'success': True, 'data': db_manager.get_pool_stats()})
+    except Exception as e:
+        logger.error(f"Error getting database stats: {e}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
+@admin_bp.route('/admin/api/system/auth')
+@require_admin_auth()
+def get_auth_stats():
+    """API endpoint for device login verification and token revocation metrics"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'stateless': device_auth_service.stateless,
+                'token_epochs': device_auth_service.token_epochs.stats(),
+                'login_verifier': device_auth_service.password_verifier.stats()
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error getting auth stats: {e}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
+@admin_bp.route('/admin/api/system/pipelines')
+@require_admin_auth()
+def get_pipeline_stats():
+    """API endpoint for pipeline cache metrics of the serving worker"""
+    # Imported here so loading the admin blueprint doesn't initialize every LLM client
+    from backend.services.pipeline_service import pipeline_service
+    try:
+        return jsonify({'success': True, 'data': pipeline_service.get_cache_stats()})
+    except Exception as e:
+        logger.error(f"Error getting pipeline stats: {e}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
+@admin_bp.route('/admin/api/system/scratch')
+@require_admin_auth()
+def get_scratch_stats():
+    """API endpoint for temp audio disk usage and janitor metrics"""
+    try:
+        return jsonify({'success': True, 'data': scratch_space.stats()})
+    except Exception as e:
+        logger.error(f"Error getting scratch stats: {e}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
+@admin_bp.route('/admin/api/devices/bulk_register', methods=['POST'])
+@require_admin_auth()
+def bulk_register_devices():
+    """
+    API endpoint for provisioning many devices in one call.
+    Accepts JSON {"devices": [...]} or a multipart CSV upload in `file`
+    (columns: device_name, password, pipeline_type, llm_service).
+    With ?format=csv the issued credentials are returned as a CSV download.
+    Batches are capped at DEVICE_BULK_REGISTER_HTTP_MAX so hashing fits in a
+    request; larger fleets go through backend/scripts/provision_devices.py.
+    """
+    try:
+        if 'file' in request.files:
+            csv_text = request.files['file'].read().decode('utf-8-sig')
+            devices = device_auth_service.parse_devices_csv(csv_text)
+        else:
+            data = request.get_json(silent=True)
+            devices = data.get('devices') if data else None
+        
+        if not devices or not isinstance(devices, list):
+            return jsonify({'success': False, 'message': 'A list of devices or a CSV file is required'}), 400
+        
+        max_devices = Config.DEVICE_BULK_REGISTER_HTTP_MAX
+        if len(devices) > max_devices:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_devices} devices can be registered per request; '
+                           f'use backend/scripts/provision_devices.py for larger batches'
+            }), 400
+        
+        # Hashed inline: forking a process pool from a threaded request worker isn't safe
+        result, error = device_auth_service.register_devices_bulk(devices, max_devices=max_devices, hash_workers=1)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        
+        if request.args.get('format') == 'csv':
+            return Response(
+                device_auth_service.devices_to_csv(result['devices']),
+                mimetype='text/csv',
+                headers={'Content-Disposition': 'attachment; filename=provisioned_devices.csv'}
+            ), 201
+        
+        return jsonify({'success': True, 'data': result}), 201
+    except Exception as e:
+        logger.error(f"Error bulk registering devices: {e}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
 @admin_bp.route('/admin/api/change-password', methods=['POST'])
 @require_admin_auth()
 def change_password():
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, render_template
 import logging
 from backend.services.device_auth_service import device_auth_service, device_auth_required
+from backend.utils.password_hashing import VerifierBusyError
 from backend.models.database import db_manager
 from backend.services.pipeline_service import pipeline_service
 from backend.utils.config import Config
@@ -122,8 +123,14 @@ def login_device():
         if not password:
             return jsonify({'error': 'Password is required'}), 400
         
-        # Login device
-        result, error = device_auth_service.login_device(device_id, password)
+        # Login device (shed load quickly during boot storms)
+        try:
+            result, error = device_auth_service.login_device(device_id, password)
+        except VerifierBusyError as e:
+            logger.warning(f"Login verification busy ({e}), shedding login for device {device_id}")
+            response = jsonify({'error': 'Server busy, please retry shortly'})
+            response.headers['Retry-After'] = str(Config.LOGIN_RETRY_AFTER)
+            return response, 429
         
         if error:
             return jsonify({'error': error}), 401
@@ -198,13 +205,18 @@ def get_device_info():
     """Get current device information"""
     try:
         device = request.device
+        if device_auth_service.stateless:
+            # Stateless auth only carries the token claims
+            device = db_manager.get_device_record(request.device_id)
+            if not device:
+                return jsonify({'error': 'Device not found'}), 404
         
         return jsonify({
             'success': True,
-            'device_id': device['device_id'],
-            'device_name': device['device_name'],
-            'created_at': device['created_at'].strftime('%Y-%m-%d %H:%M:%S') if device.get('created_at') else None,
-            'last_login': device['last_login'].strftime('%Y-%m-%d %H:%M:%S') if device.get('last_login') else None
+            'device_id': device.device_id,
+            'device_name': device.device_name,
+            'created_at': device.created_at.strftime('%Y-%m-%d %H:%M:%S') if device.created_at else None,
+            'last_login': device.last_login.strftime('%Y-%m-%d %H:%M:%S') if device.last_login else None
         }), 200
         
     except Exception as e:
@@ -230,8 +242,8 @@ def validate_token():
         if device:
             return jsonify({
                 'valid': True,
-                'device_id': device['device_id'],
-                'device_name': device['device_name']
+                'device_id': device.device_id,
+                'device_name': device.device_name
             }), 200
         else:
             return jsonify({'valid': False, 'error': 'Invalid or expired token'}), 401
@@ -273,6 +285,7 @@ def update_pipeline_config():
         
         pipeline_type = data.get('pipeline_type')
         llm_service = data.get('llm_service')
+        audio_profile = data.get('audio_profile')
         
         # Validate inputs
         if pipeline_type and pipeline_type not in Config.VALID_PIPELINE_TYPES:
@@ -285,9 +298,14 @@ def update_pipeline_config():
                 'error': f'Invalid LLM service. Must be one of: {Config.VALID_LLM_SERVICES}'
             }), 400
         
+        if audio_profile and audio_profile not in Config.AUDIO_OUTPUT_PROFILES:
+            return jsonify({
+                'error': f'Invalid audio profile. Must be one of: {list(Config.AUDIO_OUTPUT_PROFILES)}'
+            }), 400
+        
         # Update configuration
         success = db_manager.update_device_pipeline_config(
-            device_id, pipeline_type, llm_service
+            device_id, pipeline_type, llm_service, audio_profile
         )
         
         if success:
@@ -313,9 +331,11 @@ def get_available_options():
         'options': {
             'pipeline_types': Config.VALID_PIPELINE_TYPES,
             'llm_services': Config.VALID_LLM_SERVICES,
+            'audio_profiles': list(Config.AUDIO_OUTPUT_PROFILES),
             'defaults': {
                 'pipeline_type': Config.DEFAULT_PIPELINE_TYPE,
-                'llm_service': Config.DEFAULT_LLM_SERVICE_TYPE
+                'llm_service': Config.DEFAULT_LLM_SERVICE_TYPE,
+                'audio_profile': Config.AUDIO_OUTPUT_PROFILE
             }
         }
     }), 200
@@ -47,17 +47,17 @@ def get_user_profile(phone):
     """Get user profile by phone number"""
     try:
         device_id = request.device_id
-        user = db_manager.get_user(phone)
+        user = db_manager.get_user_record(phone)
         
         if user:
             # Only return user if it belongs to the requesting device
-            if user.get('device_id') == device_id or user.get('device_id') is None:
+            if user.device_id == device_id or user.device_id is None:
                 return jsonify({
-                    'user_id': str(user['_id']),
-                    'name': user['name'],
-                    'phone': user['phone'],
-                    'language': user['language'],
-                    'created_at': user['created_at'].isoformat()
+                    'user_id': str(user.id),
+                    'name': user.name,
+                    'phone': user.phone,
+                    'language': user.language,
+                    'created_at': user.created_at.isoformat() if user.created_at else None
                 })
             else:
                 return jsonify({'error': 'User not found'}), 404
@@ -82,9 +82,9 @@ def get_conversation_history(user_id):
         formatted_conversations = []
         for conv in conversations:
             formatted_conversations.append({
-                'user_input': conv.get('user_input', ''),
-                'bot_response': conv.get('bot_response', ''),
-                'timestamp': conv.get('timestamp').isoformat() if conv.get('timestamp') else None
+                'user_input': conv.user_input or '',
+                'bot_response': conv.bot_response or '',
+                'timestamp': conv.timestamp.isoformat() if conv.timestamp else None
             })
         
         return jsonify({
@@ -1,12 +1,23 @@
 from flask import Blueprint, request, jsonify, send_file
+from pydub import AudioSegment
+import io
+import math
 import os
 import uuid
 import logging
 from backend.services.speech_service import speech_service
 from backend.services.pipeline_service import pipeline_service
+from backend.services.summary_service import summary_service
 from backend.services.llm_service import gemini_service, openai_service, azure_openai_service, vertex_service
 from backend.services.device_auth_service import device_auth_required
+from backend.services.prompt_catalog import prompt_catalog
+from backend.services.stt_stream import BufferedStreamRecognizer, StreamTooLongError, UnknownStreamError, speech_streams
 from backend.utils.config import Config
+from backend.utils.audio_encoding import negotiate_audio_profile, profile_mimetype, profile_extension
+from backend.utils.audio_preprocessing import mono_samples
+from backend.utils.noise_profile import noise_profiles
+from backend.utils.scratch_space import scratch_space
+from backend.utils.single_flight import single_flight
 from backend.models.database import db_manager
 
 llm_services = {
@@ -18,6 +29,13 @@ llm_services = {
 
 current_llm_service = llm_services.get(Config.DEFAULT_LLM_SERVICE, azure_openai_service)
 
+def default_llm_call(operation, text):
+    """Call the default LLM service; identical concurrent calls share one request"""
+    return single_flight.do(
+        (operation, current_llm_service, text),
+        getattr(current_llm_service, operation), text
+    )
+
 
 logger = logging.getLogger(__name__)
 voice_bp = Blueprint('voice', __name__)
@@ -38,6 +56,7 @@ def process_audio():
         # Get language from request (default to Hindi)
         language = request.form.get('language', 'hindi')
         device_id = request.form.get('device_id')  # Optional device ID
+        session_id = request.form.get('session_id')  # Optional, selects the session's noise profile
         
         # Get proper language code for speech recognition
         lang_code = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
@@ -46,15 +65,19 @@ def process_audio():
         if device_id:
             try:
                 device_id = int(device_id)
-                text = pipeline_service.speech_to_text(device_id, audio_file, lang_code)
+                text = pipeline_service.speech_to_text(device_id, audio_file, lang_code, session_id)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid device_id format: {device_id}, falling back to legacy service")
                 filename = f"{uuid.uuid4()}_{audio_file.filename}"
-                text = speech_service.process_uploaded_audio(audio_file.read(), filename, language)
+                text = speech_service.process_uploaded_audio(
+                    audio_file.read(), filename, language, noise_profiles.profile_key(session_id)
+                )
         else:
             # Legacy path for backward compatibility
             filename = f"{uuid.uuid4()}_{audio_file.filename}"
-            text = speech_service.process_uploaded_audio(audio_file.read(), filename, language)
+            text = speech_service.process_uploaded_audio(
+                audio_file.read(), filename, language, noise_profiles.profile_key(session_id)
+            )
         
         if text:
             return jsonify({'text': text, 'stt_success': True})
@@ -77,6 +100,156 @@ def process_audio():
             'fallback': True
         }), 200
 
+@voice_bp.route('/calibrate_noise', methods=['POST'])
+def calibrate_noise():
+    """
+    Measure the background noise of a session from a short clip recorded
+    while nobody speaks; later uploads of the session trim silence against it
+    """
+    try:
+        if 'audio' not in request.files:
+            return jsonify({'error': 'No audio file provided'}), 400
+        
+        noise_key = noise_profiles.profile_key(request.form.get('session_id'), request.form.get('device_id'))
+        if noise_key is None:
+            return jsonify({'error': 'session_id or device_id is required'}), 400
+        
+        audio_file = request.files['audio']
+        with scratch_space.temp_path('.upload') as upload_path:
+            audio_file.save(upload_path)
+            segment = AudioSegment.from_file(upload_path)
+        
+        level, error = noise_profiles.calibrate(noise_key, mono_samples(segment), segment.frame_rate)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        return jsonify({
+            'success': True,
+            'noise_floor_dbfs': round(20 * math.log10(level), 1) if level > 0 else None
+        })
+        
+    except Exception as e:
+        logger.error(f"Error calibrating noise profile: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@voice_bp.route('/stream/start', methods=['POST'])
+def start_audio_stream():
+    """
+    Open a streaming recognition: the client then posts raw 16-bit
+    little-endian mono PCM to /stream/<id>/chunk while the user speaks and
+    calls /stream/<id>/finish at end of speech. Streams are held by the
+    worker that opened them, so multi-worker deployments need sticky routing.
+    """
+    try:
+        if not Config.STT_STREAM_ENABLED:
+            return jsonify({'error': 'Streaming recognition is disabled'}), 503
+        
+        data = request.get_json(silent=True) or request.form
+        language = data.get('language', 'hindi')
+        device_id = data.get('device_id')  # Optional device ID
+        session_id = data.get('session_id')  # Optional, selects the session's noise profile
+        try:
+            sample_rate = int(data.get('sample_rate', 16000))
+        except (ValueError, TypeError):
+            sample_rate = None
+        if sample_rate not in Config.STT_STREAM_SAMPLE_RATES:
+            return jsonify({
+                'error': 'Unsupported sample rate',
+                'sample_rates': Config.STT_STREAM_SAMPLE_RATES
+            }), 400
+        
+        lang_code = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
+        
+        # Recognizers are created on the first speech chunk, not here
+        try:
+            device_id = int(device_id) if device_id else None
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid device_id format: {device_id}, falling back to legacy service")
+            device_id = None
+        
+        if device_id is not None:
+            noise_key = noise_profiles.profile_key(session_id, device_id)
+            create_recognizer = lambda: pipeline_service.create_stream_recognizer(
+                device_id, lang_code, sample_rate, session_id
+            )
+        else:
+            # Legacy path: buffer the speech and recognize it as one upload
+            noise_key = noise_profiles.profile_key(session_id)
+            create_recognizer = lambda: BufferedStreamRecognizer(
+                sample_rate,
+                lambda wav_bytes: speech_service.process_uploaded_audio(wav_bytes, 'stream.wav', language, noise_key)
+            )
+        
+        stream_id = speech_streams.start(create_recognizer, sample_rate, noise_key)
+        return jsonify({
+            'stream_id': stream_id,
+            'sample_rate': sample_rate,
+            'idle_timeout': speech_streams.streams.ttl,
+            'max_seconds': speech_streams.max_seconds
+        })
+        
+    except Exception as e:
+        logger.error(f"Error starting audio stream: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@voice_bp.route('/stream/<stream_id>/chunk', methods=['POST'])
+def push_audio_chunk(stream_id):
+    """Append a chunk of raw PCM (request body) to an open stream"""
+    try:
+        status, error = speech_streams.push(stream_id, request.get_data())
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify(status)
+        
+    except UnknownStreamError:
+        return jsonify({'error': 'Unknown or expired stream'}), 404
+    except StreamTooLongError:
+        return jsonify({'error': f'Stream longer than {speech_streams.max_seconds}s'}), 413
+    except Exception as e:
+        logger.error(f"Error processing audio chunk: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@voice_bp.route('/stream/<stream_id>/finish', methods=['POST'])
+def finish_audio_stream(stream_id):
+    """End of speech: return the stream's transcript (same response as process_audio)"""
+    try:
+        text, heard_speech = speech_streams.finish(stream_id)
+        if text:
+            return jsonify({'text': text, 'stt_success': True})
+        
+        logger.warning("Streaming speech-to-text failed: " + (
+            "Could not understand audio" if heard_speech else "No speech in stream"
+        ))
+        return jsonify({
+            'error': 'Could not understand the audio',
+            'text': '',
+            'stt_success': False,
+            'fallback': True
+        }), 200
+        
+    except UnknownStreamError:
+        return jsonify({
+            'error': 'Unknown or expired stream',
+            'text': '',
+            'stt_success': False,
+            'fallback': True
+        }), 404
+    except Exception as e:
+        logger.error(f"Error finishing audio stream: {e}")
+        return jsonify({
+            'error': 'Internal server error',
+            'text': '',
+            'stt_success': False,
+            'fallback': True
+        }), 200
+
+@voice_bp.route('/stream/<stream_id>', methods=['DELETE'])
+def cancel_audio_stream(stream_id):
+    """Drop a stream without recognizing it (e.g. the user cancelled)"""
+    if not speech_streams.cancel(stream_id):
+        return jsonify({'error': 'Unknown or expired stream'}), 404
+    return jsonify({'success': True})
+
 @voice_bp.route('/extract_info', methods=['POST'])
 def extract_user_info():
     """Extract name and phone number from text"""
@@ -95,10 +268,10 @@ def extract_user_info():
                 info = pipeline_service.extract_name_phone(device_id, text)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid device_id format: {device_id}, using default LLM")
-                info = current_llm_service.extract_name_phone(text)
+                info = default_llm_call('extract_name_phone', text)
         else:
             # Legacy path - use default LLM service
-            info = current_llm_service.extract_name_phone(text)
+            info = default_llm_call('extract_name_phone', text)
         
         # Check if extraction was successful
         if not info.get('phone'):
@@ -148,10 +321,10 @@ def detect_language():
                 language = pipeline_service.detect_language(device_id, text)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid device_id format: {device_id}, using default LLM")
-                language = current_llm_service.detect_language(text)
+                language = default_llm_call('detect_language', text)
         else:
             # Legacy path - use default LLM service
-            language = current_llm_service.detect_language(text)
+            language = default_llm_call('detect_language', text)
         
         # Validate language is in supported list
         if language and language.lower() in [lang.lower() for lang in Config.SUPPORTED_LANGUAGES.keys()]:
@@ -196,18 +369,36 @@ def generate_response():
         
         # Get conversation history if user_id provided
         conversation_history = None
+        conversation_summary = None
         if user_id:
             conversation_history = db_manager.get_conversation_history(user_id, session_id, limit=10)
+            # Replace older turns with the rolling session summary when one exists
+            conversation_history, conversation_summary = summary_service.select_prompt_history(
+                user_id, session_id, conversation_history
+            )
         
         # Generate response using device-specific pipeline
-        response = pipeline_service.generate_response(device_id, user_input, language, conversation_history)
+        response = pipeline_service.generate_response(
+            device_id, user_input, language, conversation_history, conversation_summary
+        )
         
         # Don't remove asterisks - they're used for markdown formatting (bold text)
         # response = response.replace("*", "")  # REMOVED - conflicts with markdown
 
+        # The client asks for this response's speech next; start it now
+        pipeline_service.prefetch_speech(
+            device_id, response, Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
+        )
+
         # Save conversation to database if user_id provided (with device_id)
         if user_id and response:
             db_manager.create_conversation(user_id, user_input, response, device_id, session_id)
+            
+            # Fold this turn into the session summary in the background
+            summary_service.schedule_update(
+                pipeline_service.get_pipeline(device_id), user_id, session_id,
+                user_input, response, language
+            )
         
         return jsonify({
             'response': response,
@@ -232,23 +423,55 @@ def text_to_speech():
         
         # Convert language name to code
         language_code = Config.SUPPORTED_LANGUAGES.get(language, 'hi')
+        # For pipeline TTS, get speech recognition language code (e.g., 'hi-IN')
+        lang_code = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
         
         # Use pipeline service if device_id is provided
         if device_id:
             try:
                 device_id = int(device_id)
-                # For TTS, get speech recognition language code (e.g., 'hi-IN')
-                lang_code = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
-                audio_path = pipeline_service.text_to_speech(device_id, text, lang_code)
             except (ValueError, TypeError):
                 logger.warning(f"Invalid device_id format: {device_id}, using legacy TTS")
-                audio_path = speech_service.text_to_speech(text, language_code)
+                device_id = None
+        
+        if Config.TTS_IN_MEMORY and device_id:
+            # Encoding from the Accept header or the device's audio profile
+            audio_profile = negotiate_audio_profile(
+                request.headers.get('Accept'),
+                pipeline_service.get_audio_profile(device_id)
+            )
+            # Generated responses are usually synthesized already (prefetched in
+            # generate_response with the device's pipeline)
+            audio, audio_profile = pipeline_service.text_to_speech_bytes(device_id, text, lang_code, audio_profile)
+            if audio:
+                return send_file(
+                    io.BytesIO(audio),
+                    mimetype=profile_mimetype(audio_profile),
+                    as_attachment=True,
+                    download_name=f'response.{profile_extension(audio_profile)}'
+                )
+            return jsonify({'error': 'Could not generate audio'}), 500
+        
+        if Config.TTS_IN_MEMORY and not device_id:
+            # Legacy path - gTTS in memory, shared by identical concurrent requests
+            audio = speech_service.text_to_speech_bytes(text, language_code)
+            if audio:
+                return send_file(io.BytesIO(audio), mimetype='audio/mpeg', as_attachment=True, download_name='response.mp3')
+            return jsonify({'error': 'Could not generate audio'}), 500
+        
+        if device_id:
+            audio_path = pipeline_service.text_to_speech(device_id, text, lang_code)
         else:
             # Legacy path - use speech_service directly
             audio_path = speech_service.text_to_speech(text, language_code)
         
         if audio_path and os.path.exists(audio_path):
-            return send_file(audio_path, as_attachment=True, download_name='response.mp3')
+            # Name the download after what the engine actually wrote (Azure writes WAV)
+            extension = os.path.splitext(audio_path)[1] or '.mp3'
+            with open(audio_path, 'rb') as audio_file:
+                audio = audio_file.read()
+            scratch_space.discard(audio_path)
+            return send_file(io.BytesIO(audio), as_attachment=True, download_name=f'response{extension}')
         else:
             return jsonify({'error': 'Could not generate audio'}), 500
             
@@ -258,48 +481,38 @@ def text_to_speech():
 
 @voice_bp.route('/static_audio/<prompt_type>/<language>')
 def get_static_audio(prompt_type, language):
-    """Get pre-generated static audio prompts"""
+    """Get pre-rendered static audio prompts from the prompt catalog"""
     try:
-        # Map language variations
-        language_map = {
-            'hindi': 'hi',
-            'bengali': 'bn',
-            'tamil': 'ta',
-            'telugu': 'te',
-            'gujarati': 'gu',
-            'marathi': 'mr'
-        }
-        
-        # Convert full language name to abbreviation if needed
-        lang_code = language_map.get(language.lower(), language.lower())
-        
-        # Check if static audio already exists with abbreviation
-        filename = f"static_{prompt_type}_{lang_code}.mp3"
-        audio_path = os.path.join('static', 'audio', filename)
-        
-        # If not found, try with full language name
-        if not os.path.exists(audio_path):
-            filename = f"static_{prompt_type}_{language}.mp3"
-            audio_path = os.path.join('static', 'audio', filename)
-        
-        # If file exists, serve it
-        if os.path.exists(audio_path):
-            return send_file(audio_path, mimetype='audio/mpeg')
-        
-        # File doesn't exist - try to get text and generate it
-        prompts = Config.LANGUAGE_PROMPTS.get(prompt_type, {})
-        text = prompts.get(language) or prompts.get(lang_code)
+        clip = prompt_catalog.get(
+            prompt_type,
+            language,
+            accept_header=request.headers.get('Accept'),
+            profile=request.args.get('profile')
+        )
+        if clip is None:
+            # Prompts are rendered at build time (executables/build_prompt_catalog.py), never here
+            logger.error(f"Static audio not found in prompt catalog: {prompt_type}/{language}")
+            return jsonify({'error': f'Static audio not found: {prompt_type}/{language}'}), 404
         
-        if text:
-            # Generate static audio on the fly
-            audio_path = speech_service.create_static_audio(text, lang_code, filename)
-            if audio_path and os.path.exists(audio_path):
-                return send_file(audio_path, mimetype='audio/mpeg')
-        
-        # If all else fails, return error
-        logger.error(f"Static audio not found: {prompt_type}/{language} (tried: {filename})")
-        return jsonify({'error': f'Static audio not found: {prompt_type}/{language}'}), 404
+        # Clips are held in memory; fall back to the catalog file when they aren't
+        source = io.BytesIO(clip['audio']) if clip['audio'] is not None else clip['path']
+        response = send_file(
+            source,
+            mimetype=clip['mimetype'],
+            etag=clip['sha256'],
+            max_age=Config.PROMPT_CATALOG_MAX_AGE,
+            conditional=True
+        )
+        # A clip only changes when the catalog is rebuilt, so browsers needn't
+        # revalidate within max-age; after that the ETag makes it a cheap 304
+        response.cache_control.immutable = True
+        if clip['has_variants']:
+            response.vary.add('Accept')
+        return response
             
+    except FileNotFoundError:
+        logger.error(f"Prompt catalog file missing for {prompt_type}/{language}; rebuild the catalog")
+        return jsonify({'error': f'Static audio not found: {prompt_type}/{language}'}), 404
     except Exception as e:
         logger.error(f"Error getting static audio: {e}")
         return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
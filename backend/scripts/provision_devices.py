@@ -0,0 +1,82 @@
+"""
+Bulk device provisioning from a CSV file
+Registers every kiosk listed in the input CSV (columns: device_name, password,
+pipeline_type, llm_service) and writes the issued device IDs and tokens to an
+output CSV.
+
+Usage: python backend/scripts/provision_devices.py devices.csv [--output provisioned.csv] [--workers N]
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Add project root to Python path (go up two levels from scripts/ directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from backend.services.device_auth_service import device_auth_service
+from backend.utils.config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def provision_devices(input_path, output_path, workers=None):
+    """Register all devices from input_path in batches and write credentials to output_path"""
+    with open(input_path, 'r', encoding='utf-8-sig') as f:
+        devices = device_auth_service.parse_devices_csv(f.read())
+    
+    if not devices:
+        logger.error(f"No devices found in {input_path}")
+        return False
+    
+    started = time.perf_counter()
+    batch_size = Config.DEVICE_BULK_REGISTER_MAX
+    registered = []
+    failed = []
+    
+    for offset in range(0, len(devices), batch_size):
+        batch = devices[offset:offset + batch_size]
+        result, error = device_auth_service.register_devices_bulk(batch, hash_workers=workers)
+        if error:
+            logger.error(f"Batch starting at row {offset + 1} failed: {error}")
+            failed.extend({'index': offset + i, 'error': error} for i in range(len(batch)))
+            continue
+        
+        registered.extend(result['devices'])
+        failed.extend({**item, 'index': offset + item['index']} for item in result['failed'])
+        stats = result['stats']
+        logger.info(f"Batch {offset // batch_size + 1}: {stats['registered']} devices, {stats['devices_per_second']} devices/s")
+    
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(device_auth_service.devices_to_csv(registered))
+    
+    elapsed = time.perf_counter() - started
+    
+    print("\n" + "="*60)
+    print("PROVISIONING SUMMARY")
+    print("="*60)
+    print(f"Devices in CSV: {len(devices)}")
+    print(f"Registered: {len(registered)}")
+    print(f"Rejected: {len(failed)}")
+    print(f"Elapsed: {elapsed:.2f}s ({len(registered) / elapsed if elapsed else 0:.1f} devices/s)")
+    print(f"bcrypt rounds: {Config.BCRYPT_ROUNDS}")
+    print(f"Credentials written to: {output_path}")
+    print("="*60)
+    
+    for item in failed:
+        print(f"  Row {item['index'] + 1}: {item['error']}")
+    
+    return not failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Register kiosks in bulk from a CSV file')
+    parser.add_argument('input', help='CSV with device_name, password, pipeline_type, llm_service columns')
+    parser.add_argument('--output', default='provisioned_devices.csv', help='Where to write device IDs and tokens')
+    parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: CPU count)')
+    args = parser.parse_args()
+    
+    success = provision_devices(args.input, args.output, args.workers)
+    sys.exit(0 if success else 1)
@@ -159,8 +159,8 @@ class AdminService:
                 }
             ]
             
-            conversations = list(db_manager.conversations.aggregate(pipeline))
-            total = db_manager.conversations.count_documents({})
+            conversations = list(db_manager.analytics_conversations.aggregate(pipeline))
+            total = db_manager.analytics_conversations.count_documents({})
             
             return {
                 'conversations': conversations,
@@ -180,9 +180,9 @@ class AdminService:
             # Get conversations from last N days
             start_date = datetime.utcnow() - timedelta(days=days)
             
-            conversations = list(db_manager.conversations.find({
+            conversations = list(db_manager.analytics_conversations.find({
                 'timestamp': {'$gte': start_date}
-            }))
+            }, {'timestamp': 1, 'bot_response': 1}))
             
             # Analyze conversation patterns
             hourly_distribution = {}
@@ -1,12 +1,18 @@
+import csv
+import io
 import jwt
-import bcrypt
 import secrets
 import logging
+import time
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify
 from backend.models.database import db_manager
+from backend.models.records import DeviceRecord
+from backend.models.token_epochs import TokenEpochStore
 from backend.utils.config import Config
+from backend.utils import password_hashing
+from backend.utils.password_hashing import PasswordVerifierPool, VerifierBusyError
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +23,28 @@ class DeviceAuthService:
         self.jwt_secret = Config.JWT_SECRET_KEY
         self.access_token_expiry = Config.ACCESS_TOKEN_EXPIRY
         self.refresh_token_expiry = Config.REFRESH_TOKEN_EXPIRY
-        logger.info("Device authentication service initialized")
+        self.password_verifier = PasswordVerifierPool()
+        self.stateless = Config.DEVICE_AUTH_STATELESS
+        self.token_epochs = TokenEpochStore(db_manager)
+        logger.info(f"Device authentication service initialized (stateless={self.stateless})")
     
     def hash_password(self, password):
         """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return password_hashing.hash_password(password)
     
     def verify_password(self, password, password_hash):
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+        return password_hashing.verify_password(password, password_hash)
     
-    def generate_access_token(self, device_id):
+    def _token_claims(self, payload, generation, device_name):
+        """Add the claims used by stateless verification"""
+        if generation is not None:
+            payload['gen'] = generation
+        if device_name:
+            payload['name'] = device_name
+        return payload
+    
+    def generate_access_token(self, device_id, generation=None, device_name=None):
         """Generate JWT access token (1 hour expiry)"""
         payload = {
             'device_id': device_id,
@@ -36,9 +52,10 @@ class DeviceAuthService:
             'exp': datetime.utcnow() + timedelta(seconds=self.access_token_expiry),
             'iat': datetime.utcnow()
         }
+        payload = self._token_claims(payload, generation, device_name)
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
     
-    def generate_refresh_token(self, device_id):
+    def generate_refresh_token(self, device_id, generation=None, device_name=None):
         """Generate JWT refresh token (24 hour expiry)"""
         payload = {
             'device_id': device_id,
@@ -46,8 +63,16 @@ class DeviceAuthService:
             'exp': datetime.utcnow() + timedelta(seconds=self.refresh_token_expiry),
             'iat': datetime.utcnow()
         }
+        payload = self._token_claims(payload, generation, device_name)
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
     
+    def _is_current_generation(self, payload):
+        """Check a stateless token's generation against the in-memory epoch map"""
+        generation = payload.get('gen')
+        if generation is None:
+            return False
+        return self.token_epochs.current(payload.get('device_id')) == generation
+    
     def decode_token(self, token):
         """Decode and validate JWT token"""
         try:
@@ -60,23 +85,32 @@ class DeviceAuthService:
             logger.warning(f"Invalid token: {e}")
             return None
     
+    def validate_registration(self, device_name, password, pipeline_type='library', llm_service='gemini'):
+        """Validate device registration fields, returns an error message or None"""
+        if not device_name or len(device_name.strip()) < 3:
+            return "Device name must be at least 3 characters"
+        
+        if not password or len(password) < 8:
+            return "Password must be at least 8 characters"
+        
+        if pipeline_type not in Config.VALID_PIPELINE_TYPES:
+            return f"Invalid pipeline type. Must be one of: {Config.VALID_PIPELINE_TYPES}"
+        
+        if llm_service not in Config.VALID_LLM_SERVICES:
+            return f"Invalid LLM service. Must be one of: {Config.VALID_LLM_SERVICES}"
+        
+        return None
+    
     def register_device(self, device_name, password, pipeline_type='library', llm_service='gemini'):
         """Register a new device with pipeline configuration"""
         try:
             # Validate inputs
-            if not device_name or len(device_name.strip()) < 3:
-                return None, "Device name must be at least 3 characters"
-            
-            if not password or len(password) < 8:
-                return None, "Password must be at least 8 characters"
-            
-            # Get next device ID
-            device_id = db_manager.get_next_device_id()
+            error = self.validate_registration(device_name, password, pipeline_type, llm_service)
+            if error:
+                return None, error
             
-            # Check if device_id already exists (shouldn't happen, but safety check)
-            existing_device = db_manager.get_device_by_id(device_id)
-            if existing_device:
-                return None, "Device ID already exists. Please try again."
+            # Atomically reserve the next device ID (unique index guards against duplicates)
+            device_id = db_manager.allocate_device_ids(1)[0]
             
             # Hash password
             password_hash = self.hash_password(password)
@@ -110,22 +144,157 @@ class DeviceAuthService:
             logger.error(f"Device registration failed: {e}")
             return None, "Registration failed. Please try again."
     
+    def parse_devices_csv(self, csv_text):
+        """
+        Parse a provisioning CSV with columns device_name, password and
+        optional pipeline_type, llm_service
+        
+        Returns:
+            list: One dict per row
+        """
+        reader = csv.DictReader(io.StringIO(csv_text))
+        devices = []
+        for row in reader:
+            devices.append({
+                key.strip(): (value or '').strip()
+                for key, value in row.items() if key
+            })
+        return devices
+    
+    def devices_to_csv(self, devices):
+        """Render provisioned devices and their tokens as CSV"""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=[
+            'device_id', 'device_name', 'pipeline_type', 'llm_service', 'access_token', 'refresh_token'
+        ])
+        writer.writeheader()
+        writer.writerows(devices)
+        return output.getvalue()
+    
+    def register_devices_bulk(self, devices, max_devices=None, hash_workers=None):
+        """
+        Register many devices with a single device ID reservation and bulk insert
+        Passwords are hashed across a process pool.
+        
+        Args:
+            devices: List of dicts with device_name, password and optional
+                     pipeline_type / llm_service
+            max_devices: Batch size limit (defaults to Config.DEVICE_BULK_REGISTER_MAX)
+            hash_workers: Number of hashing processes
+            
+        Returns:
+            tuple: ({'devices': [...registered...], 'failed': [...], 'stats': {...}}, error)
+        """
+        try:
+            started = time.perf_counter()
+            max_devices = max_devices or Config.DEVICE_BULK_REGISTER_MAX
+            
+            if not devices:
+                return None, "No devices provided"
+            
+            if len(devices) > max_devices:
+                return None, f"At most {max_devices} devices can be registered per call"
+            
+            valid = []
+            failed = []
+            for index, device in enumerate(devices):
+                device_name = (device.get('device_name') or '').strip()
+                password = device.get('password') or ''
+                pipeline_type = device.get('pipeline_type') or Config.DEFAULT_PIPELINE_TYPE
+                llm_service = device.get('llm_service') or Config.DEFAULT_LLM_SERVICE_TYPE
+                
+                error = self.validate_registration(device_name, password, pipeline_type, llm_service)
+                if error:
+                    failed.append({'index': index, 'device_name': device_name, 'error': error})
+                    continue
+                valid.append({
+                    'device_name': device_name,
+                    'password': password,
+                    'pipeline_type': pipeline_type,
+                    'llm_service': llm_service
+                })
+            
+            if not valid:
+                return {'devices': [], 'failed': failed, 'stats': self._provisioning_stats(0, started)}, None
+            
+            # One counter reservation for the whole batch
+            device_ids = db_manager.allocate_device_ids(len(valid))
+            
+            hash_started = time.perf_counter()
+            password_hashes = password_hashing.hash_passwords_parallel(
+                [device['password'] for device in valid], workers=hash_workers
+            )
+            hash_seconds = time.perf_counter() - hash_started
+            
+            records = []
+            for device_id, device, password_hash in zip(device_ids, valid, password_hashes):
+                records.append({
+                    'device_id': device_id,
+                    'device_name': device['device_name'],
+                    'password_hash': password_hash,
+                    'access_token': self.generate_access_token(device_id),
+                    'refresh_token': self.generate_refresh_token(device_id),
+                    'pipeline_type': device['pipeline_type'],
+                    'llm_service': device['llm_service']
+                })
+            
+            db_manager.create_devices(records)
+            
+            registered = [
+                {key: record[key] for key in (
+                    'device_id', 'device_name', 'pipeline_type', 'llm_service', 'access_token', 'refresh_token'
+                )}
+                for record in records
+            ]
+            stats = self._provisioning_stats(len(registered), started, hash_seconds)
+            logger.info(
+                f"Bulk registered {len(registered)} devices ({len(failed)} rejected) "
+                f"in {stats['elapsed_seconds']}s, {stats['devices_per_second']} devices/s"
+            )
+            return {'devices': registered, 'failed': failed, 'stats': stats}, None
+            
+        except Exception as e:
+            logger.error(f"Bulk device registration failed: {e}")
+            return None, "Bulk registration failed. Please try again."
+    
+    def _provisioning_stats(self, count, started, hash_seconds=0.0):
+        """Throughput figures for a bulk registration"""
+        elapsed = time.perf_counter() - started
+        return {
+            'registered': count,
+            'elapsed_seconds': round(elapsed, 3),
+            'hash_seconds': round(hash_seconds, 3),
+            'devices_per_second': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            'bcrypt_rounds': Config.BCRYPT_ROUNDS
+        }
+    
     def login_device(self, device_id, password):
-        """Login device and generate new tokens (invalidates old session)"""
+        """
+        Login device and generate new tokens (invalidates old session)
+        Raises VerifierBusyError when the password check queue is full.
+        """
         try:
-            # Get device from database
-            device = db_manager.get_device_by_id(device_id)
+            # Get device credentials from database
+            device = db_manager.get_device_credentials(device_id)
             
             if not device:
                 return None, "Invalid device ID or password"
             
-            # Verify password
-            if not self.verify_password(password, device['password_hash']):
+            # Verify password off the request worker
+            valid, new_hash = self.password_verifier.verify(password, device.password_hash)
+            if not valid:
                 return None, "Invalid device ID or password"
             
+            # Upgrade hashes made at an old cost factor
+            if new_hash:
+                db_manager.update_device_password_hash(device_id, new_hash)
+                logger.info(f"Rehashed password for device {device_id} at {Config.BCRYPT_ROUNDS} rounds")
+            
             # Generate new tokens (this invalidates old tokens - single session)
-            access_token = self.generate_access_token(device_id)
-            refresh_token = self.generate_refresh_token(device_id)
+            generation = db_manager.bump_token_generation(device_id)
+            self.token_epochs.set(device_id, generation)
+            access_token = self.generate_access_token(device_id, generation, device.device_name)
+            refresh_token = self.generate_refresh_token(device_id, generation, device.device_name)
             
             # Update tokens in database
             db_manager.update_device_tokens(device_id, access_token, refresh_token)
@@ -133,11 +302,13 @@ class DeviceAuthService:
             logger.info(f"Device logged in successfully: ID {device_id}")
             return {
                 'device_id': device_id,
-                'device_name': device['device_name'],
+                'device_name': device.device_name,
                 'access_token': access_token,
                 'refresh_token': refresh_token
             }, None
             
+        except VerifierBusyError:
+            raise
         except Exception as e:
             logger.error(f"Device login failed: {e}")
             return None, "Login failed. Please try again."
@@ -153,14 +324,18 @@ class DeviceAuthService:
             
             device_id = payload.get('device_id')
             
-            # Verify refresh token exists in database
-            device = db_manager.get_device_by_token(refresh_token, 'refresh')
-            
-            if not device or device['device_id'] != device_id:
-                return None, "Refresh token not found or invalid"
+            if self.stateless and 'gen' in payload:
+                if not self._is_current_generation(payload):
+                    return None, "Refresh token not found or invalid"
+            else:
+                # Verify refresh token exists in database
+                device = db_manager.get_device_by_token(refresh_token, 'refresh')
+                
+                if not device or device.device_id != device_id:
+                    return None, "Refresh token not found or invalid"
             
             # Generate new access token
-            new_access_token = self.generate_access_token(device_id)
+            new_access_token = self.generate_access_token(device_id, payload.get('gen'), payload.get('name'))
             
             # Update access token in database
             db_manager.update_device_tokens(device_id, new_access_token, refresh_token)
@@ -179,6 +354,7 @@ class DeviceAuthService:
         """Logout device by invalidating tokens"""
         try:
             db_manager.invalidate_device_tokens(device_id)
+            self.token_epochs.invalidate(device_id)
             logger.info(f"Device logged out: ID {device_id}")
             return True
         except Exception as e:
@@ -186,7 +362,13 @@ class DeviceAuthService:
             return False
     
     def get_device_from_token(self, token):
-        """Get device info from access token"""
+        """
+        Get device info (DeviceRecord) from access token
+        
+        In stateless mode only device_id and device_name are filled in, taken
+        from the token claims. Tokens issued before stateless mode was
+        enabled (no generation claim) are still checked against the database.
+        """
         try:
             payload = self.decode_token(token)
             
@@ -195,10 +377,15 @@ class DeviceAuthService:
             
             device_id = payload.get('device_id')
             
+            if self.stateless and 'gen' in payload:
+                if not self._is_current_generation(payload):
+                    return None
+                return DeviceRecord(device_id=device_id, device_name=payload.get('name'))
+            
             # Verify token exists in database
             device = db_manager.get_device_by_token(token, 'access')
             
-            if device and device['device_id'] == device_id:
+            if device and device.device_id == device_id:
                 return device
             
             return None
@@ -237,7 +424,7 @@ def device_auth_required(f):
         
         # Attach device info to request
         request.device = device
-        request.device_id = device['device_id']
+        request.device_id = device.device_id
         
         return f(*args, **kwargs)
     
@@ -86,6 +86,22 @@ Rules:
 - End with exactly ONE follow-up question
 """
 
+summarize_conversation_prompt = """
+You maintain a running summary of a conversation between a farmer and
+Green Sathi, an agricultural voice assistant.
+
+Update the existing summary with the new exchanges.
+
+Rules:
+- Keep facts the farmer shared (crop, location, problem, quantities)
+- Keep the advice already given, in short form
+- Drop greetings and repeated information
+- Plain text only, no markdown
+- At most 120 words
+
+Return ONLY the updated summary.
+"""
+
 # ============================================================
 # SHARED ERROR MESSAGES
 # ============================================================
@@ -102,17 +118,36 @@ def get_localized_error(language):
     }.get(language, "माफ करें, समस्या हो रही है।")
 
 
-def build_conversation_context(conversation_history):
-    """Build conversation context string from history"""
-    if not conversation_history:
+def build_conversation_context(conversation_history, conversation_summary=None):
+    """Build conversation context string from summary and ConversationTurn history"""
+    if not conversation_history and not conversation_summary:
         return ""
     
     context = ""
-    for conv in conversation_history[-5:]:
-        context += f"User: {conv.get('user_input', '')}"
-        context += f"Assistant: {conv.get('bot_response', '')}"
+    if conversation_summary:
+        context += f"Summary: {conversation_summary}"
+    for conv in (conversation_history or [])[-5:]:
+        context += f"User: {conv.user_input or ''}"
+        context += f"Assistant: {conv.bot_response or ''}"
     return context
 
+
+def build_summary_prompt(previous_summary, new_turns, language):
+    """Build the prompt that folds new turns into the running summary"""
+    exchanges = ""
+    for turn in new_turns:
+        exchanges += f"User: {turn.user_input or ''}\n"
+        exchanges += f"Assistant: {turn.bot_response or ''}\n"
+
+    return summarize_conversation_prompt + f"""
+Write the summary in {language}.
+
+Existing summary:
+"{previous_summary or 'None'}"
+
+New exchanges:
+{exchanges}"""
+
 # ============================================================
 # GEMINI SERVICE (Direct API)
 # ============================================================
@@ -158,9 +193,9 @@ class GeminiService:
             logger.error(f"Gemini detect_language failed: {e}")
             return "hindi"
 
-    def generate_response(self, user_input, language="hindi", conversation_history=None):
+    def generate_response(self, user_input, language="hindi", conversation_history=None, conversation_summary=None):
         try:
-            context = build_conversation_context(conversation_history)
+            context = build_conversation_context(conversation_history, conversation_summary)
 
             prompt = f"""Respond strictly in {language}
                 {f"Previous conversation context:{context}" if context else ""}""" + generate_response_prompt + f"""
@@ -175,6 +210,17 @@ class GeminiService:
             logger.error(f"Gemini generate_response failed: {e}")
             return get_localized_error(language)
 
+    def summarize_conversation(self, previous_summary, new_turns, language="hindi"):
+        try:
+            prompt = build_summary_prompt(previous_summary, new_turns, language)
+
+            response = self.model.generate_content(prompt)
+            return response.text.strip()
+
+        except Exception as e:
+            logger.error(f"Gemini summarize_conversation failed: {e}")
+            return None
+
 
 # ============================================================
 # VERTEX GEMINI SERVICE
@@ -224,9 +270,9 @@ class VertexGeminiService:
             logger.error(f"Vertex detect_language failed: {e}")
             return "hindi"
 
-    def generate_response(self, user_input, language="hindi", conversation_history=None):
+    def generate_response(self, user_input, language="hindi", conversation_history=None, conversation_summary=None):
         try:
-            context = build_conversation_context(conversation_history)
+            context = build_conversation_context(conversation_history, conversation_summary)
 
             prompt = f"""Respond strictly in {language}
                 {f"Previous conversation context:{context}" if context else ""}""" + generate_response_prompt + f"""
@@ -241,6 +287,17 @@ class VertexGeminiService:
             logger.error(f"Vertex generate_response failed: {e}")
             return get_localized_error(language)
 
+    def summarize_conversation(self, previous_summary, new_turns, language="hindi"):
+        try:
+            prompt = build_summary_prompt(previous_summary, new_turns, language)
+
+            response = self.model.generate_content(prompt)
+            return response.text.strip()
+
+        except Exception as e:
+            logger.error(f"Vertex summarize_conversation failed: {e}")
+            return None
+
 
 # ============================================================
 # OPENAI SERVICE
@@ -297,9 +354,9 @@ class OpenAIService:
             logger.error(f"OpenAI detect_language failed: {e}")
             return "hindi"
 
-    def generate_response(self, user_input, language="hindi", conversation_history=None):
+    def generate_response(self, user_input, language="hindi", conversation_history=None, conversation_summary=None):
         try:
-            context = build_conversation_context(conversation_history)
+            context = build_conversation_context(conversation_history, conversation_summary)
 
             prompt = f"""Respond strictly in {language}
                 {f"Previous conversation context:{context}" if context else ""}""" + generate_response_prompt + f"""
@@ -319,6 +376,22 @@ class OpenAIService:
             logger.error(f"OpenAI generate_response failed: {e}")
             return get_localized_error(language)
 
+    def summarize_conversation(self, previous_summary, new_turns, language="hindi"):
+        try:
+            prompt = build_summary_prompt(previous_summary, new_turns, language)
+
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"OpenAI summarize_conversation failed: {e}")
+            return None
+
 
 # ============================================================
 # AZURE OPENAI SERVICE
@@ -390,10 +463,10 @@ class AzureOpenAIService:
             logger.error(f"Azure OpenAI detect_language failed: {e}")
             return "hindi"
 
-    def generate_response(self, user_input, language="hindi", conversation_history=None):
+    def generate_response(self, user_input, language="hindi", conversation_history=None, conversation_summary=None):
         """Generate a farmer-friendly, context-aware response as Green Sathi"""
         try:
-            context = build_conversation_context(conversation_history)
+            context = build_conversation_context(conversation_history, conversation_summary)
 
             prompt = f"""Respond strictly in {language}
                 {f"Previous conversation context:{context}" if context else ""}""" + generate_response_prompt + f"""
@@ -413,6 +486,23 @@ class AzureOpenAIService:
             logger.error(f"Azure OpenAI generate_response failed: {e}")
             return get_localized_error(language)
 
+    def summarize_conversation(self, previous_summary, new_turns, language="hindi"):
+        """Fold new conversation turns into the running session summary"""
+        try:
+            prompt = build_summary_prompt(previous_summary, new_turns, language)
+
+            response = self.client.chat.completions.create(
+                model=self.deployment,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"Azure OpenAI summarize_conversation failed: {e}")
+            return None
+
 
 # ============================================================
 # FALLBACK EXTRACTION (SHARED)
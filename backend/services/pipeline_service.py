@@ -1,8 +1,18 @@
 """Pipeline Service - Orchestrates pipeline selection based on device configuration"""
 import logging
+import threading
+import time
+from datetime import datetime, timedelta
 from backend.models.database import db_manager
 from backend.services.llm_service import gemini_service, openai_service, azure_openai_service, vertex_service
 from backend.services.pipelines import LibraryPipeline, APIPipeline
+from backend.services.pipelines.azure_pool import synthesizer_pool
+from backend.services.speech_prefetch import SpeechPrefetcher
+from backend.services.stt_stream import speech_streams
+from backend.utils.audio_encoding import negotiate_audio_profile, transcode_audio
+from backend.utils.cache import LRUCache
+from backend.utils.noise_profile import noise_profiles
+from backend.utils.single_flight import single_flight
 from backend.utils.config import Config
 
 logger = logging.getLogger(__name__)
@@ -24,10 +34,124 @@ class PipelineService:
             'vertex': vertex_service
         }
         
-        # Cache for instantiated pipelines (keyed by device_id)
-        self.pipeline_cache = {}
+        # Pipelines are stateless per request, so one instance is shared by
+        # every device with the same (pipeline_type, llm_service)
+        self.shared_pipelines = {}
+        self.shared_pipelines_lock = threading.Lock()
+        
+        # Device -> (shared pipeline, audio profile), so the device config
+        # isn't re-read per request
+        self.pipeline_cache = LRUCache(maxsize=Config.PIPELINE_CACHE_SIZE, ttl=Config.PIPELINE_CACHE_TTL)
+        
+        # Cross-worker invalidation: poll for devices whose config changed
+        self.poll_interval = Config.PIPELINE_CACHE_POLL_INTERVAL
+        self.poll_overlap = timedelta(seconds=Config.PIPELINE_CACHE_POLL_OVERLAP)
+        self.last_poll = datetime.utcnow()
+        self.next_poll = time.monotonic() + self.poll_interval
+        self.poll_lock = threading.Lock()
+        self.invalidations = 0
+        self.poll_failures = 0
+        
+        # Concurrent identical TTS/LLM calls share one computation (coalesced in BasePipeline)
+        self.single_flight = single_flight
+        
+        # Speech for generated responses, synthesized before the client asks
+        self.speech_prefetcher = SpeechPrefetcher(self._synthesize_speech)
         logger.info("PipelineService initialized")
     
+    def _poll_config_changes(self):
+        """Drop cached pipelines of devices reconfigured in any worker since the last poll"""
+        if time.monotonic() < self.next_poll:
+            return
+        # One thread polls while the others keep using the cache
+        if not self.poll_lock.acquire(blocking=False):
+            return
+        
+        try:
+            started = datetime.utcnow()
+            for device_id in db_manager.get_devices_config_updated_since(self.last_poll - self.poll_overlap):
+                if self.pipeline_cache.pop(device_id) is not None:
+                    self.invalidations += 1
+                    logger.info(f"Pipeline config changed for device {device_id}, dropped cached pipeline")
+            self.last_poll = started
+        except Exception as e:
+            self.poll_failures += 1
+            logger.error(f"Failed to poll pipeline config changes: {e}")
+        finally:
+            self.next_poll = time.monotonic() + self.poll_interval
+            self.poll_lock.release()
+    
+    def _get_shared_pipeline(self, pipeline_type, llm_service_name):
+        """
+        Get the shared pipeline for a configuration, creating it on first use
+        
+        Args:
+            pipeline_type: 'library' or 'api'
+            llm_service_name: Key into self.llm_services
+            
+        Returns:
+            BasePipeline: Either LibraryPipeline or APIPipeline instance
+        """
+        key = (pipeline_type, llm_service_name)
+        pipeline = self.shared_pipelines.get(key)
+        if pipeline is not None:
+            return pipeline
+        
+        with self.shared_pipelines_lock:
+            pipeline = self.shared_pipelines.get(key)
+            if pipeline is None:
+                llm_service = self.llm_services[llm_service_name]
+                if pipeline_type == 'api':
+                    pipeline = APIPipeline(llm_service)
+                else:
+                    pipeline = LibraryPipeline(llm_service)
+                self.shared_pipelines[key] = pipeline
+                logger.info(f"Created shared {pipeline.__class__.__name__} with {llm_service_name}")
+            return pipeline
+    
+    def _get_device_settings(self, device_id):
+        """
+        Get the pipeline and audio profile for a device, cached per worker
+        
+        Returns:
+            tuple: (BasePipeline, audio profile name or None)
+        """
+        self._poll_config_changes()
+        
+        # Check cache first
+        settings = self.pipeline_cache.get(device_id)
+        if settings is not None:
+            return settings
+        
+        # Get device configuration from database
+        config = db_manager.get_device_pipeline_config(device_id)
+        
+        if not config:
+            logger.warning(f"No pipeline config found for device {device_id}, using defaults")
+            pipeline_type = Config.DEFAULT_PIPELINE_TYPE
+            llm_service_name = Config.DEFAULT_LLM_SERVICE_TYPE
+            audio_profile = None
+        else:
+            pipeline_type = config.get('pipeline_type', Config.DEFAULT_PIPELINE_TYPE)
+            llm_service_name = config.get('llm_service', Config.DEFAULT_LLM_SERVICE_TYPE)
+            audio_profile = config.get('audio_profile')
+        
+        # Validate LLM service
+        if llm_service_name not in self.llm_services:
+            logger.error(f"Invalid LLM service: {llm_service_name}, falling back to gemini")
+            llm_service_name = 'gemini'
+        
+        # Validate pipeline type
+        if pipeline_type not in ('library', 'api'):
+            logger.error(f"Invalid pipeline type: {pipeline_type}, falling back to library")
+            pipeline_type = 'library'
+        
+        settings = (self._get_shared_pipeline(pipeline_type, llm_service_name), audio_profile)
+        
+        # Cache the settings
+        self.pipeline_cache.set(device_id, settings)
+        return settings
+    
     def get_pipeline(self, device_id):
         """
         Get the appropriate pipeline for a device based on its configuration
@@ -39,46 +163,27 @@ class PipelineService:
             BasePipeline: Either LibraryPipeline or APIPipeline instance
         """
         try:
-            # Check cache first
-            if device_id in self.pipeline_cache:
-                return self.pipeline_cache[device_id]
-            
-            # Get device configuration from database
-            config = db_manager.get_device_pipeline_config(device_id)
-            
-            if not config:
-                logger.warning(f"No pipeline config found for device {device_id}, using defaults")
-                pipeline_type = Config.DEFAULT_PIPELINE_TYPE
-                llm_service_name = Config.DEFAULT_LLM_SERVICE_TYPE
-            else:
-                pipeline_type = config.get('pipeline_type', Config.DEFAULT_PIPELINE_TYPE)
-                llm_service_name = config.get('llm_service', Config.DEFAULT_LLM_SERVICE_TYPE)
-            
-            # Get LLM service instance
-            llm_service = self.llm_services.get(llm_service_name)
-            if not llm_service:
-                logger.error(f"Invalid LLM service: {llm_service_name}, falling back to gemini")
-                llm_service = self.llm_services['gemini']
-            
-            # Instantiate pipeline
-            if pipeline_type == 'library':
-                pipeline = LibraryPipeline(llm_service)
-                logger.info(f"Created LibraryPipeline for device {device_id} with {llm_service_name}")
-            elif pipeline_type == 'api':
-                pipeline = APIPipeline(llm_service)
-                logger.info(f"Created APIPipeline for device {device_id} with {llm_service_name}")
-            else:
-                logger.error(f"Invalid pipeline type: {pipeline_type}, falling back to library")
-                pipeline = LibraryPipeline(llm_service)
-            
-            # Cache the pipeline
-            self.pipeline_cache[device_id] = pipeline
-            return pipeline
-            
+            return self._get_device_settings(device_id)[0]
         except Exception as e:
             logger.error(f"Error getting pipeline for device {device_id}: {e}")
             # Fallback to default library pipeline with gemini
-            return LibraryPipeline(self.llm_services['gemini'])
+            return self._get_shared_pipeline('library', 'gemini')
+    
+    def get_audio_profile(self, device_id):
+        """
+        Get the audio output profile configured for a device
+        
+        Args:
+            device_id: Device identifier
+            
+        Returns:
+            str: Profile name or None if the device has none
+        """
+        try:
+            return self._get_device_settings(device_id)[1]
+        except Exception as e:
+            logger.error(f"Error getting audio profile for device {device_id}: {e}")
+            return None
     
     def clear_pipeline_cache(self, device_id=None):
         """
@@ -89,14 +194,28 @@ class PipelineService:
             device_id: Optional device ID to clear. If None, clears all cache.
         """
         if device_id:
-            if device_id in self.pipeline_cache:
-                del self.pipeline_cache[device_id]
+            if self.pipeline_cache.pop(device_id) is not None:
                 logger.info(f"Cleared pipeline cache for device {device_id}")
         else:
             self.pipeline_cache.clear()
             logger.info("Cleared all pipeline cache")
     
-    def speech_to_text(self, device_id, audio_data, language):
+    def get_cache_stats(self):
+        """Get pipeline cache statistics for this worker"""
+        stats = self.pipeline_cache.stats()
+        stats['ttl'] = self.pipeline_cache.ttl
+        stats['invalidations'] = self.invalidations
+        stats['poll_failures'] = self.poll_failures
+        stats['poll_interval'] = self.poll_interval
+        stats['shared_pipelines'] = [f'{pipeline_type}/{llm_service_name}' for pipeline_type, llm_service_name in self.shared_pipelines]
+        stats['azure_synthesizers'] = synthesizer_pool.stats()
+        stats['speech_prefetch'] = self.speech_prefetcher.stats()
+        stats['single_flight'] = self.single_flight.stats()
+        stats['noise_profiles'] = noise_profiles.stats()
+        stats['speech_streams'] = speech_streams.stats()
+        return stats
+    
+    def speech_to_text(self, device_id, audio_data, language, session_id=None):
         """
         Convert speech to text using device-specific pipeline
         
@@ -104,12 +223,31 @@ class PipelineService:
             device_id: Device identifier
             audio_data: Audio file data
             language: Language code
+            session_id: Conversation session, whose noise profile is used if known
             
         Returns:
             str: Recognized text or None
         """
         pipeline = self.get_pipeline(device_id)
-        return pipeline.speech_to_text(audio_data, language)
+        noise_key = noise_profiles.profile_key(session_id, device_id)
+        return pipeline.speech_to_text(audio_data, language, noise_key)
+    
+    def create_stream_recognizer(self, device_id, language, sample_rate, session_id=None):
+        """
+        Create a streaming recognizer using device-specific pipeline
+        
+        Args:
+            device_id: Device identifier
+            language: Language code
+            sample_rate: Samples per second of the streamed PCM
+            session_id: Conversation session, whose noise profile is used if known
+            
+        Returns:
+            Recognizer for SpeechStreamService (see BasePipeline.create_stream_recognizer)
+        """
+        pipeline = self.get_pipeline(device_id)
+        noise_key = noise_profiles.profile_key(session_id, device_id)
+        return pipeline.create_stream_recognizer(language, sample_rate, noise_key)
     
     def text_to_speech(self, device_id, text, language, output_path=None):
         """
@@ -127,6 +265,62 @@ class PipelineService:
         pipeline = self.get_pipeline(device_id)
         return pipeline.text_to_speech(text, language, output_path)
     
+    def _synthesize_speech(self, device_id, text, language, audio_profile):
+        """Synthesize with the device's pipeline, in whatever profile it produces"""
+        # Shared pipelines make identical requests from different devices coalesce
+        return self.get_pipeline(device_id).synthesize(text, language, audio_profile)
+    
+    def prefetch_speech(self, device_id, text, language):
+        """
+        Start synthesizing text the client is expected to request next, so
+        text_to_speech_bytes can attach to the job instead of starting one
+        
+        Args:
+            device_id: Device identifier
+            text: Text to convert
+            language: Language code
+            
+        Returns:
+            bool: True if a prefetch job was started
+        """
+        if not (Config.TTS_PREFETCH_ENABLED and Config.TTS_IN_MEMORY) or not text:
+            return False
+        try:
+            # The profile a plain fetch() of this device negotiates
+            audio_profile = negotiate_audio_profile(None, self.get_audio_profile(device_id))
+            return self.speech_prefetcher.schedule(
+                self.get_pipeline(device_id), device_id, text, language, audio_profile
+            )
+        except Exception as e:
+            logger.error(f"Failed to schedule speech prefetch for device {device_id}: {e}")
+            return False
+    
+    def text_to_speech_bytes(self, device_id, text, language, audio_profile=None):
+        """
+        Convert text to speech in memory using device-specific pipeline and
+        encode it for the requested output profile
+        
+        Speech prefetched for the same text and language by the device's
+        pipeline is used when available.
+        
+        Args:
+            device_id: Device identifier
+            text: Text to convert
+            language: Language code
+            audio_profile: Output profile (Config.AUDIO_OUTPUT_PROFILE if None)
+            
+        Returns:
+            tuple: (audio bytes, audio profile) or (None, None)
+        """
+        audio_profile = audio_profile or Config.AUDIO_OUTPUT_PROFILE
+        pipeline = self.get_pipeline(device_id)
+        audio, produced_profile = self.speech_prefetcher.attach(pipeline, text, language)
+        if audio is None:
+            audio, produced_profile = self._synthesize_speech(device_id, text, language, audio_profile)
+        if audio is None:
+            return None, None
+        return transcode_audio(audio, produced_profile, audio_profile)
+    
     def extract_name_phone(self, device_id, text):
         """
         Extract name and phone using device-specific LLM
@@ -155,7 +349,7 @@ class PipelineService:
         pipeline = self.get_pipeline(device_id)
         return pipeline.detect_language(text)
     
-    def generate_response(self, device_id, user_input, language, conversation_history):
+    def generate_response(self, device_id, user_input, language, conversation_history, conversation_summary=None):
         """
         Generate response using device-specific LLM
         
@@ -164,12 +358,13 @@ class PipelineService:
             user_input: User's input text
             language: Language for response
             conversation_history: Previous conversation turns
+            conversation_summary: Optional running summary of the session
             
         Returns:
             str: Generated response
         """
         pipeline = self.get_pipeline(device_id)
-        return pipeline.generate_response(user_input, language, conversation_history)
+        return pipeline.generate_response(user_input, language, conversation_history, conversation_summary)
     
     def get_device_config_info(self, device_id):
         """
@@ -187,6 +382,7 @@ class PipelineService:
                 'device_id': device_id,
                 'pipeline_type': config.get('pipeline_type'),
                 'llm_service': config.get('llm_service'),
+                'audio_profile': config.get('audio_profile') or Config.AUDIO_OUTPUT_PROFILE,
                 'is_cached': device_id in self.pipeline_cache
             }
         return None
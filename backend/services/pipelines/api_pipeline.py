@@ -1,18 +1,96 @@
 """API-based pipeline using Azure Cognitive Services"""
 import logging
-import os
-import tempfile
+import threading
 import azure.cognitiveservices.speech as speechsdk
 from pydub import AudioSegment
 from .base_pipeline import BasePipeline
+from .azure_pool import azure_output_format, create_speech_config, synthesizer_pool, prewarm_configured_voices
+from backend.utils.audio_preprocessing import prepare_for_recognition, write_wav
 from backend.utils.config import Config
 from backend.utils.markdown_utils import clean_markdown_for_tts
+from backend.utils.scratch_space import scratch_space
 
 logger = logging.getLogger(__name__)
 
 
+class AzureStreamRecognizer:
+    """
+    Azure continuous recognition fed through a PushAudioInputStream, so the
+    service transcribes a streamed utterance while it is being uploaded
+    """
+    
+    def __init__(self, speech_config, sample_rate):
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=sample_rate, bits_per_sample=16, channels=1
+        )
+        self.stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        self.recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=self.stream)
+        )
+        self.partial_text = ''
+        self.segments = []
+        self.error = None
+        self.stopped = threading.Event()
+        
+        self.recognizer.recognizing.connect(self._on_recognizing)
+        self.recognizer.recognized.connect(self._on_recognized)
+        self.recognizer.canceled.connect(self._on_canceled)
+        self.recognizer.session_stopped.connect(lambda evt: self.stopped.set())
+        self.recognizer.start_continuous_recognition_async()
+    
+    def _on_recognizing(self, evt):
+        self.partial_text = ' '.join(self.segments + [evt.result.text])
+    
+    def _on_recognized(self, evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+            self.segments.append(evt.result.text)
+            self.partial_text = ' '.join(self.segments)
+    
+    def _on_canceled(self, evt):
+        if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+            self.error = evt.cancellation_details.error_details
+        self.stopped.set()
+    
+    def push(self, pcm):
+        self.stream.write(pcm)
+    
+    def finish(self, timeout=None):
+        """
+        Close the audio stream and wait for the final result
+        
+        Returns:
+            str: Recognized text or None
+        """
+        self.stream.close()
+        if not self.stopped.wait(timeout):
+            logger.warning(f"Azure streaming STT: no final result within {timeout}s")
+        self.recognizer.stop_continuous_recognition_async().get()
+        
+        if self.error:
+            logger.error(f"Azure streaming STT canceled: {self.error}")
+        text = ' '.join(self.segments)
+        if text:
+            logger.info(f"Azure streaming STT recognized: {text}")
+            return text
+        logger.warning("Azure: No speech could be recognized in stream")
+        return None
+    
+    def cancel(self):
+        self.stream.close()
+        self.recognizer.stop_continuous_recognition_async()
+
+
 class APIPipeline(BasePipeline):
-    """Pipeline using Azure Cognitive Services (real-time STT + TTS)"""
+    """
+    Pipeline using Azure Cognitive Services (real-time STT + TTS)
+    
+    One instance is shared by every device with the same LLM service, so
+    nothing request-specific is stored on it. Synthesis borrows a
+    pre-connected synthesizer for the voice from the shared pool.
+    Recognizers are bound to their audio input and can't be reused, so only
+    their per-language SpeechConfig is cached (read-only once built).
+    """
     
     def __init__(self, llm_service):
         """
@@ -23,70 +101,87 @@ class APIPipeline(BasePipeline):
         """
         super().__init__(llm_service)
         
-        # Initialize Azure Speech Config
+        # Validate Azure Speech credentials up front
         if not Config.AZURE_SPEECH_KEY or not Config.AZURE_SPEECH_REGION:
             logger.error("Azure Speech Services credentials not configured")
             raise ValueError("Azure Speech Services credentials (AZURE_SPEECH_KEY, AZURE_SPEECH_REGION) are required for API pipeline")
         
         try:
-            self.azure_speech_config = speechsdk.SpeechConfig(
-                subscription=Config.AZURE_SPEECH_KEY,
-                region=Config.AZURE_SPEECH_REGION
-            )
+            create_speech_config()
             logger.info("APIPipeline initialized with Azure Cognitive Services")
         except Exception as e:
             logger.error(f"Failed to initialize Azure Speech Config: {e}")
             raise
+        
+        self.recognition_configs = {}
+        prewarm_configured_voices()
+    
+    def _recognition_config(self, language):
+        """SpeechConfig for recognizing one utterance in `language` (cached, never mutated)"""
+        speech_config = self.recognition_configs.get(language)
+        if speech_config is not None:
+            return speech_config
+        
+        speech_config = create_speech_config()
+        speech_config.speech_recognition_language = language
+        
+        # Set silence timeout (2 seconds for faster response)
+        speech_config.set_property(
+            speechsdk.PropertyId.SpeechServiceConnection_InitialSilenceTimeoutMs, "5000"
+        )
+        speech_config.set_property(
+            speechsdk.PropertyId.SpeechServiceConnection_EndSilenceTimeoutMs, "2000"
+        )
+        self.recognition_configs[language] = speech_config
+        return speech_config
     
-    def speech_to_text(self, audio_data, language):
+    def speech_to_text(self, audio_data, language, noise_key=None):
         """
         Convert speech to text using Azure Speech Services
         
         Args:
             audio_data: Audio file path or file-like object
             language: Language code (e.g., 'hi-IN', 'bn-BD')
+            noise_key: Noise profile of the session (NoiseProfileStore.profile_key)
             
         Returns:
             str: Recognized text or None if failed
         """
         try:
-            # Configure language
-            self.azure_speech_config.speech_recognition_language = language
+            # Configure language for this request only
+            speech_config = self._recognition_config(language)
             
-            # Set silence timeout (2 seconds for faster response)
-            self.azure_speech_config.set_property(
-                speechsdk.PropertyId.SpeechServiceConnection_InitialSilenceTimeoutMs, "5000"
-            )
-            self.azure_speech_config.set_property(
-                speechsdk.PropertyId.SpeechServiceConnection_EndSilenceTimeoutMs, "2000"
-            )
-            
-            # Handle different audio input types
-            if isinstance(audio_data, str):
-                # If it's a file path
-                audio_path = audio_data
-            else:
-                # If it's a file-like object (werkzeug FileStorage)
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                audio_data.save(temp_file.name)
+            # Scratch files are removed when the block exits, even on errors
+            with scratch_space.temp_path('.upload') as upload_path, scratch_space.temp_path('.wav') as wav_path:
+                # Handle different audio input types
+                if isinstance(audio_data, str):
+                    # If it's a file path
+                    source_path = audio_data
+                else:
+                    # If it's a file-like object (werkzeug FileStorage)
+                    audio_data.save(upload_path)
+                    source_path = upload_path
                 
-                # Convert to WAV format if needed
-                audio = AudioSegment.from_file(temp_file.name)
-                wav_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                audio.export(wav_file.name, format='wav')
-                audio_path = wav_file.name
-            
-            # Create audio config from file
-            audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
-            
-            # Create recognizer
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.azure_speech_config,
-                audio_config=audio_config
-            )
-            
-            # Perform recognition
-            result = recognizer.recognize_once()
+                # Mono 16 kHz, silence trimmed; skip the Azure call when nobody spoke
+                speech, _ = prepare_for_recognition(AudioSegment.from_file(source_path), noise_key)
+                if speech is None:
+                    logger.info("Azure STT skipped: no speech detected")
+                    return None
+                write_wav(wav_path, speech)
+                
+                # Create audio config from file
+                audio_config = speechsdk.audio.AudioConfig(filename=wav_path)
+                
+                # Create recognizer
+                recognizer = speechsdk.SpeechRecognizer(
+                    speech_config=speech_config,
+                    audio_config=audio_config
+                )
+                
+                # Perform recognition
+                result = recognizer.recognize_once()
+                # Release the recognizer's handle on the file before it is removed
+                del recognizer, audio_config
             
             if result.reason == speechsdk.ResultReason.RecognizedSpeech:
                 logger.info(f"Azure STT recognized: {result.text}")
@@ -106,6 +201,20 @@ class APIPipeline(BasePipeline):
             logger.error(f"Error in Azure STT: {e}")
             return None
     
+    def create_stream_recognizer(self, language, sample_rate, noise_key=None):
+        """
+        Azure continuous recognizer for audio streamed in chunks
+        
+        Args:
+            language: Language code (e.g., 'hi-IN', 'bn-BD')
+            sample_rate: Samples per second of the 16-bit mono PCM chunks
+            noise_key: Unused; the chunks have already passed the stream's speech gate
+            
+        Returns:
+            AzureStreamRecognizer
+        """
+        return AzureStreamRecognizer(self._recognition_config(language), sample_rate)
+    
     def text_to_speech(self, text, language, output_path=None):
         """
         Convert text to speech using Azure Speech Services
@@ -119,45 +228,66 @@ class APIPipeline(BasePipeline):
             str: Path to generated audio file or None if failed
         """
         try:
+            audio, _ = self.text_to_speech_bytes(text, language, 'wav')
+            if audio is None:
+                return None
+            
+            # Create output path if not provided (reclaimed by the scratch janitor)
+            if not output_path:
+                output_path = scratch_space.new_path('.wav', f'tts_azure_{language}_')
+            
+            with open(output_path, 'wb') as audio_file:
+                audio_file.write(audio)
+            logger.info(f"Azure TTS generated: {output_path}")
+            return output_path
+                
+        except Exception as e:
+            logger.error(f"Error in Azure TTS: {e}")
+            return None
+    
+    def text_to_speech_bytes(self, text, language, audio_profile=None):
+        """
+        Convert text to speech using Azure Speech Services, returning the
+        audio from result.audio_data without writing it to disk
+        
+        Args:
+            text: Text to convert (may contain markdown)
+            language: Language code (e.g., 'hi-IN', 'bn-BD')
+            audio_profile: Profile from Config.AUDIO_OUTPUT_PROFILES (Config.AUDIO_OUTPUT_PROFILE if None).
+                           Azure synthesizes it natively when it can, otherwise WAV.
+            
+        Returns:
+            tuple: (audio bytes, produced profile) or (None, None) if failed
+        """
+        try:
+            audio_profile = audio_profile or Config.AUDIO_OUTPUT_PROFILE
+            if azure_output_format(audio_profile) is None:
+                audio_profile = 'wav'
+            
             # Clean markdown formatting before TTS
             clean_text = clean_markdown_for_tts(text)
             logger.info(f"Cleaned text for TTS: {clean_text[:100]}...")
             
             # Get the appropriate voice for the language
             voice_name = Config.AZURE_VOICES.get(language, "hi-IN-SwaraNeural")
-            self.azure_speech_config.speech_synthesis_voice_name = voice_name
             
-            # Create output path if not provided
-            if not output_path:
-                os.makedirs(Config.AUDIO_UPLOAD_FOLDER, exist_ok=True)
-                output_path = os.path.join(
-                    Config.AUDIO_UPLOAD_FOLDER,
-                    f'tts_azure_{hash(clean_text)}_{language}.wav'
-                )
-            
-            # Configure audio output
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
-            
-            # Create synthesizer
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.azure_speech_config,
-                audio_config=audio_config
-            )
-            
-            # Perform synthesis with cleaned text
-            result = synthesizer.speak_text_async(clean_text).get()
+            # Perform synthesis with cleaned text on a pooled, already connected synthesizer
+            with synthesizer_pool.acquire(voice_name, audio_profile) as pooled:
+                result = pooled.synthesizer.speak_text_async(clean_text).get()
+                if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                    pooled.discard()
             
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                logger.info(f"Azure TTS generated: {output_path}")
-                return output_path
+                logger.info(f"Azure TTS generated {len(result.audio_data)} bytes of {audio_profile}")
+                return result.audio_data, audio_profile
             elif result.reason == speechsdk.ResultReason.Canceled:
                 cancellation = result.cancellation_details
                 logger.error(f"Azure TTS canceled: {cancellation.reason}, {cancellation.error_details}")
-                return None
+                return None, None
             else:
                 logger.error(f"Azure TTS error: {result.reason}")
-                return None
+                return None, None
                 
         except Exception as e:
             logger.error(f"Error in Azure TTS: {e}")
-            return None
+            return None, None
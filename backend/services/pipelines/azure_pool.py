@@ -0,0 +1,235 @@
+"""Pool of pre-connected Azure speech synthesizers, keyed by voice and output profile"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import azure.cognitiveservices.speech as speechsdk
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Azure synthesis outputs by (container, sample rate); Azure picks the bitrate
+AZURE_NATIVE_FORMATS = {
+    ('mp3', 16000): speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3,
+    ('mp3', 24000): speechsdk.SpeechSynthesisOutputFormat.Audio24Khz48KBitRateMonoMp3,
+    ('mp3', 48000): speechsdk.SpeechSynthesisOutputFormat.Audio48Khz96KBitRateMonoMp3,
+    ('ogg', 16000): speechsdk.SpeechSynthesisOutputFormat.Ogg16Khz16BitMonoOpus,
+    ('ogg', 24000): speechsdk.SpeechSynthesisOutputFormat.Ogg24Khz16BitMonoOpus,
+    ('ogg', 48000): speechsdk.SpeechSynthesisOutputFormat.Ogg48Khz16BitMonoOpus,
+    ('webm', 16000): speechsdk.SpeechSynthesisOutputFormat.Webm16Khz16BitMonoOpus,
+    ('webm', 24000): speechsdk.SpeechSynthesisOutputFormat.Webm24Khz16Bit24KbpsMonoOpus,
+    ('wav', 16000): speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm,
+    ('wav', 24000): speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm
+}
+
+
+def azure_output_format(audio_profile):
+    """Azure output format that produces `audio_profile` directly (None if Azure can't)"""
+    profile = Config.AUDIO_OUTPUT_PROFILES.get(audio_profile)
+    if not profile:
+        return None
+    return AZURE_NATIVE_FORMATS.get((profile['format'], profile['sample_rate']))
+
+
+def create_speech_config():
+    """Create a SpeechConfig from the configured Azure credentials"""
+    return speechsdk.SpeechConfig(
+        subscription=Config.AZURE_SPEECH_KEY,
+        region=Config.AZURE_SPEECH_REGION
+    )
+
+
+def create_synthesizer(voice_name, audio_profile='wav'):
+    """
+    Create a synthesizer for one voice that returns audio in result.audio_data
+    instead of writing to a file or speaker
+    """
+    speech_config = create_speech_config()
+    speech_config.speech_synthesis_voice_name = voice_name
+    speech_config.set_speech_synthesis_output_format(azure_output_format(audio_profile))
+    return speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+
+
+class PooledSynthesizer:
+    """A synthesizer with its open connection and health state"""
+
+    __slots__ = ('key', 'synthesizer', 'connection', 'created_at', 'last_used', 'uses', 'healthy')
+
+    def __init__(self, key, synthesizer):
+        self.key = key
+        self.synthesizer = synthesizer
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.healthy = True
+
+        # Open the websocket now so the TLS handshake and auth are not paid on first use
+        self.connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        self.connection.disconnected.connect(self._on_disconnected)
+        self.connection.open(True)
+
+    def _on_disconnected(self, event):
+        self.healthy = False
+
+    def discard(self):
+        """Mark the synthesizer as broken so it is not returned to the pool"""
+        self.healthy = False
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing synthesizer connection: {e}")
+
+
+class SynthesizerPool:
+    """
+    Keeps up to `max_per_voice` idle, connected synthesizers per voice and
+    output profile.
+
+    A synthesizer is used by one request at a time: acquire() checks one
+    out (or creates one) and returns it afterwards. Synthesizers whose
+    connection dropped, that were discarded after an error, that have been
+    idle longer than `idle_timeout` or are older than `max_age` are closed
+    instead of reused.
+    """
+
+    def __init__(self, factory=create_synthesizer, max_per_voice=None, idle_timeout=None, max_age=None):
+        self.factory = factory
+        self.max_per_voice = max_per_voice or Config.AZURE_SYNTH_POOL_MAX_PER_VOICE
+        self.idle_timeout = idle_timeout or Config.AZURE_SYNTH_POOL_IDLE_TIMEOUT
+        self.max_age = max_age or Config.AZURE_SYNTH_POOL_MAX_AGE
+
+        self._idle = {}
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self.discarded = 0
+
+    def _is_usable(self, entry, now):
+        return (
+            entry.healthy
+            and now - entry.last_used <= self.idle_timeout
+            and now - entry.created_at <= self.max_age
+        )
+
+    def _checkout(self, key):
+        stale = []
+        entry = None
+        now = time.monotonic()
+
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                # Most recently returned first, it is the least likely to have timed out
+                candidate = idle.pop()
+                if self._is_usable(candidate, now):
+                    entry = candidate
+                    break
+                stale.append(candidate)
+            if entry is not None:
+                self.reused += 1
+            self.recycled += len(stale)
+
+        for candidate in stale:
+            candidate.close()
+
+        if entry is None:
+            entry = PooledSynthesizer(key, self.factory(*key))
+            with self._lock:
+                self.created += 1
+        return entry
+
+    def _checkin(self, entry):
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+
+        if entry.healthy:
+            with self._lock:
+                idle = self._idle.setdefault(entry.key, deque())
+                if len(idle) < self.max_per_voice:
+                    idle.append(entry)
+                    return
+        else:
+            with self._lock:
+                self.discarded += 1
+        entry.close()
+
+    @contextmanager
+    def acquire(self, voice, audio_profile='wav'):
+        """
+        Check out a synthesizer for `voice` producing `audio_profile`
+
+        Yields:
+            PooledSynthesizer: Call discard() on it if synthesis failed
+        """
+        entry = self._checkout((voice, audio_profile))
+        try:
+            yield entry
+        except Exception:
+            entry.discard()
+            raise
+        finally:
+            self._checkin(entry)
+
+    def prewarm(self, voice, audio_profile='wav', count=1):
+        """Open up to `count` idle synthesizers for a voice ahead of traffic"""
+        key = (voice, audio_profile)
+        for _ in range(count):
+            with self._lock:
+                if len(self._idle.get(key, ())) >= self.max_per_voice:
+                    return
+            try:
+                entry = PooledSynthesizer(key, self.factory(*key))
+            except Exception as e:
+                logger.warning(f"Failed to pre-warm synthesizer for {voice}: {e}")
+                return
+            with self._lock:
+                self.created += 1
+            self._checkin(entry)
+
+    def stats(self):
+        """Return pool statistics"""
+        with self._lock:
+            return {
+                'idle': {f'{voice}/{audio_profile}': len(idle) for (voice, audio_profile), idle in self._idle.items()},
+                'max_per_voice': self.max_per_voice,
+                'created': self.created,
+                'reused': self.reused,
+                'recycled': self.recycled,
+                'discarded': self.discarded
+            }
+
+
+# Shared by all APIPipeline instances in the process
+synthesizer_pool = SynthesizerPool()
+
+_prewarm_lock = threading.Lock()
+_prewarm_started = False
+
+
+def prewarm_configured_voices():
+    """Open synthesizers for AZURE_SYNTH_POOL_PREWARM languages in the background (once per process)"""
+    global _prewarm_started
+
+    languages = [code.strip() for code in Config.AZURE_SYNTH_POOL_PREWARM.split(',') if code.strip()]
+    with _prewarm_lock:
+        if _prewarm_started or not languages:
+            return
+        _prewarm_started = True
+
+    audio_profile = Config.AUDIO_OUTPUT_PROFILE
+    if azure_output_format(audio_profile) is None:
+        audio_profile = 'wav'
+
+    def run():
+        for language in languages:
+            voice = Config.AZURE_VOICES.get(language)
+            if voice:
+                synthesizer_pool.prewarm(voice, audio_profile)
+        logger.info(f"Pre-warmed Azure synthesizers for {', '.join(languages)}")
+
+    threading.Thread(target=run, name='azure-synth-prewarm', daemon=True).start()
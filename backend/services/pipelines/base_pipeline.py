@@ -1,12 +1,23 @@
 """Base pipeline class defining the interface for voice processing pipelines"""
 import logging
 from abc import ABC, abstractmethod
+from backend.services.stt_stream import BufferedStreamRecognizer
+from backend.utils.scratch_space import scratch_space
+from backend.utils.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
 
 class BasePipeline(ABC):
-    """Abstract base class for voice processing pipelines"""
+    """
+    Abstract base class for voice processing pipelines
+
+    Concurrent identical calls to synthesize, extract_name_phone and
+    detect_language (e.g. a fleet of kiosks rebooting) share one computation
+    through the global single-flight group. LLM calls are keyed by the LLM
+    service instance, so they also coalesce with the legacy routes that call
+    the default service directly.
+    """
     
     def __init__(self, llm_service):
         """
@@ -19,19 +30,44 @@ class BasePipeline(ABC):
         logger.info(f"Initialized {self.__class__.__name__} with {llm_service.__class__.__name__}")
     
     @abstractmethod
-    def speech_to_text(self, audio_data, language):
+    def speech_to_text(self, audio_data, language, noise_key=None):
         """
         Convert speech to text
         
         Args:
             audio_data: Audio file data or path
             language: Language code for recognition
+            noise_key: Noise profile of the session (NoiseProfileStore.profile_key)
             
         Returns:
             str: Recognized text or None if failed
         """
         pass
     
+    def create_stream_recognizer(self, language, sample_rate, noise_key=None):
+        """
+        Recognizer for audio streamed in chunks (backend/services/stt_stream.py)
+        
+        The default buffers the chunks and runs speech_to_text on the whole
+        utterance when the stream finishes; pipelines whose engine accepts
+        audio as it arrives override this.
+        
+        Args:
+            language: Language code for recognition
+            sample_rate: Samples per second of the 16-bit mono PCM chunks
+            noise_key: Noise profile of the session (NoiseProfileStore.profile_key)
+            
+        Returns:
+            Recognizer with push(pcm), finish(timeout), cancel() and partial_text
+        """
+        def recognize(wav_bytes):
+            with scratch_space.temp_path('.wav') as wav_path:
+                with open(wav_path, 'wb') as wav_file:
+                    wav_file.write(wav_bytes)
+                return self.speech_to_text(wav_path, language, noise_key)
+        
+        return BufferedStreamRecognizer(sample_rate, recognize)
+    
     @abstractmethod
     def text_to_speech(self, text, language, output_path=None):
         """
@@ -47,6 +83,35 @@ class BasePipeline(ABC):
         """
         pass
     
+    @abstractmethod
+    def text_to_speech_bytes(self, text, language, audio_profile=None):
+        """
+        Convert text to speech in memory
+        
+        Args:
+            text: Text to convert
+            language: Language code for synthesis
+            audio_profile: Preferred profile from Config.AUDIO_OUTPUT_PROFILES.
+                           Engines may produce a different one; callers
+                           transcode with backend.utils.audio_encoding.
+            
+        Returns:
+            tuple: (audio bytes, produced profile) or (None, None) if failed
+        """
+        pass
+    
+    def synthesize(self, text, language, audio_profile=None):
+        """
+        text_to_speech_bytes, shared by concurrent identical calls on this pipeline
+        
+        Returns:
+            tuple: (audio bytes, produced profile) or (None, None) if failed
+        """
+        return single_flight.do(
+            ('text_to_speech', self, text, language, audio_profile),
+            self.text_to_speech_bytes, text, language, audio_profile
+        )
+    
     def extract_name_phone(self, text):
         """
         Extract name and phone number from text using LLM
@@ -57,7 +122,10 @@ class BasePipeline(ABC):
         Returns:
             dict: {'name': str, 'phone': str}
         """
-        return self.llm_service.extract_name_phone(text)
+        return single_flight.do(
+            ('extract_name_phone', self.llm_service, text),
+            self.llm_service.extract_name_phone, text
+        )
     
     def detect_language(self, text):
         """
@@ -69,9 +137,12 @@ class BasePipeline(ABC):
         Returns:
             str: Detected language name
         """
-        return self.llm_service.detect_language(text)
+        return single_flight.do(
+            ('detect_language', self.llm_service, text),
+            self.llm_service.detect_language, text
+        )
     
-    def generate_response(self, user_input, language, conversation_history):
+    def generate_response(self, user_input, language, conversation_history, conversation_summary=None):
         """
         Generate conversational response using LLM
         
@@ -79,8 +150,25 @@ class BasePipeline(ABC):
             user_input: User's input text
             language: Language for response
             conversation_history: Previous conversation turns
+            conversation_summary: Optional running summary of the session
             
         Returns:
             str: Generated response
         """
-        return self.llm_service.generate_response(user_input, language, conversation_history)
+        return self.llm_service.generate_response(
+            user_input, language, conversation_history, conversation_summary
+        )
+    
+    def summarize_conversation(self, previous_summary, new_turns, language):
+        """
+        Fold new conversation turns into a running session summary using LLM
+        
+        Args:
+            previous_summary: Existing summary text or None
+            new_turns: Conversation turns not yet covered by the summary
+            language: Language of the conversation
+            
+        Returns:
+            str: Updated summary or None if failed
+        """
+        return self.llm_service.summarize_conversation(previous_summary, new_turns, language)
@@ -1,19 +1,25 @@
 """Library-based pipeline using Google Speech Recognition and gTTS"""
+import io
 import logging
-import os
 import speech_recognition as sr
 from gtts import gTTS
 from pydub import AudioSegment
-import tempfile
 from .base_pipeline import BasePipeline
+from backend.utils.audio_preprocessing import prepare_for_recognition, write_wav
 from backend.utils.config import Config
 from backend.utils.markdown_utils import clean_markdown_for_tts
+from backend.utils.scratch_space import scratch_space
 
 logger = logging.getLogger(__name__)
 
 
 class LibraryPipeline(BasePipeline):
-    """Pipeline using free library-based services (Google STT + gTTS)"""
+    """
+    Pipeline using free library-based services (Google STT + gTTS)
+    
+    One instance is shared by every device with the same LLM service; each
+    call uses its own Recognizer so concurrent requests don't share state.
+    """
     
     def __init__(self, llm_service):
         """
@@ -23,61 +29,47 @@ class LibraryPipeline(BasePipeline):
             llm_service: Instance of an LLM service
         """
         super().__init__(llm_service)
-        self.recognizer = sr.Recognizer()
         logger.info("LibraryPipeline initialized with Google STT and gTTS")
     
-    def speech_to_text(self, audio_data, language):
+    def speech_to_text(self, audio_data, language, noise_key=None):
         """
         Convert speech to text using Google Speech Recognition
         
         Args:
             audio_data: Audio file path or file-like object
             language: Language code (e.g., 'hi-IN', 'bn-BD')
+            noise_key: Noise profile of the session (NoiseProfileStore.profile_key)
             
         Returns:
             str: Recognized text or None if failed
         """
         try:
-            # If audio_data is a file path
-            if isinstance(audio_data, str):
-                # Convert to appropriate format if needed
-                if not audio_data.endswith('.wav'):
-                    audio = AudioSegment.from_file(audio_data)
-                    temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                    audio.export(temp_wav.name, format='wav')
-                    audio_path = temp_wav.name
-                else:
-                    audio_path = audio_data
-                
-                # Recognize speech
-                with sr.AudioFile(audio_path) as source:
-                    audio = self.recognizer.record(source)
-                    text = self.recognizer.recognize_google(audio, language=language)
-                    logger.info(f"Library STT recognized: {text}")
-                    return text
+            recognizer = sr.Recognizer()
             
-            # If audio_data is werkzeug FileStorage or file-like object
-            else:
-                # Save to temporary file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                audio_data.save(temp_file.name)
+            # Scratch files are removed when the block exits, even on errors
+            with scratch_space.temp_path('.upload') as upload_path, scratch_space.temp_path('.wav') as wav_path:
+                # If audio_data is a file path
+                if isinstance(audio_data, str):
+                    source_path = audio_data
+                
+                # If audio_data is werkzeug FileStorage or file-like object
+                else:
+                    audio_data.save(upload_path)
+                    source_path = upload_path
                 
-                # Convert to WAV if needed
-                audio = AudioSegment.from_file(temp_file.name)
-                wav_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                audio.export(wav_file.name, format='wav')
+                # Mono 16 kHz, silence trimmed; skip recognition when nobody spoke
+                speech, _ = prepare_for_recognition(AudioSegment.from_file(source_path), noise_key)
+                if speech is None:
+                    logger.info("Library STT skipped: no speech detected")
+                    return None
+                write_wav(wav_path, speech)
                 
                 # Recognize speech
-                with sr.AudioFile(wav_file.name) as source:
-                    audio = self.recognizer.record(source)
-                    text = self.recognizer.recognize_google(audio, language=language)
-                    logger.info(f"Library STT recognized: {text}")
-                    
-                    # Cleanup temp files
-                    os.unlink(temp_file.name)
-                    os.unlink(wav_file.name)
-                    
-                    return text
+                with sr.AudioFile(wav_path) as source:
+                    audio = recognizer.record(source)
+                text = recognizer.recognize_google(audio, language=language)
+                logger.info(f"Library STT recognized: {text}")
+                return text
                     
         except sr.UnknownValueError:
             logger.warning("Google Speech Recognition could not understand audio")
@@ -106,13 +98,9 @@ class LibraryPipeline(BasePipeline):
             clean_text = clean_markdown_for_tts(text)
             logger.info(f"Cleaned text for TTS: {clean_text[:100]}...")
             
-            # Create output path if not provided
+            # Create output path if not provided (reclaimed by the scratch janitor)
             if not output_path:
-                os.makedirs(Config.AUDIO_UPLOAD_FOLDER, exist_ok=True)
-                output_path = os.path.join(
-                    Config.AUDIO_UPLOAD_FOLDER,
-                    f'tts_{hash(clean_text)}_{language}.mp3'
-                )
+                output_path = scratch_space.new_path('.mp3', f'tts_{language}_')
             
             # Generate speech using gTTS with cleaned text
             tts = gTTS(text=clean_text, lang=language, slow=False)
@@ -124,3 +112,29 @@ class LibraryPipeline(BasePipeline):
         except Exception as e:
             logger.error(f"Error in library TTS: {e}")
             return None
+    
+    def text_to_speech_bytes(self, text, language, audio_profile=None):
+        """
+        Convert text to speech using gTTS without touching the filesystem
+        gTTS only produces MP3, so audio_profile is ignored.
+        
+        Args:
+            text: Text to convert (may contain markdown)
+            language: Language code (e.g., 'hi', 'bn', 'ta')
+            audio_profile: Ignored
+            
+        Returns:
+            tuple: (audio bytes, 'mp3') or (None, None) if failed
+        """
+        try:
+            clean_text = clean_markdown_for_tts(text)
+            logger.info(f"Cleaned text for TTS: {clean_text[:100]}...")
+            
+            buffer = io.BytesIO()
+            gTTS(text=clean_text, lang=language, slow=False).write_to_fp(buffer)
+            logger.info(f"Library TTS generated {buffer.tell()} bytes in memory")
+            return buffer.getvalue(), 'mp3'
+            
+        except Exception as e:
+            logger.error(f"Error in library TTS: {e}")
+            return None, None
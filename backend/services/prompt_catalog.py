@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def manifest_path(catalog_dir):
+    """Path of the manifest inside a catalog directory"""
+    return os.path.join(catalog_dir, MANIFEST_NAME)
+
+
+class PromptCatalog:
+    """
+    In-memory index of the pre-rendered static prompts.
+
+    The catalog is built by executables/build_prompt_catalog.py (once per
+    deploy, before the server starts, see PROCFILE; create_app only logs
+    prompts that are missing):
+    one content-hashed audio file per prompt and language, plus optional
+    pre-encoded variants in other output profiles, described by
+    manifest.json. The manifest is read once per process and, with
+    `in_memory`, so are the clips, so looking a prompt up costs no
+    filesystem calls and never synthesizes audio; a prompt missing from
+    the manifest is simply not found.
+
+    Manifest entries look like:
+        {"file": "name_phone_hi.3f2a...mp3", "sha256": "...", "profile": "mp3",
+         "text_sha256": "...", "bytes": 12345, "mimetype": "audio/mpeg",
+         "variants": {"opus": {"file": "name_phone_hi.9c1e...ogg", "sha256": "...",
+                               "profile": "opus", "bytes": 6789, "mimetype": "audio/ogg"}}}
+    """
+
+    def __init__(self, catalog_dir=None, in_memory=None):
+        self.catalog_dir = catalog_dir or Config.PROMPT_CATALOG_DIR
+        self.in_memory = Config.PROMPT_CATALOG_IN_MEMORY if in_memory is None else in_memory
+        self.prompts = {}
+        self.audio = {}
+        self.generated_at = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def _read_clips(self, prompts):
+        """Read every clip of the manifest into memory, keyed by file name"""
+        audio = {}
+        for languages in prompts.values():
+            for entry in languages.values():
+                for clip in [entry] + list(entry.get('variants', {}).values()):
+                    try:
+                        with open(os.path.join(self.catalog_dir, clip['file']), 'rb') as audio_file:
+                            audio[clip['file']] = audio_file.read()
+                    except OSError as e:
+                        logger.error(f"Failed to read prompt clip {clip['file']}: {e}")
+        return audio
+
+    def load(self):
+        """
+        (Re)load the manifest, and the clips when held in memory
+
+        Returns:
+            int: Number of prompt clips in the catalog
+        """
+        path = manifest_path(self.catalog_dir)
+        try:
+            with open(path, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+            prompts = manifest.get('prompts', {})
+            generated_at = manifest.get('generated_at')
+        except FileNotFoundError:
+            logger.warning(f"Prompt catalog manifest not found at {path}; run executables/build_prompt_catalog.py")
+            prompts, generated_at = {}, None
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load prompt catalog manifest {path}: {e}")
+            prompts, generated_at = {}, None
+
+        audio = self._read_clips(prompts) if self.in_memory else {}
+
+        with self.lock:
+            self.prompts = prompts
+            self.audio = audio
+            self.generated_at = generated_at
+            self.loaded = True
+
+        count = sum(len(languages) for languages in prompts.values())
+        logger.info(
+            f"Prompt catalog loaded: {count} clips from {self.catalog_dir} "
+            f"({sum(len(data) for data in audio.values())} bytes in memory)"
+        )
+        return count
+
+    def missing(self):
+        """
+        Configured prompts the catalog has no clip for
+
+        Returns:
+            list: (prompt_type, language) pairs from Config.LANGUAGE_PROMPTS
+                  and Config.ERROR_PROMPTS
+        """
+        self._ensure_loaded()
+        return [
+            (prompt_type, language)
+            for prompts in (Config.LANGUAGE_PROMPTS, Config.ERROR_PROMPTS)
+            for prompt_type, languages in prompts.items()
+            for language in languages
+            if language not in self.prompts.get(prompt_type, {})
+        ]
+
+    def _ensure_loaded(self):
+        # Normally loaded at startup; this covers scripts and tests
+        if not self.loaded:
+            self.load()
+
+    @staticmethod
+    def language_code(language):
+        """Map a language name (e.g. 'hindi') or code to its code"""
+        language = (language or '').lower()
+        return Config.SUPPORTED_LANGUAGES.get(language, language)
+
+    @staticmethod
+    def _select_variant(entry, accept_header=None, profile=None):
+        """
+        Pick the clip to send: an explicitly requested profile, else the
+        variant the client prefers by Accept (smallest on ties), else the
+        primary clip
+
+        Only variants whose mimetype the client lists explicitly compete with
+        the primary clip, so `*/*` and `audio/*` keep getting the primary MP3.
+        """
+        variants = entry.get('variants', {})
+        if profile:
+            if profile == entry.get('profile'):
+                return entry
+            if profile in variants:
+                return variants[profile]
+        if not accept_header or not variants:
+            return entry
+
+        accept = parse_accept_header(accept_header, MIMEAccept)
+        listed = {value.lower() for value, quality in accept if quality > 0}
+
+        best = entry
+        best_rank = (accept.quality(entry['mimetype']), -entry['bytes'])
+        for variant in variants.values():
+            if variant['mimetype'] == entry['mimetype'] or variant['mimetype'] not in listed:
+                continue
+            rank = (accept.quality(variant['mimetype']), -variant['bytes'])
+            if rank > best_rank:
+                best, best_rank = variant, rank
+        return best
+
+    def get(self, prompt_type, language, accept_header=None, profile=None):
+        """
+        Look up a pre-rendered prompt
+
+        Args:
+            prompt_type: Prompt key from Config.LANGUAGE_PROMPTS or Config.ERROR_PROMPTS
+            language: Language code or name
+            accept_header: Client Accept header, used to choose a pre-encoded variant
+            profile: Output profile requested explicitly (e.g. 'mp3_low')
+
+        Returns:
+            dict: Clip entry with an added absolute 'path', 'audio' (bytes, or
+                  None when not held in memory) and 'has_variants', or None if
+                  the prompt is not in the catalog
+        """
+        self._ensure_loaded()
+        entry = self.prompts.get(prompt_type, {}).get(self.language_code(language))
+        if entry is None:
+            return None
+
+        clip = self._select_variant(entry, accept_header, profile)
+        return dict(
+            clip,
+            path=os.path.abspath(os.path.join(self.catalog_dir, clip['file'])),
+            audio=self.audio.get(clip['file']),
+            has_variants=bool(entry.get('variants'))
+        )
+
+    def stats(self):
+        """Return catalog statistics"""
+        with self.lock:
+            return {
+                'catalog_dir': self.catalog_dir,
+                'loaded': self.loaded,
+                'generated_at': self.generated_at,
+                'prompt_types': len(self.prompts),
+                'clips': sum(len(languages) for languages in self.prompts.values()),
+                'in_memory': self.in_memory,
+                'memory_bytes': sum(len(data) for data in self.audio.values())
+            }
+
+
+# Global prompt catalog instance
+prompt_catalog = PromptCatalog()
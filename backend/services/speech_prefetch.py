@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError
+from backend.utils.cache import LRUCache
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechPrefetcher:
+    """
+    Speculative text-to-speech for utterances the client is about to request.
+
+    As soon as the text of the next utterance exists (e.g. an LLM response
+    before it is returned), schedule() starts synthesizing it on a small
+    background pool. The later TTS request calls attach() with the same
+    text, language and scope and takes over the job: it waits for a running
+    job, reuses a finished one, and cancels one that hasn't started yet so
+    the caller can synthesize inline without queueing behind speculation.
+
+    The scope is whatever determines the voice besides text and language
+    (the device's pipeline), so a job is only ever handed to requests that
+    would have synthesized the same speech.
+
+    Jobs are kept per worker process for `ttl` seconds, so a request served
+    by another worker simply misses and synthesizes as before. Speculation
+    is shed first under load: nothing is scheduled while `max_pending` jobs
+    are queued or running.
+    """
+
+    def __init__(self, synthesize, workers=None, max_pending=None, cache_size=None, ttl=None, wait_timeout=None):
+        """
+        Args:
+            synthesize: callable(device_id, text, language, audio_profile) -> (audio bytes, profile)
+        """
+        self.synthesize = synthesize
+        self.workers = workers or Config.TTS_PREFETCH_WORKERS
+        self.max_pending = max_pending or Config.TTS_PREFETCH_MAX_PENDING
+        self.wait_timeout = wait_timeout or Config.TTS_PREFETCH_WAIT_TIMEOUT
+
+        self.jobs = LRUCache(
+            maxsize=cache_size or Config.TTS_PREFETCH_CACHE_SIZE,
+            ttl=ttl or Config.TTS_PREFETCH_TTL
+        )
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.scheduled = 0
+        self.shed = 0
+        self.attached = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    @staticmethod
+    def job_key(scope, text, language):
+        """Key of the job for an utterance synthesized by `scope`"""
+        return scope, language, hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _get_executor(self):
+        # Created on first use so each gunicorn worker gets its own threads after fork
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tts-prefetch')
+        return self._executor
+
+    def _job_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def schedule(self, scope, device_id, text, language, audio_profile):
+        """
+        Start synthesizing an utterance in the background
+
+        Args:
+            scope: Synthesizer of the device (e.g. its pipeline); part of the job key
+
+        Returns:
+            bool: True if a job was started, False if one exists or load is too high
+        """
+        key = self.job_key(scope, text, language)
+        with self._lock:
+            if key in self.jobs:
+                return False
+            if self._pending >= self.max_pending:
+                self.shed += 1
+                return False
+            future = self._get_executor().submit(self.synthesize, device_id, text, language, audio_profile)
+            self._pending += 1
+            self.scheduled += 1
+            self.jobs.set(key, future)
+        future.add_done_callback(self._job_done)
+        return True
+
+    def attach(self, scope, text, language):
+        """
+        Take over the job for an utterance
+
+        Returns:
+            tuple: (audio bytes, audio profile) or (None, None) if there is no
+                   usable job and the caller should synthesize itself
+        """
+        key = self.job_key(scope, text, language)
+        future = self.jobs.get(key)
+        if future is None:
+            return None, None
+
+        if future.cancel():
+            # Still queued: the caller is faster doing it inline
+            self.jobs.pop(key)
+            self.cancelled += 1
+            return None, None
+
+        try:
+            audio, audio_profile = future.result(timeout=self.wait_timeout)
+        except (TimeoutError, CancelledError):
+            logger.warning(f"Prefetched speech for {language} not ready after {self.wait_timeout}s")
+            return None, None
+        except Exception as e:
+            self.jobs.pop(key)
+            self.failed += 1
+            logger.error(f"Prefetched speech synthesis failed: {e}")
+            return None, None
+
+        if audio is None:
+            self.jobs.pop(key)
+            self.failed += 1
+            return None, None
+
+        self.attached += 1
+        return audio, audio_profile
+
+    def stats(self):
+        """Return prefetch statistics"""
+        with self._lock:
+            pending = self._pending
+        return {
+            'jobs': len(self.jobs),
+            'pending': pending,
+            'scheduled': self.scheduled,
+            'shed': self.shed,
+            'attached': self.attached,
+            'cancelled': self.cancelled,
+            'failed': self.failed
+        }
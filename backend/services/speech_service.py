@@ -1,11 +1,15 @@
 import speech_recognition as sr
 from gtts import gTTS
+import io
 import os
 import logging
 from pydub import AudioSegment
 import azure.cognitiveservices.speech as speechsdk
+from backend.utils.audio_preprocessing import prepare_for_recognition, segment_samples, write_wav
 from backend.utils.config import Config
 from backend.utils.markdown_utils import clean_markdown_for_tts
+from backend.utils.scratch_space import scratch_space
+from backend.utils.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -129,10 +133,10 @@ class SpeechService:
     def speech_to_text(self, audio_file_path, language='hi-IN'):
         """Convert audio file to text with support for Indian languages"""
         try:
+            # No ambient-noise calibration here: it consumed the first 0.5s of
+            # speech. Silence is trimmed beforehand against the session's
+            # noise profile (backend/utils/noise_profile.py).
             with sr.AudioFile(audio_file_path) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
                 # Record the audio
                 audio = self.recognizer.record(source)
                 
@@ -161,12 +165,9 @@ class SpeechService:
             # Create TTS object
             tts = gTTS(text=clean_text, lang=language, slow=False)
             
-            # Generate output path if not provided
+            # Generate output path if not provided (reclaimed by the scratch janitor)
             if not output_path:
-                output_path = os.path.join(
-                    Config.AUDIO_UPLOAD_FOLDER, 
-                    f"tts_{hash(clean_text)}_{language}.mp3"
-                )
+                output_path = scratch_space.new_path('.mp3', f'tts_{language}_')
             
             # Save to file
             tts.save(output_path)
@@ -177,6 +178,27 @@ class SpeechService:
             logger.error(f"Error in text-to-speech: {e}")
             return None
     
+    def text_to_speech_bytes(self, text, language='en'):
+        """
+        Convert text to MP3 speech in memory; concurrent identical calls
+        share one gTTS request
+        
+        Returns:
+            bytes: MP3 audio or None if failed
+        """
+        clean_text = clean_markdown_for_tts(text)
+        return single_flight.do(('text_to_speech', 'gtts', clean_text, language), self._gtts_bytes, clean_text, language)
+    
+    @staticmethod
+    def _gtts_bytes(text, language):
+        try:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=language, slow=False).write_to_fp(buffer)
+            return buffer.getvalue()
+        except Exception as e:
+            logger.error(f"Error in text-to-speech: {e}")
+            return None
+    
     def convert_audio_format(self, input_path, output_path=None, target_format='wav'):
         """Convert audio file to different format with proper PCM WAV settings"""
         try:
@@ -187,15 +209,11 @@ class SpeechService:
             # Load and convert audio with specific settings for speech recognition
             audio = AudioSegment.from_file(input_path)
             
-            # Convert to mono, 16kHz, 16-bit PCM WAV format for better compatibility
-            audio = audio.set_channels(1)  # Mono
-            audio = audio.set_frame_rate(16000)  # 16kHz sample rate
-            audio = audio.set_sample_width(2)  # 16-bit
-            
-            # Export with PCM format
             if target_format == 'wav':
-                audio.export(output_path, format="wav", parameters=["-acodec", "pcm_s16le"])
+                # Mono, 16kHz, 16-bit PCM WAV, converted in NumPy
+                write_wav(output_path, segment_samples(audio))
             else:
+                audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
                 audio.export(output_path, format=target_format)
             
             logger.info(f"Audio converted to: {output_path}")
@@ -205,52 +223,39 @@ class SpeechService:
             logger.error(f"Error converting audio: {e}")
             return None
     
-    def process_uploaded_audio(self, audio_data, filename, language='hindi'):
+    def process_uploaded_audio(self, audio_data, filename, language='hindi', noise_key=None):
         """Process uploaded audio data and convert to text with improved format handling"""
         try:
-            # Save uploaded file
-            temp_path = os.path.join(Config.AUDIO_UPLOAD_FOLDER, filename)
-            
-            with open(temp_path, 'wb') as f:
-                f.write(audio_data)
-            
-            # Always convert to proper WAV format for speech recognition compatibility
-            wav_filename = f"{os.path.splitext(filename)[0]}_converted.wav"
-            wav_path = os.path.join(Config.AUDIO_UPLOAD_FOLDER, wav_filename)
-            
-            # Convert to PCM WAV format
-            converted_path = self.convert_audio_format(temp_path, wav_path, 'wav')
-            
-            if not converted_path:
-                logger.error("Failed to convert audio to WAV format")
-                # Clean up original file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return None
-            
-            # Get proper language code for speech recognition
-            speech_lang = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
-            
-            # Perform speech recognition on converted file
-            text = self.speech_to_text(converted_path, speech_lang)
-            
-            # Clean up temporary files
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(converted_path):
-                os.remove(converted_path)
+            extension = os.path.splitext(filename)[1]
             
-            return text
+            # Scratch files are removed when the block exits, even on errors
+            with scratch_space.temp_path(extension) as temp_path, scratch_space.temp_path('_converted.wav') as wav_path:
+                # Save uploaded file
+                with open(temp_path, 'wb') as f:
+                    f.write(audio_data)
+                
+                # Always convert to proper PCM WAV format for speech recognition compatibility
+                try:
+                    audio = AudioSegment.from_file(temp_path)
+                except Exception as e:
+                    logger.error(f"Failed to convert audio to WAV format: {e}")
+                    return None
+                
+                # Mono 16 kHz, silence trimmed; skip recognition when nobody spoke
+                speech, _ = prepare_for_recognition(audio, noise_key)
+                if speech is None:
+                    logger.info("Speech recognition skipped: no speech detected")
+                    return None
+                write_wav(wav_path, speech)
+                
+                # Get proper language code for speech recognition
+                speech_lang = Config.SPEECH_RECOGNITION_LANGUAGES.get(language, 'hi-IN')
+                
+                # Perform speech recognition on converted file
+                return self.speech_to_text(wav_path, speech_lang)
             
         except Exception as e:
             logger.error(f"Error processing uploaded audio: {e}")
-            # Clean up files in case of error
-            for file_path in [temp_path, wav_path if 'wav_path' in locals() else None]:
-                if file_path and os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
             return None
     
     def validate_audio_file(self, file_path):
@@ -263,29 +268,6 @@ class SpeechService:
         except Exception as e:
             logger.error(f"Audio validation failed for {file_path}: {e}")
             return False
-    
-    def create_static_audio(self, text, language='hi', filename=None):
-        """Create static audio file for predefined prompts"""
-        try:
-            if not filename:
-                safe_text = "".join(c for c in text[:30] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                filename = f"static_{safe_text.replace(' ', '_')}_{language}.mp3"
-            
-            output_path = os.path.join('static', 'audio', filename)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Generate TTS
-            tts = gTTS(text=text, lang=language, slow=False)
-            tts.save(output_path)
-            
-            logger.info(f"Static audio created: {output_path}")
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"Error creating static audio: {e}")
-            return None
 
 # Global service instance
 speech_service = SpeechService()
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Streaming speech recognition: audio uploaded in chunks while the user speaks.
+
+A client opens a stream, posts raw 16-bit little-endian mono PCM chunks as
+they are captured, and asks for the transcript when its own end-of-speech
+detection fires. A SpeechGate holds back the leading silence; the first
+speech chunk creates the recognizer (Azure's continuous recognizer on a
+push stream, or a buffered recognizer for pipelines that only recognize
+whole files), which then receives every chunk as it arrives. By the time
+the client finishes, the streaming recognizer has already heard the
+utterance, so only its final result is left to wait for. A stream that
+never opened its gate is answered without an STT call.
+
+Streams live in the memory of the worker process that started them;
+deployments with several workers must route a stream's requests to the
+same worker (sticky sessions).
+"""
+import io
+import logging
+import threading
+import uuid
+import wave
+import numpy as np
+from backend.utils.audio_vad import SpeechGate
+from backend.utils.cache import LRUCache
+from backend.utils.config import Config
+from backend.utils.noise_profile import noise_profiles
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownStreamError(Exception):
+    """Raised for a stream id that was never started, already finished or expired"""
+
+
+class StreamTooLongError(Exception):
+    """Raised when a stream exceeds STT_STREAM_MAX_SECONDS of audio"""
+
+
+class BufferedStreamRecognizer:
+    """
+    Streaming recognizer for engines that only recognize complete files:
+    collects the gated PCM and recognizes it as one WAV on finish
+    """
+
+    partial_text = ''
+
+    def __init__(self, sample_rate, recognize):
+        """
+        Args:
+            sample_rate: Samples per second of the pushed PCM
+            recognize: Callable taking WAV bytes, returning text or None
+        """
+        self.sample_rate = sample_rate
+        self.recognize = recognize
+        self._chunks = []
+
+    def push(self, pcm):
+        self._chunks.append(pcm)
+
+    def finish(self, timeout=None):
+        """
+        Returns:
+            str: Recognized text or None
+        """
+        output = io.BytesIO()
+        with wave.open(output, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(b''.join(self._chunks))
+        self._chunks = []
+        return self.recognize(output.getvalue())
+
+    def cancel(self):
+        self._chunks = []
+
+
+class SpeechStream:
+    """State of one open stream"""
+
+    __slots__ = ('create_recognizer', 'sample_rate', 'noise_key', 'gate', 'recognizer', 'received', 'closed', 'lock')
+
+    def __init__(self, create_recognizer, sample_rate, noise_key):
+        self.create_recognizer = create_recognizer
+        self.sample_rate = sample_rate
+        self.noise_key = noise_key
+        self.gate = SpeechGate(sample_rate, noise_floor=noise_profiles.get(noise_key), scale=1 / 32768)
+        self.recognizer = None
+        self.received = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+
+class SpeechStreamService:
+    """
+    Open streams of this worker, keyed by stream id. A stream the client
+    stops sending to expires after STT_STREAM_IDLE_TTL seconds and its
+    recognizer is cancelled.
+    """
+
+    def __init__(self, max_streams=None, idle_ttl=None, max_seconds=None, finish_timeout=None):
+        self.max_seconds = max_seconds or Config.STT_STREAM_MAX_SECONDS
+        self.finish_timeout = finish_timeout or Config.STT_STREAM_FINISH_TIMEOUT
+        self.streams = LRUCache(
+            maxsize=max_streams or Config.STT_STREAM_MAX_STREAMS,
+            ttl=idle_ttl or Config.STT_STREAM_IDLE_TTL,
+            sliding=True,
+            on_evict=self._abandoned
+        )
+
+        self.started = 0
+        self.finished = 0
+        self.empty = 0
+        self.abandoned = 0
+        self.failed = 0
+
+    def _abandoned(self, stream_id, stream):
+        """Eviction callback: release the recognizer of a stream nobody finished"""
+        self.abandoned += 1
+        logger.info(f"STT stream {stream_id} abandoned after {stream.received / stream.sample_rate:.1f}s of audio")
+        with stream.lock:
+            self._close(stream)
+
+    @staticmethod
+    def _close(stream):
+        """Mark a stream closed and cancel its recognizer (caller holds stream.lock)"""
+        stream.closed = True
+        recognizer, stream.recognizer = stream.recognizer, None
+        if recognizer is not None:
+            try:
+                recognizer.cancel()
+            except Exception as e:
+                logger.error(f"Error cancelling STT stream recognizer: {e}")
+
+    def start(self, create_recognizer, sample_rate, noise_key=None):
+        """
+        Open a stream
+
+        Args:
+            create_recognizer: Callable returning a recognizer (push, finish,
+                               cancel, partial_text), called on the first speech
+            sample_rate: Samples per second of the PCM the client will send
+            noise_key: Noise profile of the session (NoiseProfileStore.profile_key)
+
+        Returns:
+            str: Stream id
+        """
+        stream_id = uuid.uuid4().hex
+        self.streams.set(stream_id, SpeechStream(create_recognizer, sample_rate, noise_key))
+        self.started += 1
+        return stream_id
+
+    def _get(self, stream_id):
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            raise UnknownStreamError(stream_id)
+        return stream
+
+    def push(self, stream_id, pcm):
+        """
+        Feed a chunk of 16-bit little-endian mono PCM
+
+        Returns:
+            tuple: (status dict with speech, received_ms and partial, error message or None)
+
+        Raises:
+            UnknownStreamError: Stream not open in this worker
+            StreamTooLongError: Stream exceeds STT_STREAM_MAX_SECONDS
+        """
+        stream = self._get(stream_id)
+        if len(pcm) % 2:
+            return None, 'Chunk must hold whole 16-bit samples'
+
+        with stream.lock:
+            if stream.closed:
+                # Finished or cancelled while this chunk was waiting for the lock
+                raise UnknownStreamError(stream_id)
+            stream.received += len(pcm) // 2
+            if stream.received > self.max_seconds * stream.sample_rate:
+                self.streams.pop(stream_id)
+                self._close(stream)
+                raise StreamTooLongError(stream_id)
+
+            opening = not stream.gate.is_open
+            forward = stream.gate.feed(np.frombuffer(pcm, dtype='<i2'))
+            if len(forward):
+                if opening:
+                    noise_profiles.observe_level(stream.noise_key, self._leading_noise(stream.gate))
+                    try:
+                        stream.recognizer = stream.create_recognizer()
+                    except Exception:
+                        self.streams.pop(stream_id)
+                        stream.closed = True
+                        self.failed += 1
+                        raise
+                stream.recognizer.push(forward.tobytes())
+
+            return {
+                'speech': stream.gate.is_open,
+                'received_ms': stream.received * 1000 // stream.sample_rate,
+                'partial': stream.recognizer.partial_text if stream.recognizer else ''
+            }, None
+
+    @staticmethod
+    def _leading_noise(gate):
+        if gate.leading_silence_ms < noise_profiles.min_silence_ms:
+            return None
+        return gate.noise_level()
+
+    def finish(self, stream_id):
+        """
+        Close a stream and wait for its transcript
+
+        Returns:
+            tuple: (text or None, bool whether any speech was heard)
+
+        Raises:
+            UnknownStreamError: Stream not open in this worker
+        """
+        stream = self._get(stream_id)
+        self.streams.pop(stream_id)
+
+        with stream.lock:
+            if stream.closed:
+                raise UnknownStreamError(stream_id)
+            stream.closed = True
+            recognizer, stream.recognizer = stream.recognizer, None
+            if recognizer is None:
+                self.empty += 1
+                logger.info(f"STT stream {stream_id} held no speech, recognition skipped")
+                return None, False
+
+            try:
+                text = recognizer.finish(self.finish_timeout)
+            except Exception as e:
+                logger.error(f"Error finishing STT stream {stream_id}: {e}")
+                text = None
+
+        if text:
+            self.finished += 1
+        else:
+            self.failed += 1
+        return text, True
+
+    def cancel(self, stream_id):
+        """
+        Drop a stream without recognizing it
+
+        Returns:
+            bool: True if the stream was open
+        """
+        stream = self.streams.pop(stream_id)
+        if stream is None:
+            return False
+        with stream.lock:
+            self._close(stream)
+        return True
+
+    def stats(self):
+        """Return streaming STT statistics"""
+        return {
+            'open': len(self.streams),
+            'started': self.started,
+            'finished': self.finished,
+            'empty': self.empty,
+            'abandoned': self.abandoned,
+            'failed': self.failed
+        }
+
+
+# Global streaming STT service
+speech_streams = SpeechStreamService()
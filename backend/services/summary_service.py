@@ -0,0 +1,140 @@
+"""Conversation Summary Service - Keeps a rolling per-session summary off the request path"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from backend.models.database import db_manager
+from backend.models.records import ConversationTurn
+from backend.utils.cache import LRUCache
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSummaryService:
+    """
+    Maintains a compact running summary for each (user_id, session_id).
+    New turns are folded into the summary by a background worker after they
+    are saved, so prompts carry the summary plus the latest turns instead of
+    the raw history and stay the same size however long a session runs.
+    """
+
+    def __init__(self):
+        """Initialize the background summarizer"""
+        self.enabled = Config.CONVERSATION_SUMMARY_ENABLED
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.CONVERSATION_SUMMARY_WORKERS,
+            thread_name_prefix='conversation-summary'
+        )
+
+        # Turns waiting to be folded in, keyed by (user_id, session_id).
+        # A key is present while a worker owns that session.
+        self.pending_turns = {}
+        # Turns whose summary update failed, retried with the session's next turn.
+        # covered_until only advances on success, so they stay in the prompt meanwhile
+        self.unsummarized_turns = LRUCache(
+            maxsize=Config.SESSION_CONTEXT_MAX_SESSIONS,
+            ttl=Config.SESSION_CONTEXT_IDLE_TTL,
+            sliding=True
+        )
+        self.lock = threading.Lock()
+        logger.info(f"ConversationSummaryService initialized (enabled={self.enabled})")
+
+    def schedule_update(self, pipeline, user_id, session_id, user_input, bot_response, language):
+        """
+        Queue a saved turn to be folded into the session summary
+
+        Args:
+            pipeline: Pipeline whose LLM produces the summary
+            user_id: User identifier
+            session_id: Conversation session identifier
+            user_input: User's input text
+            bot_response: Assistant's response text
+            language: Language of the conversation
+        """
+        if not self.enabled or not user_id or not session_id:
+            return
+
+        key = (user_id, session_id)
+        turn = ConversationTurn(
+            session_id=session_id,
+            user_input=user_input,
+            bot_response=bot_response,
+            timestamp=datetime.utcnow()
+        )
+
+        with self.lock:
+            if key in self.pending_turns:
+                # A worker is already running for this session and will pick it up
+                self.pending_turns[key].append(turn)
+                return
+            self.pending_turns[key] = self.unsummarized_turns.pop(key, []) + [turn]
+
+        self.executor.submit(self._drain_session, pipeline, key, language)
+
+    def _drain_session(self, pipeline, key, language):
+        """Fold pending turns for one session until none are left"""
+        user_id, session_id = key
+
+        while True:
+            with self.lock:
+                turns = self.pending_turns.get(key)
+                if not turns:
+                    del self.pending_turns[key]
+                    return
+                self.pending_turns[key] = []
+
+            try:
+                summary_doc = db_manager.get_conversation_summary(user_id, session_id)
+                previous_summary = summary_doc.get('summary') if summary_doc else None
+
+                summary = pipeline.summarize_conversation(previous_summary, turns, language)
+                if summary:
+                    db_manager.save_conversation_summary(
+                        user_id, session_id, summary, turns[-1].timestamp, len(turns)
+                    )
+                    logger.info(f"Updated conversation summary for session {session_id} (+{len(turns)} turns)")
+                    continue
+                logger.warning(f"No conversation summary produced for session {session_id}")
+            except Exception as e:
+                logger.error(f"Failed to update conversation summary for session {session_id}: {e}")
+
+            # Keep the turns (capped) and retry them with the session's next turn
+            with self.lock:
+                retry = (turns + self.pending_turns.pop(key))[-Config.CONVERSATION_SUMMARY_MAX_PENDING_TURNS:]
+                self.unsummarized_turns.set(key, retry)
+            return
+
+    def select_prompt_history(self, user_id, session_id, conversation_history):
+        """
+        Pick what goes into the prompt for a session
+
+        Args:
+            user_id: User identifier
+            session_id: Conversation session identifier
+            conversation_history: Recent turns, newest first
+
+        Returns:
+            tuple: (turns not yet covered by the summary, summary text or None).
+                   The latest turn is always kept verbatim.
+        """
+        if not self.enabled or not session_id or not conversation_history:
+            return conversation_history, None
+
+        summary_doc = db_manager.get_conversation_summary(user_id, session_id)
+        if not summary_doc or not summary_doc.get('summary'):
+            return conversation_history, None
+
+        covered_until = summary_doc.get('covered_until')
+        recent_turns = [
+            conv for conv in conversation_history
+            if not covered_until or not conv.timestamp or conv.timestamp > covered_until
+        ]
+        if not recent_turns:
+            recent_turns = conversation_history[:1]
+
+        return recent_turns, summary_doc['summary']
+
+
+# Global summary service instance
+summary_service = ConversationSummaryService()
@@ -0,0 +1,104 @@
+"""Output audio profiles, Accept-based negotiation and the shared transcoding stage"""
+import io
+import logging
+from pydub import AudioSegment
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def get_profile(name):
+    """Get an output profile by name (None if unknown)"""
+    return Config.AUDIO_OUTPUT_PROFILES.get(name)
+
+
+def profile_mimetype(name):
+    """Mimetype of the audio produced by a profile"""
+    return Config.AUDIO_FORMATS[Config.AUDIO_OUTPUT_PROFILES[name]['format']]
+
+
+def profile_extension(name):
+    """File extension of the audio produced by a profile"""
+    return Config.AUDIO_OUTPUT_PROFILES[name]['format']
+
+
+def negotiate_audio_profile(accept_header=None, device_profile=None):
+    """
+    Pick the output profile for a response
+
+    The device profile (set per kiosk for its link quality) wins when the
+    client accepts its format, then the server default, then the profile
+    for the client's most preferred format.
+
+    Args:
+        accept_header: Raw Accept header or None
+        device_profile: Profile name configured for the device, if any
+
+    Returns:
+        str: Profile name from Config.AUDIO_OUTPUT_PROFILES
+    """
+    default_profile = Config.AUDIO_OUTPUT_PROFILE
+    if not accept_header:
+        return device_profile if get_profile(device_profile) else default_profile
+
+    accept = parse_accept_header(accept_header, MIMEAccept)
+
+    def accepted(name):
+        profile = get_profile(name)
+        return profile is not None and accept.quality(Config.AUDIO_FORMATS[profile['format']]) > 0
+
+    for name in (device_profile, default_profile):
+        if name and accepted(name):
+            return name
+
+    # Fall back to the first profile of the client's best supported format
+    best_quality = 0
+    best_profile = None
+    for name, profile in Config.AUDIO_OUTPUT_PROFILES.items():
+        quality = accept.quality(Config.AUDIO_FORMATS[profile['format']])
+        if quality > best_quality:
+            best_quality = quality
+            best_profile = name
+    return best_profile or default_profile
+
+
+def transcode_audio(audio, source_profile, target_profile):
+    """
+    Re-encode synthesized audio for the target profile
+
+    Both pipelines run their output through here; it is a no-op when the
+    engine already produced the target profile.
+
+    Args:
+        audio: Encoded audio bytes
+        source_profile: Profile the engine produced
+        target_profile: Profile the client should receive
+
+    Returns:
+        tuple: (audio bytes, profile name). On failure the source audio is
+               returned unchanged with its own profile.
+    """
+    if source_profile == target_profile or not get_profile(target_profile):
+        return audio, source_profile
+
+    source = get_profile(source_profile)
+    target = get_profile(target_profile)
+    try:
+        segment = AudioSegment.from_file(io.BytesIO(audio), format=source['format'])
+        segment = segment.set_channels(1).set_frame_rate(target['sample_rate'])
+
+        output = io.BytesIO()
+        segment.export(
+            output,
+            format=target['format'],
+            codec=target.get('codec'),
+            bitrate=target.get('bitrate')
+        )
+        encoded = output.getvalue()
+        logger.info(f"Transcoded audio {source_profile} -> {target_profile} ({len(audio)} -> {len(encoded)} bytes)")
+        return encoded, target_profile
+    except Exception as e:
+        logger.error(f"Failed to transcode audio {source_profile} -> {target_profile}: {e}")
+        return audio, source_profile
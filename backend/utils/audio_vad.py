@@ -0,0 +1,232 @@
+"""
+Energy / zero-crossing voice activity detection for uploaded speech.
+
+Kiosk recordings carry leading noise and the ~2 s of trailing silence the
+client waits for before it stops recording. Trimming them before STT
+shortens what the recognizer has to process, and clips with no speech at
+all are rejected without calling a provider.
+
+A frame counts as speech when its RMS energy is above the threshold
+(voiced sounds), or when it is above half the threshold and crosses zero
+often (quiet unvoiced sounds such as "s" or "sh"). The threshold adapts to
+the recording: a multiple of its noise floor (the quietest frames), but
+never below an absolute minimum level.
+
+Recordings reach the detector through the preprocessing stage in
+backend/utils/audio_preprocessing.py.
+"""
+import numpy as np
+from backend.utils.config import Config
+
+
+class VadResult:
+    """Speech bounds found in a recording (sample offsets, end exclusive)"""
+
+    __slots__ = ('start', 'end', 'speech_ms', 'noise_floor', 'threshold')
+
+    def __init__(self, start, end, speech_ms, noise_floor, threshold):
+        self.start = start
+        self.end = end
+        self.speech_ms = speech_ms
+        self.noise_floor = noise_floor
+        self.threshold = threshold
+
+    @property
+    def has_speech(self):
+        return self.end > self.start
+
+    def __repr__(self):
+        return (
+            f'VadResult(start={self.start}, end={self.end}, speech_ms={self.speech_ms}, '
+            f'noise_floor={self.noise_floor:.5f}, threshold={self.threshold:.5f})'
+        )
+
+
+def dbfs_to_amplitude(dbfs):
+    """Convert a level in dBFS to a linear amplitude (1.0 = full scale)"""
+    return 10.0 ** (dbfs / 20.0)
+
+
+def amplitude_to_dbfs(amplitude):
+    """Convert a linear amplitude to dBFS (digital silence maps to -200 dBFS)"""
+    return 20.0 * np.log10(max(amplitude, 1e-10))
+
+
+def frame_features(samples, frame_length):
+    """
+    RMS energy and zero-crossing rate of consecutive, non-overlapping frames
+
+    Args:
+        samples: Mono float samples in [-1, 1]
+        frame_length: Samples per frame (a trailing partial frame is ignored)
+
+    Returns:
+        tuple: (rms array, zero-crossing rate array), one value per frame
+    """
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty
+
+    frames = np.asarray(samples[:frame_count * frame_length], dtype=np.float32).reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_length - 1)
+    return rms, zcr
+
+
+def noise_level(samples, sample_rate, frame_ms=None):
+    """
+    Background level of a recording of silence (a calibration clip or the
+    silence before speech)
+
+    Returns:
+        float: Median frame RMS, robust to the odd click, or None if the
+               recording is shorter than one frame
+    """
+    frame_length = max(2, int(sample_rate * (frame_ms or Config.VAD_FRAME_MS) / 1000))
+    rms, _ = frame_features(samples, frame_length)
+    if len(rms) == 0:
+        return None
+    return float(np.median(rms))
+
+
+def detect_speech(samples, sample_rate, noise_floor=None, frame_ms=None, noise_factor=None,
+                  min_level_dbfs=None, zcr_threshold=None, min_speech_ms=None, padding_ms=None):
+    """
+    Find where speech starts and ends in a recording
+
+    Args:
+        samples: Mono float samples in [-1, 1]
+        sample_rate: Samples per second
+        noise_floor: Known background RMS (estimated from the recording if None)
+        frame_ms, noise_factor, min_level_dbfs, zcr_threshold (crossings per
+        second), min_speech_ms, padding_ms: Overrides for the Config.VAD_* settings
+
+    Returns:
+        VadResult: Bounds of the speech plus padding; start == end if the
+                   recording holds less than min_speech_ms of speech
+    """
+    frame_ms = frame_ms or Config.VAD_FRAME_MS
+    noise_factor = noise_factor or Config.VAD_NOISE_FACTOR
+    min_level = dbfs_to_amplitude(Config.VAD_MIN_LEVEL_DBFS if min_level_dbfs is None else min_level_dbfs)
+    zcr_threshold = zcr_threshold or Config.VAD_ZCR_THRESHOLD_HZ
+    min_speech_ms = Config.VAD_MIN_SPEECH_MS if min_speech_ms is None else min_speech_ms
+    padding_ms = Config.VAD_PADDING_MS if padding_ms is None else padding_ms
+
+    frame_length = max(2, int(sample_rate * frame_ms / 1000))
+    rms, zcr = frame_features(samples, frame_length)
+    if len(rms) == 0:
+        return VadResult(0, 0, 0, 0.0, min_level)
+
+    if noise_floor is None:
+        # The quietest tenth of the frames is background in any recording
+        # that has pauses, which kiosk uploads always do
+        noise_floor = float(np.percentile(rms, 10))
+    threshold = max(min_level, noise_floor * noise_factor)
+
+    voiced = rms > threshold
+    unvoiced = (rms > threshold / 2) & (zcr * sample_rate > zcr_threshold)
+    speech = np.flatnonzero(voiced | unvoiced)
+
+    speech_ms = len(speech) * frame_ms
+    if speech_ms < min_speech_ms:
+        return VadResult(0, 0, speech_ms, noise_floor, threshold)
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, speech[0] * frame_length - padding)
+    end = min(len(samples), (speech[-1] + 1) * frame_length + padding)
+    return VadResult(int(start), int(end), speech_ms, noise_floor, threshold)
+
+
+
+class SpeechGate:
+    """
+    Streaming counterpart of detect_speech for audio that arrives in chunks.
+
+    Audio is held back until the first speech frame, keeping the last
+    padding_ms as pre-roll, and passed through unchanged from then on, so
+    leading silence never reaches the recognizer and a stream whose gate
+    never opens needs no recognizer at all. Trailing silence is left to the
+    recognizer's own end-of-speech detection.
+
+    Without a known noise floor, the threshold is the absolute minimum level:
+    the gate then opens early in a noisy room rather than risk holding back
+    speech.
+    """
+
+    def __init__(self, sample_rate, noise_floor=None, scale=1.0, frame_ms=None, noise_factor=None,
+                 min_level_dbfs=None, zcr_threshold=None, padding_ms=None):
+        """
+        Args:
+            sample_rate: Samples per second
+            noise_floor: Known background RMS (e.g. the session's noise profile)
+            scale: Factor that maps fed samples to [-1, 1] (1/32768 for int16)
+        """
+        self.sample_rate = sample_rate
+        self.scale = scale
+        self.frame_ms = frame_ms or Config.VAD_FRAME_MS
+        self.frame_length = max(2, int(sample_rate * self.frame_ms / 1000))
+        self.zcr_threshold = zcr_threshold or Config.VAD_ZCR_THRESHOLD_HZ
+        padding_ms = Config.VAD_PADDING_MS if padding_ms is None else padding_ms
+        self.padding = int(sample_rate * padding_ms / 1000)
+
+        self.threshold = dbfs_to_amplitude(Config.VAD_MIN_LEVEL_DBFS if min_level_dbfs is None else min_level_dbfs)
+        if noise_floor is not None:
+            self.threshold = max(self.threshold, noise_floor * (noise_factor or Config.VAD_NOISE_FACTOR))
+
+        self.is_open = False
+        self._preroll = None
+        self._remainder = None
+        self._silence = []
+
+    def feed(self, samples):
+        """
+        Pass a chunk through the gate
+
+        Returns:
+            numpy.ndarray: Samples to forward (same dtype as fed), empty while
+                           the gate is closed
+        """
+        if self.is_open:
+            return samples
+
+        data = samples if self._remainder is None else np.concatenate((self._remainder, samples))
+        analysed = len(data) // self.frame_length * self.frame_length
+        rms, zcr = frame_features(data[:analysed].astype(np.float32) * np.float32(self.scale), self.frame_length)
+        voiced = rms > self.threshold
+        unvoiced = (rms > self.threshold / 2) & (zcr * self.sample_rate > self.zcr_threshold)
+        speech = np.flatnonzero(voiced | unvoiced)
+
+        if len(speech) == 0:
+            self._silence.append(rms)
+            self._remainder = data[analysed:]
+            if self.padding:
+                held = data[:analysed] if self._preroll is None else np.concatenate((self._preroll, data[:analysed]))
+                self._preroll = held[-self.padding:]
+            return data[:0]
+
+        self.is_open = True
+        self._silence.append(rms[:speech[0]])
+        start = speech[0] * self.frame_length - self.padding
+        forward = data[max(0, start):]
+        if start < 0 and self._preroll is not None:
+            forward = np.concatenate((self._preroll[start:], forward))
+        self._preroll = self._remainder = None
+        return forward
+
+    @property
+    def leading_silence_ms(self):
+        """Silence analysed before the gate opened (so far, if still closed)"""
+        return sum(len(levels) for levels in self._silence) * self.frame_ms
+
+    def noise_level(self):
+        """
+        Background level of the leading silence
+
+        Returns:
+            float: Median frame RMS, or None before a full frame of silence
+        """
+        if not self.leading_silence_ms:
+            return None
+        return float(np.median(np.concatenate(self._silence)))
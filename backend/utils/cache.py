@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional expiry and weight bound.
+
+    Entries are evicted when the cache holds more than `maxsize` entries or,
+    if a `weigher` is given, when the summed weight exceeds `max_weight`.
+    With `sliding=True` the TTL is measured from the last access (idle
+    expiry), otherwise from when the entry was stored. `on_evict(key, value)`
+    is called, outside the lock, for entries dropped by eviction or expiry
+    (not for pop, clear or overwrites), so values holding resources can
+    release them.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, sliding=False, max_weight=None, weigher=None, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sliding = sliding
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.on_evict = on_evict
+
+        # key -> (value, timestamp, weight); ordered from least to most recently used
+        self._data = OrderedDict()
+        self._weight = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, timestamp, now):
+        return self.ttl is not None and now - timestamp > self.ttl
+
+    def _remove(self, key):
+        value, _, weight = self._data.pop(key)
+        self._weight -= weight
+        return value
+
+    def _notify(self, dropped):
+        if self.on_evict:
+            for key, value in dropped:
+                self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, timestamp, weight = entry
+            now = time.monotonic()
+            if not self._expired(timestamp, now):
+                self._data.move_to_end(key)
+                if self.sliding:
+                    self._data[key] = (value, now, weight)
+                self.hits += 1
+                return value
+
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+
+        self._notify([(key, value)])
+        return default
+
+    def set(self, key, value):
+        """Store value under key, evicting least recently used entries as needed"""
+        weight = self.weigher(value) if self.weigher else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            now = time.monotonic()
+            self._data[key] = (value, now, weight)
+            self._weight += weight
+            dropped = self._purge_expired(now)
+            dropped += self._enforce_bounds(key)
+        self._notify(dropped)
+
+    def pop(self, key, default=None):
+        """Remove key and return its value"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key][0]
+            self._remove(key)
+            return value
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def keys(self):
+        """Snapshot of the cached keys"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def _purge_expired(self, now):
+        """Drop expired entries from the least recently used end"""
+        dropped = []
+        if self.ttl is None:
+            return dropped
+        while self._data:
+            key, (_, timestamp, _) = next(iter(self._data.items()))
+            if not self._expired(timestamp, now):
+                break
+            dropped.append((key, self._remove(key)))
+            self.expirations += 1
+        return dropped
+
+    def _enforce_bounds(self, newest_key):
+        dropped = []
+        while self._data and (
+            len(self._data) > self.maxsize
+            or (self.max_weight is not None and self._weight > self.max_weight)
+        ):
+            oldest_key = next(iter(self._data))
+            if oldest_key == newest_key and len(self._data) == 1:
+                # Never evict the only entry, even if it is over the weight bound
+                break
+            dropped.append((oldest_key, self._remove(oldest_key)))
+            self.evictions += 1
+        return dropped
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[1], time.monotonic())
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Return cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'weight': self._weight,
+                'max_weight': self.max_weight,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -14,6 +14,19 @@ class Config:
     MONGODB_URL = os.getenv('MONGODB_URL', 'mongodb://localhost:27017/')
     DB_NAME = os.getenv('DB_NAME', 'voicebot_db')
     
+    # MongoDB Connection Pool Configuration (per worker process)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))  # 5 minutes
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '30000'))
+    # Wire compression, in order of preference; unavailable compressors are skipped
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+    # Admin dashboards and analytics read from secondaries when available
+    MONGO_ANALYTICS_READ_PREFERENCE = os.getenv('MONGO_ANALYTICS_READ_PREFERENCE', 'secondaryPreferred')
+    
     # Gemini API Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     
@@ -44,6 +57,12 @@ class Config:
         'mr-IN': 'mr-IN-AarohiNeural'
     }
     
+    # Pool of pre-connected Azure synthesizers (per voice)
+    AZURE_SYNTH_POOL_MAX_PER_VOICE = int(os.getenv('AZURE_SYNTH_POOL_MAX_PER_VOICE', '4'))
+    AZURE_SYNTH_POOL_IDLE_TIMEOUT = int(os.getenv('AZURE_SYNTH_POOL_IDLE_TIMEOUT', '120'))  # seconds before an idle connection is recycled
+    AZURE_SYNTH_POOL_MAX_AGE = int(os.getenv('AZURE_SYNTH_POOL_MAX_AGE', '1800'))  # seconds
+    AZURE_SYNTH_POOL_PREWARM = os.getenv('AZURE_SYNTH_POOL_PREWARM', '')  # comma separated language codes, e.g. 'hi-IN,ta-IN'
+    
     # Dhenu AI Configuration
     DHENU_API_KEY = os.getenv('DHENU_API_KEY')
     
@@ -54,21 +73,160 @@ class Config:
     VALID_PIPELINE_TYPES = ['library', 'api']
     VALID_LLM_SERVICES = ['gemini', 'openai', 'azure_openai', 'vertex']
     DEFAULT_PIPELINE_TYPE = 'library'
+    
+    # Per-worker pipeline cache. Config changes made in other workers are
+    # picked up by polling devices.config_updated_at.
+    PIPELINE_CACHE_SIZE = int(os.getenv('PIPELINE_CACHE_SIZE', '1024'))
+    PIPELINE_CACHE_TTL = int(os.getenv('PIPELINE_CACHE_TTL', '3600'))  # seconds
+    PIPELINE_CACHE_POLL_INTERVAL = float(os.getenv('PIPELINE_CACHE_POLL_INTERVAL', '5'))  # seconds
+    PIPELINE_CACHE_POLL_OVERLAP = float(os.getenv('PIPELINE_CACHE_POLL_OVERLAP', '2'))  # seconds of clock skew tolerated
     DEFAULT_LLM_SERVICE_TYPE = 'azure_openai'
     
+    # Conversation Summary Configuration
+    CONVERSATION_SUMMARY_ENABLED = os.getenv('CONVERSATION_SUMMARY_ENABLED', 'True').lower() == 'true'
+    CONVERSATION_SUMMARY_WORKERS = int(os.getenv('CONVERSATION_SUMMARY_WORKERS', '2'))
+    CONVERSATION_SUMMARY_MAX_PENDING_TURNS = int(os.getenv('CONVERSATION_SUMMARY_MAX_PENDING_TURNS', '50'))  # Unsummarized turns kept for retry after failures
+    
+    # Session Context Cache Configuration (recent turns kept in process)
+    SESSION_CONTEXT_CACHE_ENABLED = os.getenv('SESSION_CONTEXT_CACHE_ENABLED', 'True').lower() == 'true'
+    SESSION_CONTEXT_MAX_TURNS = int(os.getenv('SESSION_CONTEXT_MAX_TURNS', '10'))
+    SESSION_CONTEXT_IDLE_TTL = int(os.getenv('SESSION_CONTEXT_IDLE_TTL', '1800'))  # 30 minutes in seconds
+    SESSION_CONTEXT_MAX_SESSIONS = int(os.getenv('SESSION_CONTEXT_MAX_SESSIONS', '5000'))
+    SESSION_CONTEXT_MAX_BYTES = int(os.getenv('SESSION_CONTEXT_MAX_BYTES', '33554432'))  # 32MB
+    SESSION_CONTEXT_VALIDATE = os.getenv('SESSION_CONTEXT_VALIDATE', 'True').lower() == 'true'  # Check hits against the newest stored turn; disable only with sticky routing
+    
+    # Conversation Persistence Configuration
+    # 'async': write-behind batches off the request path, 'sync': insert before responding
+    CONVERSATION_WRITE_MODE = os.getenv('CONVERSATION_WRITE_MODE', 'async').lower()
+    CONVERSATION_WRITE_BUFFER_SIZE = int(os.getenv('CONVERSATION_WRITE_BUFFER_SIZE', '10000'))
+    CONVERSATION_WRITE_BATCH_SIZE = int(os.getenv('CONVERSATION_WRITE_BATCH_SIZE', '100'))
+    CONVERSATION_WRITE_FLUSH_INTERVAL = float(os.getenv('CONVERSATION_WRITE_FLUSH_INTERVAL', '0.2'))  # seconds
+    CONVERSATION_WRITE_MAX_RETRIES = int(os.getenv('CONVERSATION_WRITE_MAX_RETRIES', '5'))
+    
     # Device Authentication Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     ACCESS_TOKEN_EXPIRY = int(os.getenv('ACCESS_TOKEN_EXPIRY', '3600'))  # 1 hour in seconds
     REFRESH_TOKEN_EXPIRY = int(os.getenv('REFRESH_TOKEN_EXPIRY', '86400'))  # 24 hours in seconds
+    
+    # Stateless token verification: trust the JWT signature and check only a
+    # per-device token generation kept in memory instead of querying MongoDB
+    DEVICE_AUTH_STATELESS = os.getenv('DEVICE_AUTH_STATELESS', 'false').lower() == 'true'
+    DEVICE_TOKEN_SYNC_INTERVAL = float(os.getenv('DEVICE_TOKEN_SYNC_INTERVAL', '5'))  # seconds between revocation syncs
+    DEVICE_TOKEN_SYNC_OVERLAP = float(os.getenv('DEVICE_TOKEN_SYNC_OVERLAP', '2'))  # seconds of clock skew tolerated
     DEVICE_ID_START = int(os.getenv('DEVICE_ID_START', '1201'))  # Starting device ID
     DEFAULT_DEVICE_ID = int(os.getenv('DEFAULT_DEVICE_ID', '1200'))  # For existing data migration
+    DEVICE_BULK_REGISTER_MAX = int(os.getenv('DEVICE_BULK_REGISTER_MAX', '1000'))  # Devices per bulk provisioning call
+    DEVICE_BULK_REGISTER_HTTP_MAX = int(os.getenv('DEVICE_BULK_REGISTER_HTTP_MAX', '20'))  # Devices per admin API call (hashed inline in the request)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))  # bcrypt cost factor for device passwords
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))  # Bulk hashing processes (0 = CPU count)
+    LOGIN_VERIFY_WORKERS = int(os.getenv('LOGIN_VERIFY_WORKERS', '2'))  # Login bcrypt processes (0 = inline)
+    LOGIN_VERIFY_MAX_PENDING = int(os.getenv('LOGIN_VERIFY_MAX_PENDING', '32'))  # Queued logins before shedding with 429
+    LOGIN_VERIFY_TIMEOUT = int(os.getenv('LOGIN_VERIFY_TIMEOUT', '10'))  # seconds
+    LOGIN_RETRY_AFTER = int(os.getenv('LOGIN_RETRY_AFTER', '5'))  # Retry-After seconds on 429
     
     # Audio Configuration
     AUDIO_UPLOAD_FOLDER = os.getenv('AUDIO_UPLOAD_FOLDER', 'temp_audio')
     MAX_AUDIO_SIZE = int(os.getenv('MAX_AUDIO_SIZE', '16777216'))  # 16MB
     
+    # Scratch space (AUDIO_UPLOAD_FOLDER) janitor and size quota
+    SCRATCH_MAX_BYTES = int(os.getenv('SCRATCH_MAX_BYTES', str(512 * 1024 * 1024)))  # 512MB
+    SCRATCH_MAX_AGE = int(os.getenv('SCRATCH_MAX_AGE', '900'))  # seconds before leftover files are removed
+    SCRATCH_EVICT_GRACE = int(os.getenv('SCRATCH_EVICT_GRACE', '120'))  # seconds a new file is safe from size eviction (any worker may be using it)
+    SCRATCH_JANITOR_INTERVAL = int(os.getenv('SCRATCH_JANITOR_INTERVAL', '60'))  # seconds between sweeps
+
+    # Server-side voice activity detection before STT (backend/utils/audio_vad.py)
+    VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+    VAD_FRAME_MS = int(os.getenv('VAD_FRAME_MS', '20'))  # Analysis frame length
+    VAD_NOISE_FACTOR = float(os.getenv('VAD_NOISE_FACTOR', '3.0'))  # Speech threshold as a multiple of the noise floor
+    VAD_MIN_LEVEL_DBFS = float(os.getenv('VAD_MIN_LEVEL_DBFS', '-45'))  # Frames quieter than this are never speech
+    VAD_ZCR_THRESHOLD_HZ = float(os.getenv('VAD_ZCR_THRESHOLD_HZ', '4000'))  # Zero crossings per second of quiet unvoiced speech
+    VAD_MIN_SPEECH_MS = int(os.getenv('VAD_MIN_SPEECH_MS', '150'))  # Less speech than this rejects the clip
+    VAD_PADDING_MS = int(os.getenv('VAD_PADDING_MS', '200'))  # Audio kept around the detected speech
+    
+    # Per-session background noise level used as the VAD noise floor
+    NOISE_PROFILE_ENABLED = os.getenv('NOISE_PROFILE_ENABLED', 'true').lower() == 'true'
+    NOISE_PROFILE_MAX_PROFILES = int(os.getenv('NOISE_PROFILE_MAX_PROFILES', '10000'))
+    NOISE_PROFILE_IDLE_TTL = int(os.getenv('NOISE_PROFILE_IDLE_TTL', '1800'))  # seconds
+    NOISE_PROFILE_MIN_SILENCE_MS = int(os.getenv('NOISE_PROFILE_MIN_SILENCE_MS', '300'))  # Leading silence needed to measure it
+    NOISE_PROFILE_MAX_DBFS = float(os.getenv('NOISE_PROFILE_MAX_DBFS', '-30'))  # Stored levels are capped here so the VAD still hears speech
+    NOISE_PROFILE_PERSIST = os.getenv('NOISE_PROFILE_PERSIST', 'true').lower() == 'true'  # Share profiles across workers through MongoDB
+    NOISE_PROFILE_CACHE_TTL = int(os.getenv('NOISE_PROFILE_CACHE_TTL', '60'))  # seconds a worker reuses a stored profile before re-reading it
+    NOISE_PROFILE_RETENTION = int(os.getenv('NOISE_PROFILE_RETENTION', '604800'))  # seconds a stored profile is kept after its last update
+
+    # Preprocessing of recordings before STT (backend/utils/audio_preprocessing.py)
+    AUDIO_NORMALIZE = os.getenv('AUDIO_NORMALIZE', 'peak')  # peak, rms or none
+    AUDIO_NORMALIZE_PEAK_DBFS = float(os.getenv('AUDIO_NORMALIZE_PEAK_DBFS', '-1'))
+    AUDIO_NORMALIZE_RMS_DBFS = float(os.getenv('AUDIO_NORMALIZE_RMS_DBFS', '-20'))
+    AUDIO_NORMALIZE_MAX_GAIN_DB = float(os.getenv('AUDIO_NORMALIZE_MAX_GAIN_DB', '30'))  # Quiet clips aren't boosted further
+    AUDIO_PRE_EMPHASIS = float(os.getenv('AUDIO_PRE_EMPHASIS', '0'))  # Pre-emphasis coefficient, e.g. 0.97 (0 = off)
+
+    # Streaming STT: raw PCM chunks recognized while the user speaks (backend/services/stt_stream.py)
+    STT_STREAM_ENABLED = os.getenv('STT_STREAM_ENABLED', 'true').lower() == 'true'
+    STT_STREAM_MAX_STREAMS = int(os.getenv('STT_STREAM_MAX_STREAMS', '256'))  # Open streams per worker
+    STT_STREAM_IDLE_TTL = int(os.getenv('STT_STREAM_IDLE_TTL', '30'))  # seconds without a chunk before a stream is dropped
+    STT_STREAM_MAX_SECONDS = int(os.getenv('STT_STREAM_MAX_SECONDS', '60'))  # Longest audio accepted per stream
+    STT_STREAM_FINISH_TIMEOUT = float(os.getenv('STT_STREAM_FINISH_TIMEOUT', '10'))  # seconds to wait for the final result
+    STT_STREAM_SAMPLE_RATES = [int(rate) for rate in os.getenv('STT_STREAM_SAMPLE_RATES', '8000,16000').split(',')]
+
     # TTS Configuration
     TTS_LANGUAGE = os.getenv('TTS_LANGUAGE', 'hi')  # Default to Hindi
+    TTS_IN_MEMORY = os.getenv('TTS_IN_MEMORY', 'true').lower() == 'true'  # Serve pipeline TTS from memory instead of temp files
+    
+    # Speculative TTS of generated responses before the client asks for them.
+    # Opt-in: every response is synthesized whether or not it is played, and
+    # only /text_to_speech requests that carry the device_id can use it
+    TTS_PREFETCH_ENABLED = os.getenv('TTS_PREFETCH_ENABLED', 'false').lower() == 'true'
+    TTS_PREFETCH_WORKERS = int(os.getenv('TTS_PREFETCH_WORKERS', '2'))  # Background synthesis threads per worker
+    TTS_PREFETCH_MAX_PENDING = int(os.getenv('TTS_PREFETCH_MAX_PENDING', '8'))  # Queued jobs before speculation is skipped
+    TTS_PREFETCH_CACHE_SIZE = int(os.getenv('TTS_PREFETCH_CACHE_SIZE', '128'))  # Jobs kept for the follow-up request
+    TTS_PREFETCH_TTL = int(os.getenv('TTS_PREFETCH_TTL', '120'))  # seconds a prefetched utterance stays claimable
+    TTS_PREFETCH_WAIT_TIMEOUT = int(os.getenv('TTS_PREFETCH_WAIT_TIMEOUT', '30'))  # seconds to wait for an in-flight job
+    
+    # Pre-rendered static prompts (built by executables/build_prompt_catalog.py)
+    PROMPT_CATALOG_DIR = os.getenv('PROMPT_CATALOG_DIR', os.path.join('static', 'audio', 'catalog'))
+    PROMPT_CATALOG_WORKERS = int(os.getenv('PROMPT_CATALOG_WORKERS', '8'))  # Parallel renders during the build
+    PROMPT_CATALOG_MAX_AGE = int(os.getenv('PROMPT_CATALOG_MAX_AGE', '86400'))  # Cache-Control max-age for prompt audio
+    PROMPT_CATALOG_IN_MEMORY = os.getenv('PROMPT_CATALOG_IN_MEMORY', 'true').lower() == 'true'  # Hold clips in memory
+    PROMPT_CATALOG_VARIANTS = os.getenv('PROMPT_CATALOG_VARIANTS', 'opus,mp3_low')  # Extra AUDIO_OUTPUT_PROFILES rendered per clip
+    
+    # Audio containers served to clients: format -> mimetype
+    AUDIO_FORMATS = {
+        'mp3': 'audio/mpeg',
+        'ogg': 'audio/ogg',
+        'webm': 'audio/webm',
+        'wav': 'audio/wav'
+    }
+    
+    # TTS output profiles, picked per request from the Accept header or the
+    # device's audio_profile (low-bitrate profiles suit 2G/3G kiosks)
+    AUDIO_OUTPUT_PROFILES = {
+        'mp3': {
+            'format': 'mp3', 'codec': 'libmp3lame',
+            'sample_rate': int(os.getenv('AUDIO_MP3_SAMPLE_RATE', '24000')),
+            'bitrate': os.getenv('AUDIO_MP3_BITRATE', '48k')
+        },
+        'mp3_low': {
+            'format': 'mp3', 'codec': 'libmp3lame',
+            'sample_rate': int(os.getenv('AUDIO_MP3_LOW_SAMPLE_RATE', '16000')),
+            'bitrate': os.getenv('AUDIO_MP3_LOW_BITRATE', '32k')
+        },
+        'opus': {
+            'format': 'ogg', 'codec': 'libopus',
+            'sample_rate': int(os.getenv('AUDIO_OPUS_SAMPLE_RATE', '24000')),
+            'bitrate': os.getenv('AUDIO_OPUS_BITRATE', '24k')
+        },
+        'webm': {
+            'format': 'webm', 'codec': 'libopus',
+            'sample_rate': int(os.getenv('AUDIO_OPUS_SAMPLE_RATE', '24000')),
+            'bitrate': os.getenv('AUDIO_OPUS_BITRATE', '24k')
+        },
+        'wav': {
+            'format': 'wav', 'codec': 'pcm_s16le',
+            'sample_rate': 16000,
+            'bitrate': None
+        }
+    }
+    AUDIO_OUTPUT_PROFILE = os.getenv('AUDIO_OUTPUT_PROFILE', 'mp3')  # Default profile
     
     # Supported Indian languages for the voice bot (verified compatibility with all services)
     SUPPORTED_LANGUAGES = {
@@ -111,4 +269,24 @@ class Config:
             'gu': "ખૂબ સરસ! હવે આપણી વાતચીત શરૂ કરીએ. આજે હું તમારી કેવી રીતે મદદ કરી શકું?",
             'mr': "खूप चांगले! आता आमची गप्पा सुरू करूया. आज मी तुम्हाला कशी मदत करू शकतो?"
         }
-    }
\ No newline at end of file
+    }
+    
+    # Error and fallback prompts in Indian languages
+    ERROR_PROMPTS = {
+        'extraction_error': {
+            'hi': 'माफ़ कीजिये मैं समझ नहीं पाई। कृपया अपना फ़ोन नंबर दर्ज करें।',
+            'bn': 'ক্ষমা করবেন আমি বুঝতে পারিনি। অনুগ্রহ করে আপনার ফোন নম্বর লিখুন।',
+            'ta': 'மன்னிக்கவும் என்னால் புரிந்துகொள்ள முடியவில்லை. தயவுசெய்து உங்கள் தொலைபேசி எண்ணை உள்ளிடவும்.',
+            'te': 'క్షమించండి నేను అర్థం చేసుకోలేకపోయాను. దయచేసి మీ ఫోన్ నంబర్‌ను నమోదు చేయండి.',
+            'gu': 'માફ કરશો હું સમજી શક્યો નહીં. કૃપા કરીને તમારો ફોન નંબર દાખલ કરો.',
+            'mr': 'माफ करा मला समजले नाही. कृपया तुमचा फोन नंबर टाका.'
+        },
+        'language_error': {
+            'hi': 'माफ़ कीजिये मैं समझ नहीं पाई। कृपया अपनी पसंदीदा भाषा बताएं।',
+            'bn': 'ক্ষমা করবেন আমি বুঝতে পারিনি। অনুগ্রহ করে আপনার পছন্দের ভাষা বলুন।',
+            'ta': 'மன்னிக்கவும் என்னால் புரிந்துகொள்ள முடியவில்லை. தயவுசெய்து உங்கள் விருப்ப மொழியைச் சொல்லுங்கள்.',
+            'te': 'క్షమించండి నేను అర్థం చేసుకోలేకపోయాను. దయచేసి మీ ఇష్టమైన భాషను చెప్పండి.',
+            'gu': 'માફ કરશો હું સમજી શક્યો નહીં. કૃપા કરીને તમારી પસંદની ભાષા જણાવો.',
+            'mr': 'माफ करा मला समजले नाही. कृपया तुमची पसंतीची भाषा सांगा.'
+        }
+    }
@@ -1,5 +1,32 @@
 import re
 
+# Patterns for clean_markdown_for_tts, compiled once. Each step runs only
+# when the characters it needs to match are present in the text.
+_IMAGE = re.compile(r'!\[.+?\]\(.+?\)')
+_LINK = re.compile(r'\[(.+?)\]\(.+?\)')
+_HEADER = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_HORIZONTAL_RULE = re.compile(r'^\s*[-*_]{3,}\s*$', re.MULTILINE)
+_BLOCKQUOTE = re.compile(r'^\s*>\s+', re.MULTILINE)
+_BULLET = re.compile(r'(^|[\s,;])[-*+]\s+', re.MULTILINE)
+_NUMBERED = re.compile(r'(^|[\s,;])\d+\.\s+', re.MULTILINE)
+_BOLD_ITALIC = re.compile(r'\*\*\*(.+?)\*\*\*')
+_BOLD_STARS = re.compile(r'\*\*(.+?)\*\*')
+_BOLD_UNDERSCORES = re.compile(r'__(.+?)__')
+_ITALIC_STAR = re.compile(r'\*(.+?)\*')
+_ITALIC_UNDERSCORE = re.compile(r'_(.+?)_')
+_STRIKETHROUGH = re.compile(r'~~(.+?)~~')
+_CODE_BLOCK = re.compile(r'```[\s\S]*?```')
+_INLINE_CODE = re.compile(r'`(.+?)`')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_SPACES = re.compile(r'[ \t]+')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n+')
+_DOUBLE_COMMA = re.compile(r',\s*,')
+_PERIOD_COMMA = re.compile(r'\.\s*,')
+_WHITESPACE = re.compile(r'\s+')
+
+SENTENCE_ENDINGS = ('.', '!', '?', '।')
+
+
 def clean_markdown_for_tts(text):
     """
     Remove markdown formatting and special characters for TTS.
@@ -7,58 +34,74 @@ def clean_markdown_for_tts(text):
     """
     if not text:
         return ""
-    
+
     cleaned = text
-    
+
     # 1. Remove Images and Links (do first to keep link text but lose URLs)
-    cleaned = re.sub(r'!\[.+?\]\(.+?\)', '', cleaned)
-    cleaned = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', cleaned)
-    
+    if '](' in cleaned:
+        cleaned = _IMAGE.sub('', cleaned)
+        cleaned = _LINK.sub(r'\1', cleaned)
+
     # 2. Remove Block-level elements (Headers, Horizontal Rules, Blockquotes)
-    cleaned = re.sub(r'^#{1,6}\s+', '', cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r'^\s*[-*_]{3,}\s*$', '', cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r'^\s*>\s+', '', cleaned, flags=re.MULTILINE)
-
-    # 3. FIX: Handle Lists (Bullets and Numbers) anywhere in the text
-    # We check for the start of a line OR a preceding space/punctuation
-    # This ensures "1. " is caught even if it's not the very first character of the string
-    cleaned = re.sub(r'(^|[\s,;])[-*+]\s+', r'\1', cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r'(^|[\s,;])\d+\.\s+', r'\1', cleaned, flags=re.MULTILINE)
-    
+    if '#' in cleaned:
+        cleaned = _HEADER.sub('', cleaned)
+    has_star = '*' in cleaned
+    has_underscore = '_' in cleaned
+    if has_star or has_underscore or '-' in cleaned:
+        cleaned = _HORIZONTAL_RULE.sub('', cleaned)
+    if '>' in cleaned:
+        cleaned = _BLOCKQUOTE.sub('', cleaned)
+
+    # 3. Handle Lists (Bullets and Numbers) anywhere in the text
+    if has_star or '-' in cleaned or '+' in cleaned:
+        cleaned = _BULLET.sub(r'\1', cleaned)
+    if '.' in cleaned:
+        cleaned = _NUMBERED.sub(r'\1', cleaned)
+
     # 4. Remove Inline Formatting
-    cleaned = re.sub(r'\*\*\*(.+?)\*\*\*', r'\1', cleaned) # Bold-Italic
-    cleaned = re.sub(r'\*\*(.+?)\*\*', r'\1', cleaned)    # Bold
-    cleaned = re.sub(r'__(.+?)__', r'\1', cleaned)        # Bold
-    cleaned = re.sub(r'\*(.+?)\*', r'\1', cleaned)        # Italic
-    cleaned = re.sub(r'_(.+?)_', r'\1', cleaned)          # Italic
-    cleaned = re.sub(r'~~(.+?)~~', r'\1', cleaned)       # Strikethrough
-    
+    if '*' in cleaned:
+        cleaned = _BOLD_ITALIC.sub(r'\1', cleaned)
+        cleaned = _BOLD_STARS.sub(r'\1', cleaned)
+    if has_underscore:
+        cleaned = _BOLD_UNDERSCORES.sub(r'\1', cleaned)
+    if '*' in cleaned:
+        cleaned = _ITALIC_STAR.sub(r'\1', cleaned)
+    if has_underscore:
+        cleaned = _ITALIC_UNDERSCORE.sub(r'\1', cleaned)
+    if '~' in cleaned:
+        cleaned = _STRIKETHROUGH.sub(r'\1', cleaned)
+
     # 5. Remove Code
-    cleaned = re.sub(r'```[\s\S]*?```', '', cleaned)
-    cleaned = re.sub(r'`(.+?)`', r'\1', cleaned)
-    
+    if '`' in cleaned:
+        cleaned = _CODE_BLOCK.sub('', cleaned)
+        cleaned = _INLINE_CODE.sub(r'\1', cleaned)
+
     # 6. Remove HTML tags
-    cleaned = re.sub(r'<[^>]+>', '', cleaned)
-    
+    if '<' in cleaned:
+        cleaned = _HTML_TAG.sub('', cleaned)
+
     # 7. TTS Specific Formatting (The "Pause" Logic)
     # Multiple spaces to single space
-    cleaned = re.sub(r'[ \t]+', ' ', cleaned)
-    
-    # Convert double newlines (paragraphs) to a full stop for a long pause
-    cleaned = re.sub(r'\n\s*\n+', '. ', cleaned)
-    
-    # Convert single newlines (usually list items) to a comma for a short breath
-    cleaned = re.sub(r'\n', ', ', cleaned)
-    
+    cleaned = _SPACES.sub(' ', cleaned)
+
+    if '\n' in cleaned:
+        # Convert double newlines (paragraphs) to a full stop for a long pause
+        cleaned = _PARAGRAPH_BREAK.sub('. ', cleaned)
+
+        # Convert single newlines (usually list items) to a comma for a short breath
+        cleaned = cleaned.replace('\n', ', ')
+
     # Final cleanup of double punctuation or stray symbols
-    cleaned = re.sub(r',\s*,', ',', cleaned)
-    cleaned = re.sub(r'\.\s*,', '.', cleaned)
-    cleaned = re.sub(r'\s+', ' ', cleaned) # Final space normalize
-    
+    if ',' in cleaned:
+        cleaned = _DOUBLE_COMMA.sub(',', cleaned)
+        if '.' in cleaned:
+            cleaned = _PERIOD_COMMA.sub('.', cleaned)
+    cleaned = _WHITESPACE.sub(' ', cleaned) # Final space normalize
+
     cleaned = cleaned.strip()
-    
+
     # Ensure it ends with a proper sentence finisher if characters exist
-    if cleaned and cleaned[-1] not in ('.', '!', '?', '।'):
+    if cleaned and cleaned[-1] not in SENTENCE_ENDINGS:
         if cleaned.endswith(','):
             cleaned = cleaned[:-1] + '.'
         else:
@@ -66,5 +109,241 @@ def clean_markdown_for_tts(text):
 
     return cleaned
 
+
+class IncrementalMarkdownCleaner:
+    """
+    Cleans markdown that arrives in chunks (e.g. streamed LLM tokens).
+
+    feed() buffers text and returns the cleaned form of every paragraph
+    completed so far; flush() returns whatever is left at the end of the
+    stream. A paragraph ends at a blank line outside a ``` code block, so
+    markdown never spans two cleaned segments. Each chunk is scanned once.
+    """
+
+    _BOUNDARY = re.compile(r'```|\n\s*\n')
+    _NON_SPACE = re.compile(r'\S')
+    _TRAILING_NEWLINE = re.compile(r'\n\s*\Z')
+
+    def __init__(self):
+        self._buffer = ''
+        self._scan_from = 0
+        self._reset_state()
+
+    def _reset_state(self):
+        """Reset markdown state at the end of the stream"""
+        self._in_code_block = False
+
+    def _wait_for_more(self):
+        """Move the scan position to where a boundary could still start once more text arrives"""
+        # A blank line can start at a newline in trailing whitespace, a fence
+        # in the last two characters
+        trailing = self._TRAILING_NEWLINE.search(self._buffer, self._scan_from)
+        resume = trailing.start() if trailing else len(self._buffer) - 2
+        self._scan_from = max(self._scan_from, resume, 0)
+
+    def _find_boundary(self):
+        """
+        Find the next segment boundary in the buffer. Subclasses override
+        this to split at finer boundaries.
+
+        Returns:
+            tuple: (segment end, next segment start) or None to wait for more text
+        """
+        while True:
+            match = self._BOUNDARY.search(self._buffer, self._scan_from)
+            if match is None:
+                self._wait_for_more()
+                return None
+            if match.end() == len(self._buffer) or (
+                match.group() != '```' and not self._NON_SPACE.search(self._buffer, match.end())
+            ):
+                # The fence or blank line may continue in the next chunk
+                self._scan_from = match.start()
+                return None
+
+            self._scan_from = match.end()
+            if match.group() == '```':
+                self._in_code_block = not self._in_code_block
+            elif not self._in_code_block:
+                return match.start(), match.end()
+
+    def _emit(self, raw):
+        # Whitespace left after the previous boundary would be spoken as a pause
+        cleaned = clean_markdown_for_tts(raw.lstrip())
+        return [cleaned] if cleaned else []
+
+    def feed(self, chunk):
+        """
+        Add a chunk of markdown
+
+        Returns:
+            list: Cleaned segments completed by this chunk (possibly empty)
+        """
+        if not chunk:
+            return []
+        self._buffer += chunk
+
+        segments = []
+        while True:
+            boundary = self._find_boundary()
+            if boundary is None:
+                return segments
+            end, start = boundary
+            segments.extend(self._emit(self._buffer[:end]))
+            self._buffer = self._buffer[start:]
+            self._scan_from = 0
+
+    def flush(self):
+        """
+        Clean whatever is left at the end of the stream
+
+        Returns:
+            list: Remaining cleaned segment (possibly empty)
+        """
+        raw = self._buffer
+        self._buffer = ''
+        self._scan_from = 0
+        self._reset_state()
+        return self._emit(raw)
+
+
+class StreamingSentenceCleaner(IncrementalMarkdownCleaner):
+    """
+    Incremental cleaner that releases sentences instead of paragraphs,
+    so streaming TTS can start speaking the first sentence while the LLM
+    is still generating the rest.
+
+    A sentence ends at ।, ., ? or ! followed by whitespace, or at a blank
+    line. Each character is scanned once and the markdown state (open
+    emphasis markers, inline code, ``` blocks, link text and URLs) carries
+    across chunks; a sentence is never cut while any of it is open, so
+    every released segment is complete markdown. Numbered list markers
+    ("1. ") and decimals are not sentence ends. Emphasis, inline code and
+    links never span lines, matching the cleaner's patterns, so their state
+    resets at each newline.
+    """
+
+    SENTENCE_TERMINATORS = '।.?!'
+    _MARKER_CHARS = '*_~`'
+    _LIST_MARKER_PREFIX = ' \t\n\r\f\v,;'
+
+    def _reset_state(self):
+        super()._reset_state()
+        self._open_markers = set()
+        self._in_inline_code = False
+        self._link_state = None  # None, 'text' or 'url'
+
+    def _reset_line_state(self):
+        self._open_markers.clear()
+        self._in_inline_code = False
+        self._link_state = None
+
+    def _in_markup(self):
+        return bool(
+            self._in_code_block or self._in_inline_code or self._open_markers or self._link_state
+        )
+
+    def _is_list_marker(self, position):
+        """Whether the "." at `position` ends a numbered list marker such as 2."""
+        start = position
+        while start > 0 and self._buffer[start - 1].isdigit():
+            start -= 1
+        if start == position:
+            return False
+        return start == 0 or self._buffer[start - 1] in self._LIST_MARKER_PREFIX
+
+    def _handle_marker_run(self, run, position, end):
+        """Update state for a run of *, _, ~ or ` characters"""
+        buffer = self._buffer
+        marker = run[0]
+
+        if marker == '`':
+            if len(run) >= 3:
+                if not self._in_inline_code:
+                    self._in_code_block = not self._in_code_block
+            elif not self._in_code_block:
+                self._in_inline_code = not self._in_inline_code
+            return
+
+        if self._in_code_block or self._in_inline_code:
+            return
+
+        before = buffer[position - 1] if position > 0 else '\n'
+        after = buffer[end]
+        if marker == '*' and len(run) == 1 and before.isspace() and after.isspace():
+            # Bullet, or a lone asterisk between words
+            return
+        if marker == '_' and before.isalnum() and after.isalnum():
+            # Intra-word underscore (snake_case)
+            return
+        if marker == '~' and len(run) < 2:
+            return
+
+        if run in self._open_markers:
+            self._open_markers.discard(run)
+        else:
+            self._open_markers.add(run)
+
+    def _find_boundary(self):
+        buffer = self._buffer
+        length = len(buffer)
+        position = self._scan_from
+
+        while position < length:
+            char = buffer[position]
+
+            if char in self._MARKER_CHARS:
+                end = position + 1
+                while end < length and buffer[end] == char:
+                    end += 1
+                if end == length:
+                    # The run, or the character after it, is still arriving
+                    break
+                self._handle_marker_run(buffer[position:end], position, end)
+                position = end
+                continue
+
+            if char == '\n':
+                end = position + 1
+                while end < length and buffer[end].isspace():
+                    end += 1
+                if end == length:
+                    # Can't tell a line break from a paragraph break yet
+                    break
+                if self._in_code_block:
+                    position = end
+                    continue
+                self._reset_line_state()
+                if '\n' in buffer[position + 1:end]:
+                    self._scan_from = end
+                    return position, end
+                position = end
+                continue
+
+            if self._in_code_block or self._in_inline_code:
+                position += 1
+                continue
+
+            if char == '[' and self._link_state is None:
+                self._link_state = 'text'
+            elif char == ']' and self._link_state == 'text':
+                if position + 1 == length:
+                    break
+                self._link_state = 'url' if buffer[position + 1] == '(' else None
+            elif char == ')' and self._link_state == 'url':
+                self._link_state = None
+            elif char in self.SENTENCE_TERMINATORS and not self._in_markup():
+                if position + 1 == length:
+                    break
+                if buffer[position + 1].isspace() and not (char == '.' and self._is_list_marker(position)):
+                    self._scan_from = position + 1
+                    return position + 1, position + 1
+
+            position += 1
+
+        self._scan_from = position
+        return None
+
+
 def markdown_to_plain_text(text):
-    return clean_markdown_for_tts(text)
\ No newline at end of file
+    return clean_markdown_for_tts(text)
@@ -0,0 +1,162 @@
+import logging
+from backend.models.database import db_manager
+from backend.utils.audio_vad import amplitude_to_dbfs, dbfs_to_amplitude, detect_speech, noise_level
+from backend.utils.cache import LRUCache
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cached in place of a level for keys with no stored profile
+NOT_MEASURED = -1.0
+
+
+class NoiseProfileStore:
+    """
+    Background noise level of each kiosk session, used as the VAD noise floor.
+
+    The level is measured once per session: from a dedicated calibration
+    clip (calibrate), or from the silence the VAD trims off the start of the
+    first recording that has enough of it (observe). Later recordings in the
+    session are thresholded against it, so a clip that starts with speech
+    right away keeps its first words instead of having its own quiet
+    frames mistaken for background.
+
+    Stored levels are capped at NOISE_PROFILE_MAX_DBFS: a streaming
+    SpeechGate has no retry without the profile, so a floor measured in a
+    loud moment must not be able to hold its gate shut on normal speech.
+
+    Profiles are keyed by session, falling back to the device. With
+    `persist` they are stored in MongoDB (in dBFS) and read through a
+    per-worker cache that is refreshed every NOISE_PROFILE_CACHE_TTL
+    seconds, so a calibration served by one worker reaches the others;
+    without it each worker keeps, and measures, its own.
+    """
+
+    def __init__(self, enabled=None, max_profiles=None, idle_ttl=None, min_silence_ms=None, max_dbfs=None,
+                 persist=None, cache_ttl=None):
+        self.enabled = Config.NOISE_PROFILE_ENABLED if enabled is None else enabled
+        self.persist = Config.NOISE_PROFILE_PERSIST if persist is None else persist
+        self.min_silence_ms = min_silence_ms or Config.NOISE_PROFILE_MIN_SILENCE_MS
+        self.max_level = dbfs_to_amplitude(Config.NOISE_PROFILE_MAX_DBFS if max_dbfs is None else max_dbfs)
+        if self.persist:
+            ttl, sliding = cache_ttl or Config.NOISE_PROFILE_CACHE_TTL, False
+        else:
+            ttl, sliding = idle_ttl or Config.NOISE_PROFILE_IDLE_TTL, True
+        self.profiles = LRUCache(maxsize=max_profiles or Config.NOISE_PROFILE_MAX_PROFILES, ttl=ttl, sliding=sliding)
+
+        self.calibrated = 0
+        self.observed = 0
+        self.rejected = 0
+        self.capped = 0
+
+    @staticmethod
+    def profile_key(session_id=None, device_id=None):
+        """
+        Key of the profile for a request
+
+        Returns:
+            tuple: ('session', id) or ('device', id), or None when the
+                   request can't be tied to either
+        """
+        if session_id:
+            return 'session', str(session_id)
+        if device_id is not None:
+            return 'device', str(device_id)
+        return None
+
+    def _cap(self, key, level):
+        """Limit a measured level to max_level"""
+        if level <= self.max_level:
+            return level
+        self.capped += 1
+        logger.info(f"Noise profile for {key[0]} {key[1]} capped: RMS {level:.5f} > {self.max_level:.5f}")
+        return self.max_level
+
+    def get(self, key):
+        """
+        Noise floor (RMS) of a session
+
+        Returns:
+            float: Stored level, or None if not measured yet
+        """
+        if not self.enabled or key is None:
+            return None
+        level = self.profiles.get(key)
+        if level is None and self.persist:
+            level_dbfs = db_manager.get_noise_profile(*key)
+            level = NOT_MEASURED if level_dbfs is None else dbfs_to_amplitude(level_dbfs)
+            self.profiles.set(key, level)
+        return None if level == NOT_MEASURED else level
+
+    def _store(self, key, level, replace):
+        self.profiles.set(key, level)
+        if self.persist:
+            db_manager.save_noise_profile(key[0], key[1], amplitude_to_dbfs(level), replace=replace)
+
+    def calibrate(self, key, samples, sample_rate):
+        """
+        Measure a session's noise floor from a clip of ambient sound,
+        replacing any earlier profile. Clips the VAD finds speech in are
+        rejected and leave the profile unchanged.
+
+        Returns:
+            tuple: (stored level, error message or None)
+        """
+        if not self.enabled or key is None:
+            return None, 'Noise profiles are disabled'
+        level = noise_level(samples, sample_rate)
+        if level is None:
+            return None, 'Calibration clip too short'
+        if detect_speech(samples, sample_rate).has_speech:
+            self.rejected += 1
+            logger.info(f"Noise calibration for {key[0]} {key[1]} rejected: clip contains speech")
+            return None, 'Calibration clip contains speech'
+        level = self._cap(key, level)
+        self._store(key, level, replace=True)
+        self.calibrated += 1
+        logger.info(f"Noise profile for {key[0]} {key[1]} calibrated: RMS {level:.5f}")
+        return level, None
+
+    def observe(self, key, samples, sample_rate, result):
+        """
+        Take a session's noise floor from the silence before the speech the
+        VAD found, unless the session already has one
+
+        Args:
+            samples: Mono float samples the VAD ran on
+            result: VadResult for those samples
+        """
+        if not self.enabled or key is None or not result.has_speech or self.get(key) is not None:
+            return
+        if result.start * 1000 < self.min_silence_ms * sample_rate:
+            return
+        self.observe_level(key, noise_level(samples[:result.start], sample_rate))
+
+    def observe_level(self, key, level):
+        """
+        Store a leading-silence level measured elsewhere (e.g. by a streaming
+        SpeechGate), unless the session already has a profile
+        """
+        if not self.enabled or key is None or level is None or self.get(key) is not None:
+            return
+        level = self._cap(key, level)
+        # Another worker may have stored one meanwhile; the first one stored wins
+        self._store(key, level, replace=False)
+        self.observed += 1
+        logger.debug(f"Noise profile for {key[0]} {key[1]} taken from leading silence: RMS {level:.5f}")
+
+    def stats(self):
+        """Return noise profile statistics"""
+        return {
+            'enabled': self.enabled,
+            'persist': self.persist,
+            'profiles': len(self.profiles),
+            'calibrated': self.calibrated,
+            'observed': self.observed,
+            'rejected': self.rejected,
+            'capped': self.capped
+        }
+
+
+# Global noise profile store
+noise_profiles = NoiseProfileStore()
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import threading
+import bcrypt
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from backend.utils.config import Config
+
+
+def hash_password(password, rounds=None):
+    """Hash password using bcrypt at the configured cost factor"""
+    salt = bcrypt.gensalt(rounds or Config.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password, password_hash):
+    """Verify password against a bcrypt hash"""
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def hash_passwords_parallel(passwords, rounds=None, workers=None):
+    """
+    Hash many passwords across a process pool
+
+    Args:
+        passwords: List of plain-text passwords
+        rounds: bcrypt cost factor (defaults to Config.BCRYPT_ROUNDS)
+        workers: Number of processes (defaults to Config.PASSWORD_HASH_WORKERS)
+
+    Returns:
+        list: Hashes in the same order as passwords
+    """
+    workers = workers or Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    rounds = rounds or Config.BCRYPT_ROUNDS
+
+    if workers <= 1 or len(passwords) < 2:
+        return [hash_password(password, rounds) for password in passwords]
+
+    workers = min(workers, len(passwords))
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords, [rounds] * len(passwords), chunksize=chunksize))
+
+
+def get_hash_rounds(password_hash):
+    """Read the cost factor from a bcrypt hash ($2b$<rounds>$...)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def verify_and_rehash(password, password_hash, rounds):
+    """
+    Verify a password and, if it matches but was hashed at a different
+    cost factor, return a new hash at `rounds`
+
+    Returns:
+        tuple: (matches, new_hash or None)
+    """
+    if not verify_password(password, password_hash):
+        return False, None
+    if get_hash_rounds(password_hash) != rounds:
+        return True, hash_password(password, rounds)
+    return True, None
+
+
+class VerifierBusyError(Exception):
+    """Raised when too many password checks are already queued, or one timed out"""
+
+
+class PasswordVerifierPool:
+    """
+    Runs bcrypt login checks in a small process pool so CPU-heavy
+    verification doesn't starve request workers. Admission is bounded:
+    once `max_pending` checks are queued or running, new ones are rejected
+    immediately with VerifierBusyError instead of waiting. A slot is only
+    freed when its check finishes in the pool, so a check the caller gave
+    up on (timeout, also reported as VerifierBusyError) still counts.
+
+    The pool is created on the first login, from a threaded request worker
+    that already runs MongoDB and SDK threads, so its processes are started
+    by a fork server (spawned where that's unavailable) instead of forking
+    the request worker.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=None):
+        self.workers = Config.LOGIN_VERIFY_WORKERS if workers is None else workers
+        self.max_pending = max_pending or Config.LOGIN_VERIFY_MAX_PENDING
+        self.timeout = timeout or Config.LOGIN_VERIFY_TIMEOUT
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self):
+        # Created lazily so the pool belongs to the serving process
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._mp_context())
+            return self._executor
+
+    @staticmethod
+    def _mp_context():
+        methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def verify(self, password, password_hash, rounds=None):
+        """
+        Verify a password, rehashing at the configured cost factor if needed
+
+        Returns:
+            tuple: (matches, new_hash or None)
+
+        Raises:
+            VerifierBusyError: If the pending queue is full or the check timed out
+        """
+        rounds = rounds or Config.BCRYPT_ROUNDS
+
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise VerifierBusyError("Too many login attempts in progress")
+
+        if self.workers <= 0:
+            try:
+                return verify_and_rehash(password, password_hash, rounds)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._get_executor().submit(verify_and_rehash, password, password_hash, rounds)
+        except BaseException as e:
+            self._slots.release()
+            if isinstance(e, BrokenProcessPool):
+                self._reset_executor()
+            raise
+        # Released when the job finishes, not when this caller stops waiting
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.timed_out += 1
+            raise VerifierBusyError("Password check timed out")
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+
+    def stats(self):
+        """Return verifier pool statistics"""
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
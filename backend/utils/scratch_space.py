@@ -0,0 +1,202 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from backend.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ScratchQuotaExceeded(Exception):
+    """Raised when the scratch directory is over its size quota"""
+
+
+class ScratchSpace:
+    """
+    Managed temp-file area for audio processing.
+
+    Request code asks for paths with temp_path(), which removes the file
+    when the block exits, even on errors. Files that must outlive a call
+    (e.g. TTS output handed to another component) come from new_path() and
+    should be released with discard(); anything left behind is removed by
+    a background janitor once it is older than `max_age`, and the oldest
+    files go first whenever the directory grows past `max_bytes`.
+
+    Every worker process runs its own janitor over the same directory and
+    only knows which of its own files are in use, so size eviction never
+    removes files younger than `evict_grace`: those may belong to a request
+    in another worker. New paths are refused with ScratchQuotaExceeded while
+    the directory is over quota. Usage is measured by sweeps (and lowered by
+    this process's discards), so the quota is approximate: files written
+    since the last sweep aren't counted yet.
+    """
+
+    def __init__(self, root=None, max_bytes=None, max_age=None, janitor_interval=None, evict_grace=None):
+        self.root = root or Config.AUDIO_UPLOAD_FOLDER
+        self.max_bytes = max_bytes or Config.SCRATCH_MAX_BYTES
+        self.max_age = max_age or Config.SCRATCH_MAX_AGE
+        self.janitor_interval = janitor_interval or Config.SCRATCH_JANITOR_INTERVAL
+        self.evict_grace = Config.SCRATCH_EVICT_GRACE if evict_grace is None else evict_grace
+
+        # Paths handed out and not yet released by this process; its janitor never touches them
+        self._active = set()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._janitor = None
+
+        self.files = 0
+        self.bytes = 0
+        self.removed_by_age = 0
+        self.removed_by_size = 0
+        self.quota_rejections = 0
+        self.last_sweep_seconds = 0.0
+        self.last_sweep_at = None
+
+    def _start_janitor(self):
+        # Started on first use so each gunicorn worker runs its own thread after fork
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        with self._lock:
+            if self._janitor is not None and self._janitor.is_alive():
+                return
+            os.makedirs(self.root, exist_ok=True)
+            self._janitor = threading.Thread(target=self._run_janitor, name='scratch-janitor', daemon=True)
+            self._janitor.start()
+
+    def _run_janitor(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Scratch janitor sweep failed: {e}")
+            time.sleep(self.janitor_interval)
+
+    def _reserve(self, suffix, prefix):
+        self._start_janitor()
+        if self.bytes > self.max_bytes:
+            self.sweep()
+            if self.bytes > self.max_bytes:
+                self.quota_rejections += 1
+                raise ScratchQuotaExceeded(
+                    f"Scratch space {self.root} is over quota ({self.bytes} > {self.max_bytes} bytes)"
+                )
+
+        path = os.path.join(self.root, f'{prefix}{uuid.uuid4().hex}{suffix}')
+        with self._lock:
+            self._active.add(path)
+        return path
+
+    def new_path(self, suffix='', prefix='scratch_'):
+        """
+        Reserve a unique scratch path that outlives the caller
+
+        Release it with discard() when done; otherwise the janitor removes
+        it after max_age.
+        """
+        path = self._reserve(suffix, prefix)
+        with self._lock:
+            # Only scoped paths stay protected from the janitor
+            self._active.discard(path)
+        return path
+
+    @contextmanager
+    def temp_path(self, suffix='', prefix='scratch_'):
+        """
+        Reserve a unique scratch path, removed when the block exits
+
+        Yields:
+            str: Path inside the scratch directory (the file is not created)
+        """
+        path = self._reserve(suffix, prefix)
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._active.discard(path)
+            self.discard(path)
+
+    def discard(self, path):
+        """Remove a scratch file if it exists"""
+        try:
+            size = os.stat(path).st_size
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Failed to remove scratch file {path}: {e}")
+            return
+        with self._lock:
+            # Freed space counts before the next sweep re-measures the directory
+            self.bytes = max(0, self.bytes - size)
+
+    def sweep(self):
+        """Remove expired files, then the oldest files while over max_bytes"""
+        with self._sweep_lock:
+            started = time.monotonic()
+            now = time.time()
+            with self._lock:
+                active = set(self._active)
+
+            entries = []
+            with os.scandir(self.root) as scan:
+                for entry in scan:
+                    try:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_bytes = 0
+            kept = []
+            for mtime, size, path in entries:
+                if path not in active and now - mtime > self.max_age:
+                    self.discard(path)
+                    self.removed_by_age += 1
+                    continue
+                kept.append((mtime, size, path))
+                total_bytes += size
+
+            if total_bytes > self.max_bytes:
+                kept.sort()
+                remaining = []
+                for mtime, size, path in kept:
+                    evictable = path not in active and now - mtime > self.evict_grace
+                    if total_bytes > self.max_bytes and evictable:
+                        self.discard(path)
+                        self.removed_by_size += 1
+                        total_bytes -= size
+                    else:
+                        remaining.append((mtime, size, path))
+                kept = remaining
+
+            self.files = len(kept)
+            self.bytes = total_bytes
+            self.last_sweep_seconds = round(time.monotonic() - started, 4)
+            self.last_sweep_at = now
+
+    def stats(self):
+        """Return disk usage and janitor statistics"""
+        with self._lock:
+            active = len(self._active)
+        return {
+            'root': self.root,
+            'files': self.files,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'max_age': self.max_age,
+            'evict_grace': self.evict_grace,
+            'active': active,
+            'removed_by_age': self.removed_by_age,
+            'removed_by_size': self.removed_by_size,
+            'quota_rejections': self.quota_rejections,
+            'last_sweep_seconds': self.last_sweep_seconds,
+            'last_sweep_at': self.last_sweep_at
+        }
+
+
+# Global scratch space instance
+scratch_space = ScratchSpace()
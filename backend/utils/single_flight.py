@@ -0,0 +1,86 @@
+import threading
+
+
+class _Call:
+    """One in-flight computation and the callers waiting on it"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it runs wait and receive the same result (or the same
+    exception). Nothing is cached: once the call finishes, the next caller
+    with that key runs the function again. Results are shared between the
+    callers, so they must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Run `function(*args, **kwargs)` unless a call with `key` is already in flight
+
+        Args:
+            key: Hashable identity of the work, e.g. (operation, inputs...)
+
+        Returns:
+            The function's result, possibly produced by another thread's call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Return coalescing statistics"""
+        return {
+            'in_flight': self.in_flight(),
+            'calls': self.calls,
+            'coalesced': self.coalesced
+        }
+
+
+# Global single-flight group shared by the pipelines and the legacy services
+single_flight = SingleFlight()
@@ -0,0 +1,97 @@
+"""
+Benchmark Audio Preprocessing for STT
+Times the conversion of decoded uploads to mono 16 kHz 16-bit PCM with
+pydub's set_channels / set_frame_rate / set_sample_width chain and with
+the NumPy stage (backend/utils/audio_preprocessing.py), on synthetic
+recordings at common device sample rates. The first columns time the
+conversion alone; the last two time the whole step before STT: convert,
+trim silence with the VAD and write the WAV the recognizer reads.
+
+Usage: python executables/benchmark_audio_preprocessing.py [seconds] [iterations]
+"""
+import io
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from backend.utils.audio_preprocessing import prepare_for_recognition, segment_samples, to_pcm16, write_wav
+from backend.utils.audio_vad import detect_speech
+
+FORMATS = [
+    # (sample rate, channels)
+    (48000, 2),
+    (48000, 1),
+    (44100, 2),
+    (16000, 1),
+    (8000, 1)
+]
+
+
+def synthetic_recording(seconds, rate, channels):
+    """Speech-like tone bursts between stretches of background noise"""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 0.003, int(rate * seconds)).astype(np.float32)
+    t = np.arange(int(rate * seconds)) / rate
+    speaking = (t > seconds * 0.2) & (t < seconds * 0.6)
+    samples[speaking] += 0.3 * np.sin(2 * np.pi * 220 * t[speaking]) * np.sin(2 * np.pi * 3 * t[speaking]) ** 2
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    return AudioSegment(pcm.tobytes(), frame_rate=rate, sample_width=2, channels=channels)
+
+
+def pydub_convert(segment):
+    return segment.set_channels(1).set_frame_rate(16000).set_sample_width(2).raw_data
+
+
+def numpy_convert(segment):
+    return to_pcm16(segment_samples(segment)).tobytes()
+
+
+def pydub_pipeline(segment):
+    """pydub conversion, VAD over an array copy, pydub slicing and WAV export"""
+    converted = segment.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+    samples = np.array(converted.get_array_of_samples(), dtype=np.float32) / 32768
+    result = detect_speech(samples, 16000)
+    output = io.BytesIO()
+    converted[result.start // 16:-(-result.end // 16)].export(output, format='wav')
+    return output.getvalue()
+
+
+def numpy_pipeline(segment):
+    speech, _ = prepare_for_recognition(segment)
+    output = io.BytesIO()
+    write_wav(output, speech)
+    return output.getvalue()
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 8.0
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"{seconds:.0f}s recordings, {iterations} iterations\n")
+    print(
+        f"{'format':<14} {'pydub ms':>9} {'numpy ms':>9} {'speedup':>8} "
+        f"{'pydub+vad ms':>13} {'stage ms':>9} {'speedup':>8} {'kept':>5}"
+    )
+    for rate, channels in FORMATS:
+        segment = synthetic_recording(seconds, rate, channels)
+        kept = len(numpy_pipeline(segment)) / len(pydub_convert(segment))
+
+        timings = [
+            timeit.timeit(lambda: function(segment), number=iterations) / iterations * 1e3
+            for function in (pydub_convert, numpy_convert, pydub_pipeline, numpy_pipeline)
+        ]
+        pydub, converted, pydub_total, stage = timings
+        print(
+            f"{f'{rate}Hz x{channels}':<14} {pydub:>9.2f} {converted:>9.2f} {pydub / converted:>7.2f}x "
+            f"{pydub_total:>13.2f} {stage:>9.2f} {pydub_total / stage:>7.2f}x {kept:>5.0%}"
+        )
+
+
+if __name__ == '__main__':
+    main()
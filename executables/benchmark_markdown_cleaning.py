@@ -0,0 +1,68 @@
+"""
+Benchmark Markdown Cleaning for TTS
+Compares the compiled cleaner with the reference regex chain on typical
+LLM responses and on plain text without any markdown, and times the
+streaming cleaners on the same text fed in 8-character chunks.
+
+Usage: python executables/benchmark_markdown_cleaning.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.markdown_utils import (
+    clean_markdown_for_tts, IncrementalMarkdownCleaner, StreamingSentenceCleaner
+)
+from tests.test_markdown_equivalence import clean_markdown_for_tts_reference
+
+SAMPLES = {
+    'markdown': """## मुख्य बिंदु
+
+**समस्या:** टमाटर में पीले पत्ते
+
+**समाधान:**
+1. पहले पानी की जांच करें
+2. खाद की मात्रा देखें
+3. कीटनाशक का प्रयोग करें
+
+- [मंडी भाव](https://example.com) देखें
+> *नियमित* निगरानी रखें
+
+क्या आप और जानकारी चाहते हैं?""",
+    'plain': 'धान की फसल में पानी का स्तर दो से पांच सेंटीमीटर रखें। खाद डालने से पहले खेत की जांच करें। ' * 4,
+    'long': ('**सुझाव:** नियमित निगरानी रखें\n- पहला बिंदु\n- दूसरा बिंदु\n\n' * 40)
+}
+
+
+def stream_clean(text, cleaner_class=IncrementalMarkdownCleaner, chunk_size=8):
+    cleaner = cleaner_class()
+    segments = []
+    for position in range(0, len(text), chunk_size):
+        segments.extend(cleaner.feed(text[position:position + chunk_size]))
+    segments.extend(cleaner.flush())
+    return segments
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"{'sample':<10} {'reference µs':>14} {'compiled µs':>13} {'speedup':>8} {'paragraphs µs':>14} {'sentences µs':>13}")
+    for name, text in SAMPLES.items():
+        assert clean_markdown_for_tts(text) == clean_markdown_for_tts_reference(text)
+
+        reference = timeit.timeit(lambda: clean_markdown_for_tts_reference(text), number=iterations)
+        compiled = timeit.timeit(lambda: clean_markdown_for_tts(text), number=iterations)
+        paragraphs = timeit.timeit(lambda: stream_clean(text), number=iterations)
+        sentences = timeit.timeit(lambda: stream_clean(text, StreamingSentenceCleaner), number=iterations)
+
+        per_call = lambda seconds: seconds / iterations * 1e6
+        print(
+            f"{name:<10} {per_call(reference):>14.1f} {per_call(compiled):>13.1f} "
+            f"{reference / compiled:>7.2f}x {per_call(paragraphs):>14.1f} {per_call(sentences):>13.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Build the Static Prompt Catalog
+Renders every Config.LANGUAGE_PROMPTS and Config.ERROR_PROMPTS entry in
+parallel into content-hashed audio files, encodes the
+Config.PROMPT_CATALOG_VARIANTS profiles of each clip, and writes
+manifest.json, which the server loads at startup
+(backend/services/prompt_catalog.py).
+
+Prompts whose text has not changed since the last build are reused, so
+re-running the build only renders new or edited prompts and encodes
+newly configured variants.
+
+Usage: python executables/build_prompt_catalog.py [--workers N] [--force] [--prune]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gtts import gTTS
+from backend.utils.config import Config
+from backend.utils.audio_encoding import profile_extension, profile_mimetype, transcode_audio
+from backend.services.prompt_catalog import MANIFEST_NAME, manifest_path
+
+ENGINE = 'gtts'
+# gTTS produces MP3
+PRIMARY_PROFILE = 'mp3'
+
+
+def collect_prompts():
+    """All (prompt_type, language, text) entries that belong in the catalog"""
+    for prompts in (Config.LANGUAGE_PROMPTS, Config.ERROR_PROMPTS):
+        for prompt_type, languages in prompts.items():
+            for language, text in languages.items():
+                yield prompt_type, language, text
+
+
+def text_digest(language, text):
+    """Hash of everything that determines a clip's audio"""
+    return hashlib.sha256(f'{ENGINE}:{language}:{text}'.encode('utf-8')).hexdigest()
+
+
+def render_prompt(language, text):
+    """Synthesize one prompt to MP3 bytes"""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=language, slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def write_atomic(path, data):
+    """Write a file so readers never see it half-written"""
+    # Unique per process, so concurrent builds of the same catalog don't collide
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as output:
+        output.write(data)
+    os.replace(temp_path, path)
+
+
+def load_manifest(catalog_dir):
+    try:
+        with open(manifest_path(catalog_dir), 'r', encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def variant_profiles():
+    """Configured variant profiles that exist and differ from the primary clip"""
+    profiles = [name.strip() for name in Config.PROMPT_CATALOG_VARIANTS.split(',') if name.strip()]
+    return [name for name in profiles if name in Config.AUDIO_OUTPUT_PROFILES and name != PRIMARY_PROFILE]
+
+
+def store_clip(catalog_dir, prompt_type, language, audio, profile):
+    """Store encoded audio under its content hash"""
+    audio_sha256 = hashlib.sha256(audio).hexdigest()
+    filename = f'{prompt_type}_{language}.{audio_sha256[:16]}.{profile_extension(profile)}'
+    write_atomic(os.path.join(catalog_dir, filename), audio)
+    return {
+        'file': filename,
+        'sha256': audio_sha256,
+        'profile': profile,
+        'bytes': len(audio),
+        'mimetype': profile_mimetype(profile)
+    }
+
+
+def encode_variants(catalog_dir, prompt_type, language, audio, profiles, existing):
+    """Encode the variant profiles of a clip, reusing variants that are already built"""
+    variants = {}
+    for profile in profiles:
+        previous = existing.get(profile)
+        if previous and os.path.exists(os.path.join(catalog_dir, previous['file'])):
+            variants[profile] = previous
+            continue
+        encoded, produced = transcode_audio(audio, PRIMARY_PROFILE, profile)
+        if produced != profile:
+            print(f"✗ Could not encode {prompt_type} ({language}) as {profile}")
+            continue
+        variants[profile] = store_clip(catalog_dir, prompt_type, language, encoded, profile)
+    return variants
+
+
+def build_entry(catalog_dir, prompt_type, language, text, text_sha256, previous, profiles):
+    """
+    Render a prompt (or reuse the previous clip) and encode its variants
+
+    Returns:
+        tuple: (manifest entry, whether the prompt was rendered)
+    """
+    if previous:
+        with open(os.path.join(catalog_dir, previous['file']), 'rb') as audio_file:
+            audio = audio_file.read()
+        entry = {key: value for key, value in previous.items() if key != 'variants'}
+        entry.setdefault('profile', PRIMARY_PROFILE)
+        existing = previous.get('variants', {})
+    else:
+        audio = render_prompt(language, text)
+        entry = store_clip(catalog_dir, prompt_type, language, audio, PRIMARY_PROFILE)
+        entry['text_sha256'] = text_sha256
+        # Variants of the old audio are stale
+        existing = {}
+
+    variants = encode_variants(catalog_dir, prompt_type, language, audio, profiles, existing)
+    if variants:
+        entry['variants'] = variants
+    return entry, previous is None
+
+
+def prune_catalog(catalog_dir, prompts):
+    """Remove audio files no longer referenced by the manifest"""
+    referenced = {
+        clip['file']
+        for languages in prompts.values()
+        for entry in languages.values()
+        for clip in [entry] + list(entry.get('variants', {}).values())
+    }
+    removed = 0
+    for filename in os.listdir(catalog_dir):
+        if filename == MANIFEST_NAME or filename in referenced:
+            continue
+        os.remove(os.path.join(catalog_dir, filename))
+        removed += 1
+    return removed
+
+
+def build_catalog(catalog_dir=None, workers=None, force=False, prune=False):
+    """
+    Render missing or changed prompts and write the manifest
+
+    Args:
+        catalog_dir: Output directory (default Config.PROMPT_CATALOG_DIR)
+        workers: Parallel renders (default Config.PROMPT_CATALOG_WORKERS)
+        force: Re-render every prompt
+        prune: Delete files from earlier builds that are no longer referenced
+
+    Returns:
+        tuple: (stats dict, list of (prompt_type, language, error) failures)
+    """
+    catalog_dir = catalog_dir or Config.PROMPT_CATALOG_DIR
+    workers = workers or Config.PROMPT_CATALOG_WORKERS
+    os.makedirs(catalog_dir, exist_ok=True)
+
+    previous = load_manifest(catalog_dir).get('prompts', {})
+    profiles = variant_profiles()
+    prompts = {}
+    tasks = []
+
+    for prompt_type, language, text in collect_prompts():
+        text_sha256 = text_digest(language, text)
+        entry = previous.get(prompt_type, {}).get(language)
+        reusable = (
+            not force and entry and entry.get('text_sha256') == text_sha256
+            and os.path.exists(os.path.join(catalog_dir, entry['file']))
+        )
+        tasks.append((prompt_type, language, text, text_sha256, entry if reusable else None))
+
+    rendered = 0
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(build_entry, catalog_dir, *task, profiles): task
+            for task in tasks
+        }
+        for future in as_completed(futures):
+            prompt_type, language = futures[future][:2]
+            try:
+                entry, was_rendered = future.result()
+                prompts.setdefault(prompt_type, {})[language] = entry
+                if was_rendered:
+                    rendered += 1
+                    print(f"✓ Rendered: {prompt_type} ({language})")
+            except Exception as e:
+                failures.append((prompt_type, language, str(e)))
+                print(f"✗ Error rendering {prompt_type} ({language}): {e}")
+                # Keep serving the previous clip rather than dropping the prompt
+                entry = previous.get(prompt_type, {}).get(language)
+                if entry and os.path.exists(os.path.join(catalog_dir, entry['file'])):
+                    prompts.setdefault(prompt_type, {})[language] = entry
+
+    manifest = {
+        'version': 1,
+        'engine': ENGINE,
+        'generated_at': datetime.utcnow().isoformat(),
+        'prompts': prompts
+    }
+    write_atomic(
+        manifest_path(catalog_dir),
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    )
+
+    stats = {
+        'rendered': rendered,
+        'reused': len(tasks) - rendered - len(failures),
+        'variants': sum(len(entry.get('variants', {})) for languages in prompts.values() for entry in languages.values()),
+        'failed': len(failures),
+        'pruned': prune_catalog(catalog_dir, prompts) if prune else 0
+    }
+    return stats, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the static prompt audio catalog')
+    parser.add_argument('--dir', default=Config.PROMPT_CATALOG_DIR, help='Catalog directory')
+    parser.add_argument('--workers', type=int, default=Config.PROMPT_CATALOG_WORKERS, help='Parallel renders')
+    parser.add_argument('--force', action='store_true', help='Re-render every prompt')
+    parser.add_argument('--prune', action='store_true', help='Delete unreferenced files from earlier builds')
+    args = parser.parse_args()
+
+    print(f"Building prompt catalog in {args.dir}\n")
+    stats, failures = build_catalog(args.dir, args.workers, args.force, args.prune)
+
+    print(f"\n{'='*50}")
+    print(
+        f"Summary: {stats['rendered']} rendered, {stats['reused']} unchanged, "
+        f"{stats['variants']} variants, {stats['failed']} failed, {stats['pruned']} pruned"
+    )
+    print(f"{'='*50}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,36 +6,19 @@ This script generates static audio prompts and sets up the environment.
 
 import os
 import sys
-from gtts import gTTS
 from backend.utils.config import Config
+from executables.build_prompt_catalog import build_catalog
 
 def create_static_audio_files():
-    """Generate all static audio files for different languages"""
+    """Render all static prompts into the prompt catalog"""
     
     print("Generating static audio files...")
     
-    # Create static audio directory
-    static_audio_dir = os.path.join('static', 'audio')
-    os.makedirs(static_audio_dir, exist_ok=True)
-    
-    # Generate audio for each prompt type and language
-    for prompt_type, prompts in Config.LANGUAGE_PROMPTS.items():
-        for language, text in prompts.items():
-            try:
-                filename = f"static_{prompt_type}_{language}.mp3"
-                filepath = os.path.join(static_audio_dir, filename)
-                
-                print(f"Generating: {filename}")
-                
-                # Create TTS
-                tts = gTTS(text=text, lang=language, slow=False)
-                tts.save(filepath)
-                
-                print(f"✓ Created: {filepath}")
-                
-            except Exception as e:
-                print(f"✗ Error creating {filename}: {e}")
+    stats, failures = build_catalog()
+    for prompt_type, language, error in failures:
+        print(f"✗ Error creating {prompt_type} ({language}): {error}")
     
+    print(f"✓ Prompt catalog: {stats['rendered']} rendered, {stats['reused']} unchanged, {stats['failed']} failed")
     print("Static audio files generation completed!")
 
 def setup_directories():
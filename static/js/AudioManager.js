@@ -203,7 +203,13 @@ class AudioManager {
             // Add current language to form data
             const currentLanguage = this.app.stateManager.userInfo.language || 'hindi';
             formData.append('language', currentLanguage);
-            
+
+            // Lets the server reuse this session's background noise profile
+            const sessionId = this.app.stateManager.userInfo.session_id;
+            if (sessionId) {
+                formData.append('session_id', sessionId);
+            }
+
             // Send audio for processing
             const response = await fetch('/api/voice/process_audio', {
                 method: 'POST',
@@ -291,7 +297,9 @@ class AudioManager {
                 },
                 body: JSON.stringify({
                     text: text,
-                    language: language
+                    language: language,
+                    // Speaks with the device's pipeline and picks up speech prefetched for it
+                    device_id: this.app.stateManager.userInfo.device_id
                 })
             });
             
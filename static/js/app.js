@@ -709,7 +709,9 @@ class VoiceBotApp {
                 },
                 body: JSON.stringify({
                     text: text,
-                    language: language
+                    language: language,
+                    // Speaks with the device's pipeline and picks up speech prefetched for it
+                    device_id: window.deviceAuth ? window.deviceAuth.getDeviceInfo().deviceId : null
                 })
             });
             
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test output audio profile negotiation
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.config import Config
+from backend.utils.audio_encoding import negotiate_audio_profile, profile_mimetype, transcode_audio
+
+
+def test_default_without_accept():
+    """Without an Accept header the device profile, then the default, is used"""
+    assert negotiate_audio_profile(None) == Config.AUDIO_OUTPUT_PROFILE
+    assert negotiate_audio_profile(None, 'mp3_low') == 'mp3_low'
+    assert negotiate_audio_profile(None, 'unknown') == Config.AUDIO_OUTPUT_PROFILE
+
+
+def test_accept_header_selects_format():
+    """The client's preferred container is honoured"""
+    assert negotiate_audio_profile('audio/webm') == 'webm'
+    assert negotiate_audio_profile('audio/ogg;q=0.9, audio/wav;q=0.1') == 'opus'
+    assert profile_mimetype(negotiate_audio_profile('audio/ogg')) == 'audio/ogg'
+
+
+def test_device_profile_when_accepted():
+    """A device profile is used if the client accepts its format"""
+    assert negotiate_audio_profile('*/*', 'mp3_low') == 'mp3_low'
+    assert negotiate_audio_profile('audio/*', 'webm') == 'webm'
+    assert negotiate_audio_profile('audio/ogg', 'mp3_low') == 'opus'
+
+
+def test_transcode_same_profile_is_passthrough():
+    """Audio already in the target profile is returned untouched"""
+    assert transcode_audio(b'audio', 'mp3', 'mp3') == (b'audio', 'mp3')
+
+
+if __name__ == '__main__':
+    test_default_without_accept()
+    test_accept_header_selects_format()
+    test_device_profile_when_accepted()
+    test_transcode_same_profile_is_passthrough()
+    print("✅ All audio encoding tests passed")
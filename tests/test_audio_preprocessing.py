@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test NumPy audio preprocessing before speech recognition
+"""
+import sys
+import os
+import io
+import wave
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from backend.utils.audio_preprocessing import (
+    pcm_view, to_mono_float, resample, normalize, pre_emphasis,
+    write_wav, segment_samples, prepare_for_recognition
+)
+
+
+def tone(seconds, rate, level=0.5, frequency=1000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (level * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def noise(seconds, rate, level, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(rate * seconds)).astype(np.float32)
+
+
+def to_segment(samples, rate, channels=1):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    return AudioSegment(pcm.tobytes(), frame_rate=rate, sample_width=2, channels=channels)
+
+
+def test_pcm_view():
+    """PCM bytes are viewed in place; 24-bit audio is widened"""
+    data = bytearray(np.array([1, -2, 3, -4], dtype='<i2').tobytes())
+    view = pcm_view(data, 2, channels=2)
+    assert view.shape == (2, 2) and view.tolist() == [[1, -2], [3, -4]]
+    data[0] = 9
+    assert view[0, 0] == 9
+
+    packed = b''.join(value.to_bytes(3, 'little', signed=True) for value in (1 << 20, -(1 << 20)))
+    assert (pcm_view(packed, 3)[:, 0] >> 8).tolist() == [1 << 20, -(1 << 20)]
+
+
+def test_to_mono_float():
+    """Channels are averaged and scaled to [-1, 1]"""
+    pcm = np.array([[16384, 0], [-32768, -32768]], dtype='<i2')
+    assert np.allclose(to_mono_float(pcm), [0.25, -1.0])
+    assert np.allclose(to_mono_float(pcm[:, :1]), [0.5, -1.0])
+
+
+def test_resample_preserves_tones():
+    """Common device rates resample to 16 kHz without distortion or delay"""
+    for rate in (8000, 22050, 44100, 48000):
+        resampled = resample(tone(1.0, rate), rate)
+        assert len(resampled) == 16000
+        expected = tone(1.0, 16000)
+        assert np.max(np.abs(resampled[200:-200] - expected[200:-200])) < 0.005, rate
+
+    samples = tone(0.1, 16000)
+    assert resample(samples, 16000) is samples
+
+
+def test_resample_removes_aliases():
+    """Content above the new Nyquist frequency is filtered, not folded down"""
+    resampled = resample(tone(1.0, 48000, frequency=12000), 48000)
+    assert np.sqrt(np.mean(np.square(resampled[200:-200]))) < 0.005
+
+
+def test_normalize():
+    """Peak and RMS targets, capped gain, and silence left alone"""
+    quiet = tone(0.5, 16000, level=0.1)
+    assert abs(np.max(np.abs(normalize(quiet, 'peak'))) - 10 ** (-1 / 20)) < 1e-3
+    rms = np.sqrt(np.mean(np.square(normalize(quiet, 'rms'))))
+    assert abs(rms - 10 ** (-20 / 20)) < 1e-3
+    assert np.max(np.abs(normalize(quiet, 'peak', max_gain_db=6))) < 0.21
+    assert normalize(quiet, 'none') is quiet
+
+    silence = np.zeros(100, dtype=np.float32)
+    assert not normalize(silence, 'peak').any()
+
+
+def test_pre_emphasis():
+    """y[n] = x[n] - a * x[n-1]"""
+    samples = np.array([1.0, 1.0, 0.5], dtype=np.float32)
+    assert np.allclose(pre_emphasis(samples, 0.5), [1.0, 0.5, 0.0])
+
+
+def test_prepare_for_recognition():
+    """A stereo 44.1 kHz upload becomes trimmed mono 16 kHz speech"""
+    rate = 44100
+    samples = np.concatenate((noise(0.5, rate, 0.002), tone(1.0, rate, 0.3, 300), noise(2.0, rate, 0.002, seed=1)))
+    speech, result = prepare_for_recognition(to_segment(samples, rate, channels=2))
+
+    assert result.has_speech
+    assert 1.2 * 16000 <= len(speech) <= 1.5 * 16000
+    assert abs(np.max(np.abs(speech)) - 10 ** (-1 / 20)) < 0.01
+
+    buffer = io.BytesIO()
+    write_wav(buffer, speech)
+    buffer.seek(0)
+    with wave.open(buffer, 'rb') as wav_file:
+        assert (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()) == (1, 2, 16000)
+        assert wav_file.getnframes() == len(speech)
+
+    speech, result = prepare_for_recognition(to_segment(noise(2.0, rate, 0.002), rate))
+    assert speech is None and not result.has_speech
+
+
+def test_matches_pydub_conversion():
+    """Same length and level as pydub's set_channels/set_frame_rate chain"""
+    segment = to_segment(tone(1.0, 48000, 0.4, 440), 48000, channels=2)
+    reference = segment.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+    expected = np.frombuffer(reference.raw_data, dtype='<i2') / 32768.0
+
+    converted = segment_samples(segment)
+    assert abs(len(converted) - len(expected)) <= 1
+    length = min(len(converted), len(expected))
+    assert np.max(np.abs(converted[200:length - 200] - expected[200:length - 200])) < 0.01
+
+
+if __name__ == '__main__':
+    test_pcm_view()
+    test_to_mono_float()
+    test_resample_preserves_tones()
+    test_resample_removes_aliases()
+    test_normalize()
+    test_pre_emphasis()
+    test_prepare_for_recognition()
+    test_matches_pydub_conversion()
+    print("✅ All audio preprocessing tests passed")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test the write-behind conversation buffer with an in-memory collection
+"""
+import sys
+import os
+import threading
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError
+from backend.models.conversation_writer import ConversationWriteBuffer
+
+
+class FakeCollection:
+    """Minimal stand-in for a pymongo collection"""
+
+    def __init__(self, fail_times=0, partial_first=False):
+        self.docs = {}
+        self.batches = []
+        self.fail_times = fail_times
+        self.partial_first = partial_first
+        self.lock = threading.Lock()
+
+    def insert_many(self, documents, ordered=True):
+        with self.lock:
+            assert ordered is False
+            if self.partial_first:
+                # Write half, then lose the connection
+                self.partial_first = False
+                for doc in documents[:len(documents) // 2]:
+                    self.docs[doc['_id']] = doc
+                raise AutoReconnect('connection reset')
+            if self.fail_times:
+                self.fail_times -= 1
+                raise AutoReconnect('connection reset')
+
+            self.batches.append(len(documents))
+            errors = []
+            for index, doc in enumerate(documents):
+                if doc['_id'] in self.docs:
+                    errors.append({'index': index, 'code': 11000, 'errmsg': 'duplicate key'})
+                else:
+                    self.docs[doc['_id']] = doc
+            if errors:
+                raise BulkWriteError({'writeErrors': errors})
+
+
+def make_doc(i):
+    return {'_id': ObjectId(), 'user_input': f'question {i}', 'bot_response': f'answer {i}'}
+
+
+def test_batches_and_flush():
+    """Queued documents are written in batches and flush waits for them"""
+    collection = FakeCollection()
+    writer = ConversationWriteBuffer(collection, batch_size=10, flush_interval=0.05)
+    for i in range(25):
+        assert writer.submit(make_doc(i))
+
+    assert writer.flush(timeout=5)
+    assert len(collection.docs) == 25
+    assert max(collection.batches) <= 10
+    assert writer.stats()['written'] == 25
+    writer.close()
+
+
+def test_retry_is_idempotent():
+    """A batch that partially succeeded is retried without duplicates"""
+    collection = FakeCollection(partial_first=True)
+    writer = ConversationWriteBuffer(collection, batch_size=10, flush_interval=0.05, retry_backoff=0.01)
+    for i in range(6):
+        writer.submit(make_doc(i))
+
+    assert writer.flush(timeout=5)
+    stats = writer.stats()
+    assert len(collection.docs) == 6
+    assert stats['failed'] == 0
+    assert stats['retries'] >= 1
+    writer.close()
+
+
+def test_full_buffer_rejects():
+    """submit() reports a full buffer so the caller can write synchronously"""
+    writer = ConversationWriteBuffer(FakeCollection(), max_pending=1, flush_interval=5)
+    writer._ensure_worker = lambda: None  # keep the worker from draining
+    assert writer.submit(make_doc(1))
+    assert not writer.submit(make_doc(2))
+    assert writer.stats()['rejected'] == 1
+
+    # close() starts the worker if needed and writes what was accepted
+    del writer._ensure_worker
+    writer.close(timeout=5)
+    assert writer.stats()['written'] == 1
+
+
+def test_close_writes_remaining():
+    """Closing the writer flushes what is still buffered"""
+    collection = FakeCollection()
+    writer = ConversationWriteBuffer(collection, batch_size=5, flush_interval=0.05)
+    for i in range(12):
+        writer.submit(make_doc(i))
+    writer.close(timeout=5)
+
+    assert len(collection.docs) == 12
+    assert not writer.submit(make_doc(13))
+
+
+if __name__ == '__main__':
+    test_batches_and_flush()
+    test_retry_is_idempotent()
+    test_full_buffer_rejects()
+    test_close_writes_remaining()
+    print("✅ All conversation writer tests passed")
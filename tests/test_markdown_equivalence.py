@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Test that the compiled markdown cleaner matches the reference implementation
+"""
+import sys
+import os
+import random
+import re
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.markdown_utils import (
+    clean_markdown_for_tts, IncrementalMarkdownCleaner, StreamingSentenceCleaner
+)
+
+
+def clean_markdown_for_tts_reference(text):
+    """
+    Original regex-chain implementation of clean_markdown_for_tts, used as
+    the oracle here and by executables/benchmark_markdown_cleaning.py
+    """
+    if not text:
+        return ""
+
+    cleaned = text
+
+    cleaned = re.sub(r'!\[.+?\]\(.+?\)', '', cleaned)
+    cleaned = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', cleaned)
+
+    cleaned = re.sub(r'^#{1,6}\s+', '', cleaned, flags=re.MULTILINE)
+    cleaned = re.sub(r'^\s*[-*_]{3,}\s*$', '', cleaned, flags=re.MULTILINE)
+    cleaned = re.sub(r'^\s*>\s+', '', cleaned, flags=re.MULTILINE)
+
+    cleaned = re.sub(r'(^|[\s,;])[-*+]\s+', r'\1', cleaned, flags=re.MULTILINE)
+    cleaned = re.sub(r'(^|[\s,;])\d+\.\s+', r'\1', cleaned, flags=re.MULTILINE)
+
+    cleaned = re.sub(r'\*\*\*(.+?)\*\*\*', r'\1', cleaned)
+    cleaned = re.sub(r'\*\*(.+?)\*\*', r'\1', cleaned)
+    cleaned = re.sub(r'__(.+?)__', r'\1', cleaned)
+    cleaned = re.sub(r'\*(.+?)\*', r'\1', cleaned)
+    cleaned = re.sub(r'_(.+?)_', r'\1', cleaned)
+    cleaned = re.sub(r'~~(.+?)~~', r'\1', cleaned)
+
+    cleaned = re.sub(r'```[\s\S]*?```', '', cleaned)
+    cleaned = re.sub(r'`(.+?)`', r'\1', cleaned)
+
+    cleaned = re.sub(r'<[^>]+>', '', cleaned)
+
+    cleaned = re.sub(r'[ \t]+', ' ', cleaned)
+    cleaned = re.sub(r'\n\s*\n+', '. ', cleaned)
+    cleaned = re.sub(r'\n', ', ', cleaned)
+
+    cleaned = re.sub(r',\s*,', ',', cleaned)
+    cleaned = re.sub(r'\.\s*,', '.', cleaned)
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+
+    cleaned = cleaned.strip()
+
+    if cleaned and cleaned[-1] not in ('.', '!', '?', '।'):
+        if cleaned.endswith(','):
+            cleaned = cleaned[:-1] + '.'
+        else:
+            cleaned = cleaned + '.'
+
+    return cleaned
+
+
+# Markdown fragments the random documents are built from
+FRAGMENTS = [
+    '*', '**', '***', '_', '__', '~~', '`', '```', '#', '## ', '- ', '+ ', '* ', '1. ', '12.', '3.5',
+    '.', ',', ';', '>', '> ', '<b>', '</b>', '<', '[', ']', '(', ')', '](', '![', '---', '___',
+    '\n', '\n\n', '\n \n', ' ', '\t', 'a', 'word', 'धान', 'टमाटर', '।', '?', '!'
+]
+
+SAMPLE = """## मुख्य बिंदु
+
+**समस्या:** टमाटर में पीले पत्ते
+1. पहले पानी की जांच करें
+2. खाद की मात्रा देखें
+
+```
+code that is not read aloud
+
+still code
+```
+
+- [link](https://example.com) and ![image](a.png)
+> quote with `inline code`
+
+क्या आप और जानकारी चाहते हैं?"""
+
+
+def random_markdown(rng, max_fragments=40):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, max_fragments)))
+
+
+def random_chunks(rng, text):
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 8)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+def stream(chunks, cleaner_class=IncrementalMarkdownCleaner):
+    cleaner = cleaner_class()
+    segments = []
+    for chunk in chunks:
+        segments.extend(cleaner.feed(chunk))
+    segments.extend(cleaner.flush())
+    return segments
+
+
+def test_matches_reference_on_random_markdown():
+    """Same output as the reference for random markdown documents"""
+    rng = random.Random(20240601)
+    for _ in range(20000):
+        text = random_markdown(rng)
+        assert clean_markdown_for_tts(text) == clean_markdown_for_tts_reference(text), repr(text)
+
+
+def test_matches_reference_on_sample():
+    """Same output as the reference for a typical LLM response"""
+    assert clean_markdown_for_tts(SAMPLE) == clean_markdown_for_tts_reference(SAMPLE)
+    assert clean_markdown_for_tts('') == ''
+    assert clean_markdown_for_tts(None) == ''
+
+
+def test_incremental_splits_on_paragraphs():
+    """Paragraphs are released as soon as the blank line after them arrives"""
+    cleaner = IncrementalMarkdownCleaner()
+    assert cleaner.feed('**First** paragraph\n') == []
+    assert cleaner.feed('\nSecond') == ['First paragraph.']
+    assert cleaner.flush() == ['Second.']
+
+
+def test_incremental_keeps_code_blocks_together():
+    """Blank lines inside a code block don't split it"""
+    segments = stream(random_chunks(random.Random(7), SAMPLE))
+    assert not any('read aloud' in segment or 'still' in segment for segment in segments)
+    assert segments[0] == 'मुख्य बिंदु.'
+    assert segments[-1] == 'क्या आप और जानकारी चाहते हैं?'
+
+
+def test_incremental_is_independent_of_chunking():
+    """Any chunking yields the segments of feeding the whole text at once"""
+    rng = random.Random(99)
+    for _ in range(3000):
+        text = random_markdown(rng)
+        assert stream(random_chunks(rng, text)) == stream([text]), repr(text)
+    assert stream(random_chunks(rng, SAMPLE)) == stream([SAMPLE])
+
+
+def test_sentences_released_when_closed():
+    """A sentence is released once the whitespace after its terminator arrives"""
+    cleaner = StreamingSentenceCleaner()
+    assert cleaner.feed('पहले पानी की जांच करें।') == []
+    assert cleaner.feed(' फिर खाद') == ['पहले पानी की जांच करें।']
+    assert cleaner.feed(' डालें? Yes') == ['फिर खाद डालें?']
+    assert cleaner.flush() == ['Yes.']
+
+
+def test_sentences_keep_markdown_together():
+    """Terminators inside emphasis, links, code or list markers don't split"""
+    text = (
+        '**Note. Read this** first. See [the guide. Part 2](https://example.com/a.b?c=d) now. '
+        'Use `a. b` here.\n1. Water the field\n2. Check it. Price is 3.5 rupees! '
+        '```\ncode. more code\n\nstill code\n``` Done'
+    )
+    expected = [
+        'Note. Read this first.',
+        'See the guide. Part 2 now.',
+        'Use a. b here.',
+        'Water the field, Check it.',
+        'Price is 3.5 rupees!',
+        'Done.'
+    ]
+    assert stream([text], StreamingSentenceCleaner) == expected
+    for seed in range(20):
+        assert stream(random_chunks(random.Random(seed), text), StreamingSentenceCleaner) == expected
+
+
+def test_sentences_split_on_paragraphs_and_reset_emphasis():
+    """Blank lines end a sentence and unclosed emphasis ends with the line"""
+    segments = stream(['**Title\nBody text', '\n\nNext *para'], StreamingSentenceCleaner)
+    assert segments == ['**Title, Body text.', 'Next *para.']
+
+
+def test_sentences_independent_of_chunking():
+    """Any chunking yields the sentences of feeding the whole text at once"""
+    rng = random.Random(4242)
+    for _ in range(3000):
+        text = random_markdown(rng)
+        expected = stream([text], StreamingSentenceCleaner)
+        assert stream(random_chunks(rng, text), StreamingSentenceCleaner) == expected, repr(text)
+    sample_sentences = stream([SAMPLE], StreamingSentenceCleaner)
+    assert stream(random_chunks(rng, SAMPLE), StreamingSentenceCleaner) == sample_sentences
+    assert not any('read aloud' in sentence for sentence in sample_sentences)
+
+
+if __name__ == '__main__':
+    test_matches_reference_on_random_markdown()
+    test_matches_reference_on_sample()
+    test_incremental_splits_on_paragraphs()
+    test_incremental_keeps_code_blocks_together()
+    test_incremental_is_independent_of_chunking()
+    test_sentences_released_when_closed()
+    test_sentences_keep_markdown_together()
+    test_sentences_split_on_paragraphs_and_reset_emphasis()
+    test_sentences_independent_of_chunking()
+    print("✅ All markdown equivalence tests passed")
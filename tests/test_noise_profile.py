@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test per-session noise profiles for the VAD
+"""
+import sys
+import os
+import time
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from backend.utils import audio_preprocessing
+from backend.utils.audio_vad import SpeechGate, dbfs_to_amplitude, detect_speech
+from backend.utils import noise_profile as noise_module
+from backend.utils.noise_profile import NoiseProfileStore
+
+RATE = 16000
+
+
+def noise(seconds, level, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(RATE * seconds)).astype(np.float32)
+
+
+def tone(seconds, level, frequency=220):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (level * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def to_segment(samples):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    return AudioSegment(pcm.tobytes(), frame_rate=RATE, sample_width=2, channels=1)
+
+
+def test_profile_key():
+    """Sessions take precedence over devices; anonymous requests get no profile"""
+    assert NoiseProfileStore.profile_key('abc', 1201) == ('session', 'abc')
+    assert NoiseProfileStore.profile_key(None, 1201) == ('device', '1201')
+    assert NoiseProfileStore.profile_key('', None) is None
+
+
+def test_calibrate():
+    """A calibration clip sets (and replaces) the session's level"""
+    store = NoiseProfileStore(enabled=True, max_profiles=10, idle_ttl=60, min_silence_ms=300, persist=False)
+    key = ('session', 'a')
+
+    assert abs(store.calibrate(key, noise(1.0, 0.01), RATE)[0] - 0.01) < 0.001
+    assert abs(store.calibrate(key, noise(1.0, 0.002), RATE)[0] - 0.002) < 0.0005
+    assert abs(store.get(key) - 0.002) < 0.0005
+    assert store.calibrate(key, np.zeros(10, dtype=np.float32), RATE) == (None, 'Calibration clip too short')
+    assert store.calibrate(None, noise(1.0, 0.01), RATE)[0] is None
+
+    disabled = NoiseProfileStore(enabled=False, max_profiles=10, idle_ttl=60, min_silence_ms=300, persist=False)
+    assert disabled.calibrate(key, noise(1.0, 0.01), RATE)[0] is None and disabled.get(key) is None
+
+
+def test_calibrate_rejects_speech():
+    """A calibration clip with someone talking in it leaves the profile alone"""
+    store = NoiseProfileStore(enabled=True, max_profiles=10, idle_ttl=60, min_silence_ms=300, persist=False)
+    key = ('session', 'c')
+    store.calibrate(key, noise(1.0, 0.002), RATE)
+
+    talking = np.concatenate((noise(0.5, 0.002), tone(1.0, 0.3), noise(0.5, 0.002, seed=1)))
+    assert store.calibrate(key, talking, RATE) == (None, 'Calibration clip contains speech')
+    assert abs(store.get(key) - 0.002) < 0.0005
+    assert store.stats()['rejected'] == 1
+
+
+def test_level_capped():
+    """A floor measured in a loud room is capped, so a stream's gate still opens on speech"""
+    store = NoiseProfileStore(enabled=True, max_profiles=10, idle_ttl=60, min_silence_ms=300, max_dbfs=-30, persist=False)
+    cap = dbfs_to_amplitude(-30)
+
+    assert store.calibrate(('session', 'd'), noise(1.0, 0.2), RATE) == (cap, None)
+    store.observe_level(('session', 'e'), 0.3)
+    assert store.get(('session', 'e')) == cap
+    assert store.stats()['capped'] == 2
+
+    gate = SpeechGate(RATE, noise_floor=store.get(('session', 'd')))
+    assert len(gate.feed(tone(0.5, 0.3))) > 0
+
+
+def test_observe_leading_silence():
+    """The first recording with enough leading silence sets the level once"""
+    store = NoiseProfileStore(enabled=True, max_profiles=10, idle_ttl=60, min_silence_ms=300, persist=False)
+    key = ('device', '1201')
+
+    short = np.concatenate((noise(0.3, 0.004), tone(1.0, 0.3)))
+    store.observe(key, short, RATE, detect_speech(short, RATE))
+    assert store.get(key) is None
+
+    samples = np.concatenate((noise(1.0, 0.004), tone(1.0, 0.3), noise(1.0, 0.004, seed=1)))
+    store.observe(key, samples, RATE, detect_speech(samples, RATE))
+    assert abs(store.get(key) - 0.004) < 0.001
+
+    louder = np.concatenate((noise(1.0, 0.02), tone(1.0, 0.3)))
+    store.observe(key, louder, RATE, detect_speech(louder, RATE))
+    assert abs(store.get(key) - 0.004) < 0.001
+    assert store.stats()['observed'] == 1
+
+
+class FakeNoiseProfiles:
+    """Stand-in for the noise profile methods of db_manager"""
+
+    def __init__(self):
+        self.levels = {}
+        self.reads = 0
+
+    def get_noise_profile(self, kind, key):
+        self.reads += 1
+        return self.levels.get((kind, key))
+
+    def save_noise_profile(self, kind, key, level_dbfs, replace=True):
+        if replace or (kind, key) not in self.levels:
+            self.levels[(kind, key)] = level_dbfs
+        return True
+
+
+def test_profiles_shared_across_workers():
+    """A calibration on one worker is used by another, through the database"""
+    database = FakeNoiseProfiles()
+    original = noise_module.db_manager
+    noise_module.db_manager = database
+    try:
+        worker_a, worker_b = [
+            NoiseProfileStore(enabled=True, max_profiles=10, min_silence_ms=300, persist=True, cache_ttl=0.3)
+            for _ in range(2)
+        ]
+        key = ('session', 'shared')
+        assert worker_b.get(key) is None
+        assert worker_b.get(key) is None and database.reads == 1
+
+        level, _ = worker_a.calibrate(key, noise(1.0, 0.004), RATE)
+        assert -50 < database.levels[key] < -46
+        time.sleep(0.4)
+        assert abs(worker_b.get(key) - level) < 1e-6
+
+        # Leading silence doesn't replace a stored profile on any worker
+        worker_b.observe_level(key, 0.02)
+        NoiseProfileStore(enabled=True, max_profiles=10, persist=True).observe_level(key, 0.02)
+        assert abs(worker_a.get(key) - level) < 1e-6
+        assert abs(dbfs_to_amplitude(database.levels[key]) - level) < 1e-6
+    finally:
+        noise_module.db_manager = original
+
+
+def test_profile_keeps_first_words():
+    """With the session's profile, a quiet word at the very start isn't trimmed"""
+    store = NoiseProfileStore(enabled=True, max_profiles=10, idle_ttl=60, min_silence_ms=300, persist=False)
+    original = audio_preprocessing.noise_profiles
+    audio_preprocessing.noise_profiles = store
+    try:
+        key = ('session', 'b')
+        clip = to_segment(np.concatenate((tone(0.5, 0.02), tone(1.0, 0.3), noise(0.1, 0.002))))
+
+        without_profile, _ = audio_preprocessing.prepare_for_recognition(clip, key)
+        store.calibrate(key, noise(1.0, 0.002), RATE)
+        with_profile, result = audio_preprocessing.prepare_for_recognition(clip, key)
+
+        assert result.start == 0
+        assert len(with_profile) >= len(without_profile) + RATE * 0.3
+
+        # A profile measured in a louder room doesn't swallow the speech
+        store.calibrate(key, noise(1.0, 0.2), RATE)
+        speech, _ = audio_preprocessing.prepare_for_recognition(clip, key)
+        assert speech is not None
+    finally:
+        audio_preprocessing.noise_profiles = original
+
+
+if __name__ == '__main__':
+    test_profile_key()
+    test_calibrate()
+    test_calibrate_rejects_speech()
+    test_level_capped()
+    test_profiles_shared_across_workers()
+    test_observe_leading_silence()
+    test_profile_keeps_first_words()
+    print("✅ All noise profile tests passed")
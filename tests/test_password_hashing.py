@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test bcrypt helpers used for device provisioning and login
+"""
+import sys
+import os
+import threading
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.password_hashing import (
+    hash_password, verify_password, hash_passwords_parallel,
+    PasswordVerifierPool, VerifierBusyError
+)
+
+
+def test_hash_and_verify():
+    """A hash verifies only against its own password"""
+    password_hash = hash_password('kiosk-password', rounds=4)
+    assert password_hash.startswith('$2b$04$')
+    assert verify_password('kiosk-password', password_hash)
+    assert not verify_password('wrong-password', password_hash)
+
+
+def test_parallel_hashes_keep_order():
+    """Hashes from the process pool line up with their passwords"""
+    passwords = [f'kiosk-password-{i}' for i in range(6)]
+    hashes = hash_passwords_parallel(passwords, rounds=4, workers=3)
+
+    assert len(hashes) == len(passwords)
+    for password, password_hash in zip(passwords, hashes):
+        assert verify_password(password, password_hash)
+
+
+def test_verifier_rehashes_on_cost_change():
+    """A correct password hashed at an old cost factor gets a new hash"""
+    verifier = PasswordVerifierPool(workers=0, max_pending=2)
+    old_hash = hash_password('kiosk-password', rounds=4)
+
+    valid, new_hash = verifier.verify('kiosk-password', old_hash, rounds=5)
+    assert valid
+    assert new_hash.startswith('$2b$05$')
+
+    assert verifier.verify('kiosk-password', new_hash, rounds=5) == (True, None)
+    assert verifier.verify('wrong-password', old_hash, rounds=5) == (False, None)
+
+
+def test_verifier_sheds_when_full():
+    """Checks beyond max_pending are rejected instead of queued"""
+    verifier = PasswordVerifierPool(workers=0, max_pending=1)
+    verifier._slots.acquire()
+    try:
+        verifier.verify('kiosk-password', hash_password('kiosk-password', rounds=4), rounds=4)
+        assert False, "expected VerifierBusyError"
+    except VerifierBusyError:
+        pass
+    finally:
+        verifier._slots.release()
+    assert verifier.stats()['rejected'] == 1
+
+
+def test_verifier_from_request_thread():
+    """The pool can be started and used from a non-main (request) thread"""
+    verifier = PasswordVerifierPool(workers=1, max_pending=2, timeout=30)
+    password_hash = hash_password('kiosk-password', rounds=4)
+    results = []
+    try:
+        thread = threading.Thread(target=lambda: results.append(verifier.verify('kiosk-password', password_hash, rounds=4)))
+        thread.start()
+        thread.join()
+        assert results == [(True, None)]
+        assert verifier._executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+    finally:
+        verifier._reset_executor()
+
+
+def test_verifier_timeout_keeps_slot():
+    """A timed-out check is reported as busy and holds its slot until it finishes"""
+    slow_hash = hash_password('kiosk-password', rounds=13)
+    verifier = PasswordVerifierPool(workers=1, max_pending=1, timeout=0.01)
+    try:
+        try:
+            verifier.verify('kiosk-password', slow_hash, rounds=13)
+            assert False, "expected VerifierBusyError"
+        except VerifierBusyError:
+            pass
+
+        # The slow check is still running in the pool, so the bound holds
+        try:
+            verifier.verify('kiosk-password', slow_hash, rounds=13)
+            assert False, "expected VerifierBusyError"
+        except VerifierBusyError:
+            pass
+        assert verifier.stats()['timed_out'] == 1 and verifier.stats()['rejected'] == 1
+
+        deadline = time.monotonic() + 10
+        while not verifier._slots.acquire(blocking=False):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        verifier._slots.release()
+    finally:
+        verifier._reset_executor()
+
+
+if __name__ == '__main__':
+    test_hash_and_verify()
+    test_parallel_hashes_keep_order()
+    test_verifier_rehashes_on_cost_change()
+    test_verifier_sheds_when_full()
+    test_verifier_from_request_thread()
+    test_verifier_timeout_keeps_slot()
+    print("✅ All password hashing tests passed")
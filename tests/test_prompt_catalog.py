@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the static prompt catalog build and manifest lookup
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.config import Config
+from backend.services.prompt_catalog import PromptCatalog
+from executables import build_prompt_catalog
+
+
+def fake_render(language, text):
+    """Deterministic stand-in for gTTS so the build runs offline"""
+    fake_render.calls += 1
+    return f'{language}:{text}'.encode('utf-8')
+
+
+def fake_transcode(audio, source_profile, target_profile):
+    """Stand-in for the ffmpeg encoder: 'encodes' to a shorter payload"""
+    return audio[:len(audio) // 2] + target_profile.encode('utf-8'), target_profile
+
+
+def build(catalog_dir, variants='', **kwargs):
+    originals = (build_prompt_catalog.render_prompt, build_prompt_catalog.transcode_audio, Config.PROMPT_CATALOG_VARIANTS)
+    build_prompt_catalog.render_prompt = fake_render
+    build_prompt_catalog.transcode_audio = fake_transcode
+    Config.PROMPT_CATALOG_VARIANTS = variants
+    try:
+        return build_prompt_catalog.build_catalog(catalog_dir, workers=4, **kwargs)
+    finally:
+        build_prompt_catalog.render_prompt, build_prompt_catalog.transcode_audio, Config.PROMPT_CATALOG_VARIANTS = originals
+
+
+def test_build_renders_every_prompt_once():
+    """Every prompt is rendered on the first build and reused afterwards"""
+    total = sum(len(languages) for prompts in (Config.LANGUAGE_PROMPTS, Config.ERROR_PROMPTS)
+                for languages in prompts.values())
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        fake_render.calls = 0
+        stats, failures = build(catalog_dir)
+        assert failures == []
+        assert stats['rendered'] == total and fake_render.calls == total
+
+        stats, _ = build(catalog_dir)
+        assert stats == {'rendered': 0, 'reused': total, 'variants': 0, 'failed': 0, 'pruned': 0}
+        assert fake_render.calls == total
+
+
+def test_catalog_lookup():
+    """Lookups accept language names and codes and return the hashed file"""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        build(catalog_dir)
+        catalog = PromptCatalog(catalog_dir, in_memory=True)
+        assert catalog.get('name_phone', 'hindi') == catalog.get('name_phone', 'hi')
+
+        clip = catalog.get('extraction_error', 'Hindi')
+        assert clip['mimetype'] == 'audio/mpeg'
+        assert clip['sha256'][:16] in clip['file']
+        assert not clip['has_variants']
+        with open(clip['path'], 'rb') as audio_file:
+            assert audio_file.read() == clip['audio']
+        assert clip['audio'] == fake_render('hi', Config.ERROR_PROMPTS['extraction_error']['hi'])
+        assert catalog.stats()['memory_bytes'] > 0
+
+        on_disk = PromptCatalog(catalog_dir, in_memory=False).get('extraction_error', 'hi')
+        assert on_disk['audio'] is None and on_disk['path'] == clip['path']
+
+        assert catalog.get('name_phone', 'klingon') is None
+        assert catalog.get('unknown_prompt', 'hi') is None
+
+
+def test_variants_chosen_per_client():
+    """Pre-encoded variants are picked by Accept or explicit profile, MP3 otherwise"""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        stats, _ = build(catalog_dir, variants='opus,mp3_low')
+        assert stats['variants'] == 2 * stats['rendered']
+
+        catalog = PromptCatalog(catalog_dir)
+        assert catalog.get('name_phone', 'hi')['profile'] == 'mp3'
+        assert catalog.get('name_phone', 'hi', '*/*')['profile'] == 'mp3'
+        assert catalog.get('name_phone', 'hi', 'audio/*')['profile'] == 'mp3'
+        assert catalog.get('name_phone', 'hi', 'audio/mpeg')['profile'] == 'mp3'
+
+        opus = catalog.get('name_phone', 'hi', 'audio/ogg, audio/mpeg')
+        assert opus['profile'] == 'opus' and opus['mimetype'] == 'audio/ogg' and opus['has_variants']
+        assert opus['audio'].endswith(b'opus')
+        assert catalog.get('name_phone', 'hi', 'audio/ogg;q=0.5, audio/mpeg')['profile'] == 'mp3'
+
+        assert catalog.get('name_phone', 'hi', profile='mp3_low')['profile'] == 'mp3_low'
+        assert catalog.get('name_phone', 'hi', profile='unknown')['profile'] == 'mp3'
+
+        # Variants are reused on rebuild, and only new ones are encoded
+        stats, _ = build(catalog_dir, variants='opus,mp3_low')
+        assert stats['rendered'] == 0 and stats['variants'] == 2 * stats['reused']
+
+
+def test_prune_removes_stale_files():
+    """Files from earlier builds are only deleted on request"""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        build(catalog_dir)
+        stale = os.path.join(catalog_dir, 'name_phone_hi.0000000000000000.mp3')
+        open(stale, 'wb').close()
+        build(catalog_dir)
+        assert os.path.exists(stale)
+        stats, _ = build(catalog_dir, prune=True)
+        assert stats['pruned'] == 1 and not os.path.exists(stale)
+
+
+def test_missing_manifest():
+    """Without a manifest nothing is found and nothing is synthesized"""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        catalog = PromptCatalog(catalog_dir)
+        assert catalog.get('name_phone', 'hi') is None
+        assert catalog.stats()['clips'] == 0
+        assert ('name_phone', 'hi') in catalog.missing()
+
+
+def test_missing_prompts_after_build():
+    """A build fills in every prompt the catalog was missing"""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        catalog = PromptCatalog(catalog_dir)
+        total = len(catalog.missing())
+        assert total > 0
+
+        build(catalog_dir)
+        catalog.load()
+        assert catalog.missing() == []
+        assert catalog.stats()['clips'] == total
+
+
+if __name__ == '__main__':
+    test_build_renders_every_prompt_once()
+    test_catalog_lookup()
+    test_variants_chosen_per_client()
+    test_prune_removes_stale_files()
+    test_missing_manifest()
+    test_missing_prompts_after_build()
+    print("✅ All prompt catalog tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the projected MongoDB record classes
+"""
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from backend.models.records import DeviceRecord, UserRecord, ConversationTurn
+
+
+def test_projection_excludes_credentials():
+    """Device projections never select the password hash or tokens"""
+    projection = DeviceRecord.projection()
+    for field in ('password_hash', 'access_token', 'refresh_token'):
+        assert field not in projection
+    assert projection['_id'] == 0
+    assert projection['device_id'] == 1
+
+
+def test_id_maps_to_mongo_id():
+    """The `id` attribute is read from and projected as `_id`"""
+    user_id = ObjectId()
+    projection = UserRecord.projection()
+    assert projection['_id'] == 1
+
+    user = UserRecord.from_document({'_id': user_id, 'phone': '9876543210', 'language': 'hindi'})
+    assert user.id == user_id
+    assert user.phone == '9876543210'
+    assert user.name is None
+
+
+def test_records_use_slots():
+    """Records carry no per-instance __dict__"""
+    turn = ConversationTurn.from_document({
+        'user_input': 'नमस्ते',
+        'bot_response': 'आपका स्वागत है!',
+        'timestamp': datetime(2026, 1, 1)
+    })
+    assert not hasattr(turn, '__dict__')
+    assert turn.to_dict()['user_input'] == 'नमस्ते'
+    assert ConversationTurn.from_document(None) is None
+
+
+if __name__ == '__main__':
+    test_projection_excludes_credentials()
+    test_id_maps_to_mongo_id()
+    test_records_use_slots()
+    print("✅ All record tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test the managed scratch space used for temporary audio files
+"""
+import sys
+import os
+import time
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.scratch_space import ScratchSpace, ScratchQuotaExceeded
+
+
+def write_file(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+
+
+def test_temp_path_removed_on_error():
+    """Scoped paths are removed even when the block raises"""
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchSpace(root=root, max_bytes=10000, max_age=60, janitor_interval=60)
+        try:
+            with scratch.temp_path('.wav') as path:
+                write_file(path, 10)
+                raise ValueError("conversion failed")
+        except ValueError:
+            pass
+        assert not os.path.exists(path)
+
+
+def test_sweep_removes_old_and_oldest_files():
+    """Expired files go first, then the oldest until under max_bytes"""
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchSpace(root=root, max_bytes=250, max_age=60, janitor_interval=60, evict_grace=5)
+        now = time.time()
+
+        expired = os.path.join(root, 'expired.wav')
+        write_file(expired, 10)
+        os.utime(expired, (now - 120, now - 120))
+
+        for i, age in enumerate((30, 20, 10)):
+            path = os.path.join(root, f'file{i}.wav')
+            write_file(path, 100)
+            os.utime(path, (now - age, now - age))
+
+        scratch.sweep()
+        assert sorted(os.listdir(root)) == ['file1.wav', 'file2.wav']
+        stats = scratch.stats()
+        assert stats['removed_by_age'] == 1 and stats['removed_by_size'] == 1
+        assert stats['bytes'] == 200
+
+
+def test_quota_rejects_new_paths():
+    """New paths are refused while in-use files keep the directory over quota"""
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchSpace(root=root, max_bytes=50, max_age=60, janitor_interval=60)
+        with scratch.temp_path('.wav') as path:
+            write_file(path, 100)
+            scratch.sweep()
+            try:
+                with scratch.temp_path('.wav'):
+                    pass
+                assert False, "expected ScratchQuotaExceeded"
+            except ScratchQuotaExceeded:
+                pass
+        assert scratch.stats()['quota_rejections'] == 1
+
+
+def test_size_eviction_spares_recent_files():
+    """Files younger than the grace period may be in use by another worker"""
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchSpace(root=root, max_bytes=150, max_age=600, janitor_interval=60, evict_grace=60)
+        now = time.time()
+        for name, age in (('old.wav', 300), ('other_worker.wav', 10), ('newer.wav', 1)):
+            path = os.path.join(root, name)
+            write_file(path, 100)
+            os.utime(path, (now - age, now - age))
+
+        scratch.sweep()
+        assert sorted(os.listdir(root)) == ['newer.wav', 'other_worker.wav']
+        assert scratch.stats()['bytes'] == 200
+
+
+def test_discard_frees_quota():
+    """Space released by discard counts before the next sweep"""
+    with tempfile.TemporaryDirectory() as root:
+        scratch = ScratchSpace(root=root, max_bytes=150, max_age=600, janitor_interval=60)
+        path = scratch.new_path('.wav')
+        write_file(path, 200)
+        scratch.sweep()
+        assert scratch.stats()['bytes'] == 200
+
+        scratch.discard(path)
+        assert scratch.stats()['bytes'] == 0
+        with scratch.temp_path('.wav'):
+            pass
+
+
+if __name__ == '__main__':
+    test_temp_path_removed_on_error()
+    test_sweep_removes_old_and_oldest_files()
+    test_quota_rejects_new_paths()
+    test_size_eviction_spares_recent_files()
+    test_discard_frees_quota()
+    print("✅ All scratch space tests passed")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the in-process LRU cache and session context store
+"""
+import sys
+import os
+import threading
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.cache import LRUCache
+from backend.models.session_context import SessionContextStore
+from backend.models.records import ConversationTurn
+
+
+def make_turn(i):
+    return ConversationTurn(user_input=f'question {i}', bot_response=f'answer {i}')
+
+
+def test_lru_eviction_and_stats():
+    """Least recently used entries are evicted first"""
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 3
+
+
+def test_lru_ttl_expiry():
+    """Entries expire after the TTL"""
+    cache = LRUCache(maxsize=10, ttl=0.05)
+    cache.set('a', 1)
+    time.sleep(0.1)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_lru_weight_bound():
+    """Total weight stays under max_weight"""
+    cache = LRUCache(maxsize=100, max_weight=10, weigher=len)
+    cache.set('a', 'xxxx')
+    cache.set('b', 'xxxx')
+    cache.set('c', 'xxxx')
+    assert 'a' not in cache
+    assert cache.stats()['weight'] <= 10
+
+
+def test_session_context_seed_and_append():
+    """Seeded sessions are served from memory and updated on write"""
+    store = SessionContextStore(enabled=True, max_turns=3, idle_ttl=60, max_sessions=10, max_bytes=10000)
+
+    assert store.get_history('u1', 's1', 3) is None
+
+    store.seed('u1', 's1', [make_turn(1)], complete=True)
+    store.append('u1', 's1', make_turn(2))
+    history = store.get_history('u1', 's1', 10)
+    assert [t.user_input for t in history] == ['question 2', 'question 1']
+
+    # Once more than max_turns are written only the tail is known
+    store.append('u1', 's1', make_turn(3))
+    store.append('u1', 's1', make_turn(4))
+    assert [t.user_input for t in store.get_history('u1', 's1', 3)] == ['question 4', 'question 3', 'question 2']
+    assert store.get_history('u1', 's1', 4) is None
+
+
+def test_session_context_append_without_seed():
+    """Writes to sessions that are not cached do not create partial entries"""
+    store = SessionContextStore(enabled=True, max_turns=3, idle_ttl=60, max_sessions=10, max_bytes=10000)
+    store.append('u1', 's1', make_turn(1))
+    assert store.get_history('u1', 's1', 1) is None
+
+
+def test_session_context_is_current():
+    """A session whose newest stored turn isn't cached is dropped"""
+    store = SessionContextStore(enabled=True, max_turns=3, idle_ttl=60, max_sessions=10, max_bytes=10000)
+    first, second = make_turn(1), make_turn(2)
+    first.id, second.id = 'id1', 'id2'
+    store.seed('u1', 's1', [first], complete=True)
+
+    assert store.is_current('u1', 's1', 'id1')
+    assert store.is_current('u1', 's1', None)
+    store.append('u1', 's1', second)
+    assert store.is_current('u1', 's1', 'id1')
+
+    # Another worker wrote a turn this one never saw
+    assert not store.is_current('u1', 's1', 'id3')
+    assert store.get_history('u1', 's1', 1) is None
+    assert store.stats()['stale'] == 1
+
+
+def test_session_context_concurrent_append():
+    """Reads during appends from other threads neither fail nor lose turns"""
+    store = SessionContextStore(enabled=True, max_turns=500, idle_ttl=60, max_sessions=10, max_bytes=1000000)
+    store.seed('u1', 's1', [], complete=True)
+    errors = []
+
+    def writer(offset):
+        for i in range(200):
+            store.append('u1', 's1', make_turn(offset + i))
+
+    def reader():
+        try:
+            for _ in range(2000):
+                assert len(store.get_history('u1', 's1', 10)) <= 10
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(2)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(store.get_history('u1', 's1', 500)) == 400
+
+
+if __name__ == '__main__':
+    test_lru_eviction_and_stats()
+    test_lru_ttl_expiry()
+    test_lru_weight_bound()
+    test_session_context_seed_and_append()
+    test_session_context_append_without_seed()
+    test_session_context_is_current()
+    test_session_context_concurrent_append()
+    print("✅ All session context tests passed")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test request coalescing with SingleFlight
+"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.single_flight import SingleFlight, single_flight
+from backend.services.pipelines.base_pipeline import BasePipeline
+from backend.services.speech_service import SpeechService
+
+
+def run_concurrently(flight, key, function, callers=8):
+    """Start `callers` identical calls once the first one is running"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+        return function()
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        leader = executor.submit(flight.do, key, work)
+        started.wait(5)
+        followers = [executor.submit(flight.do, key, work) for _ in range(callers - 1)]
+        # Let every follower register before the leader finishes
+        while flight.coalesced < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        return [leader] + followers
+
+
+def test_identical_calls_share_one_computation():
+    """Concurrent callers with the same key get the leader's result"""
+    flight = SingleFlight()
+    runs = []
+
+    def detect():
+        runs.append(1)
+        return 'hindi'
+
+    futures = run_concurrently(flight, ('detect_language', 'मेरा नाम'), detect)
+    assert [future.result() for future in futures] == ['hindi'] * 8
+    assert len(runs) == 1
+    assert flight.stats() == {'in_flight': 0, 'calls': 1, 'coalesced': 7}
+
+
+def test_errors_are_shared():
+    """Waiting callers see the leader's exception"""
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError('LLM unavailable')
+
+    futures = run_concurrently(flight, 'key', fail, callers=3)
+    for future in futures:
+        try:
+            future.result()
+            assert False, 'expected the shared error'
+        except RuntimeError as e:
+            assert str(e) == 'LLM unavailable'
+
+
+def test_nothing_is_cached():
+    """Sequential calls and different keys run separately"""
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('a', lambda: 2) == 2
+    assert flight.do('b', lambda: 3) == 3
+    assert flight.stats()['calls'] == 3 and flight.stats()['coalesced'] == 0
+
+
+class GatedCalls:
+    """Counts calls and holds each one until released"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.release.wait(5)
+        return self.result
+
+
+class StubPipeline(BasePipeline):
+    def __init__(self, llm_service, synthesize):
+        super().__init__(llm_service)
+        self.text_to_speech_bytes = synthesize
+
+    def speech_to_text(self, audio_data, language, noise_key=None):
+        return None
+
+    def text_to_speech(self, text, language, output_path=None):
+        return None
+
+    def text_to_speech_bytes(self, text, language, audio_profile=None):
+        return None, None
+
+
+def coalesce(calls, gated, callers):
+    """Run the calls concurrently and release them once all but one are waiting"""
+    coalesced = single_flight.coalesced
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        while single_flight.coalesced < coalesced + callers - 1:
+            time.sleep(0.001)
+        gated.release.set()
+        return [future.result() for future in futures]
+
+
+def test_pipelines_coalesce_llm_calls():
+    """Pipelines on the same LLM service share identical detect_language calls"""
+    detect = GatedCalls('hindi')
+    llm_service = type('StubLLM', (), {'detect_language': staticmethod(detect)})()
+    pipelines = [StubPipeline(llm_service, None), StubPipeline(llm_service, None)]
+
+    calls = [lambda pipeline=pipeline: pipeline.detect_language('मेरा नाम') for pipeline in pipelines * 2]
+    assert coalesce(calls, detect, 4) == ['hindi'] * 4
+    assert detect.calls == 1
+
+
+def test_pipeline_and_legacy_tts_coalesce():
+    """Pipeline synthesis and legacy gTTS each share identical in-flight requests"""
+    synthesize = GatedCalls((b'ID3', 'mp3'))
+    pipeline = StubPipeline(None, synthesize)
+    calls = [lambda: pipeline.synthesize('नमस्ते', 'hi-IN', 'mp3')] * 3
+    assert coalesce(calls, synthesize, 3) == [(b'ID3', 'mp3')] * 3
+    assert synthesize.calls == 1
+
+    service = SpeechService.__new__(SpeechService)
+    gtts = GatedCalls(b'ID3')
+    original = SpeechService._gtts_bytes
+    SpeechService._gtts_bytes = staticmethod(gtts)
+    try:
+        calls = [lambda: service.text_to_speech_bytes('**नमस्ते**', 'hi')] * 3
+        assert coalesce(calls, gtts, 3) == [b'ID3'] * 3
+        assert gtts.calls == 1
+    finally:
+        SpeechService._gtts_bytes = original
+
+
+if __name__ == '__main__':
+    test_identical_calls_share_one_computation()
+    test_errors_are_shared()
+    test_nothing_is_cached()
+    test_pipelines_coalesce_llm_calls()
+    test_pipeline_and_legacy_tts_coalesce()
+    print("✅ All single-flight tests passed")
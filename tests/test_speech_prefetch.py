@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test speculative speech prefetching
+"""
+import sys
+import os
+import threading
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.speech_prefetch import SpeechPrefetcher
+
+PIPELINE = 'api/azure_openai'
+
+
+class FakeSynthesizer:
+    """Records calls and can hold them until released"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = fail
+
+    def __call__(self, device_id, text, language, audio_profile):
+        self.calls.append(text)
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('engine down')
+        return f'{language}:{text}'.encode('utf-8'), audio_profile
+
+
+def test_attach_reuses_prefetched_speech():
+    """The follow-up request gets the prefetched audio without synthesizing again"""
+    synthesize = FakeSynthesizer()
+    prefetcher = SpeechPrefetcher(synthesize, workers=1, max_pending=4, cache_size=8, ttl=60, wait_timeout=5)
+
+    assert prefetcher.schedule(PIPELINE, 1, 'नमस्ते', 'hi-IN', 'mp3')
+    assert not prefetcher.schedule(PIPELINE, 1, 'नमस्ते', 'hi-IN', 'mp3')
+    assert prefetcher.attach(PIPELINE, 'नमस्ते', 'hi-IN') == ('hi-IN:नमस्ते'.encode('utf-8'), 'mp3')
+    assert prefetcher.attach(PIPELINE, 'नमस्ते', 'hi-IN') == ('hi-IN:नमस्ते'.encode('utf-8'), 'mp3')
+    assert synthesize.calls == ['नमस्ते']
+
+    assert prefetcher.attach(PIPELINE, 'नमस्ते', 'bn-BD') == (None, None)
+    # Another pipeline (another voice) never gets this device's speech
+    assert prefetcher.attach('library/gemini', 'नमस्ते', 'hi-IN') == (None, None)
+    assert prefetcher.stats()['attached'] == 2
+
+
+def test_attach_waits_for_running_job():
+    """A request arriving mid-synthesis waits for the job instead of starting another"""
+    synthesize = FakeSynthesizer()
+    synthesize.release.clear()
+    prefetcher = SpeechPrefetcher(synthesize, workers=1, max_pending=4, cache_size=8, ttl=60, wait_timeout=5)
+
+    prefetcher.schedule(PIPELINE, 1, 'first', 'hi-IN', 'mp3')
+    threading.Timer(0.1, synthesize.release.set).start()
+    assert prefetcher.attach(PIPELINE, 'first', 'hi-IN')[0] == b'hi-IN:first'
+    assert synthesize.calls == ['first']
+
+
+def test_queued_job_is_cancelled():
+    """A job that hasn't started is cancelled so the caller synthesizes inline"""
+    synthesize = FakeSynthesizer()
+    synthesize.release.clear()
+    prefetcher = SpeechPrefetcher(synthesize, workers=1, max_pending=4, cache_size=8, ttl=60, wait_timeout=5)
+
+    prefetcher.schedule(PIPELINE, 1, 'running', 'hi-IN', 'mp3')
+    prefetcher.schedule(PIPELINE, 1, 'queued', 'hi-IN', 'mp3')
+    assert prefetcher.attach(PIPELINE, 'queued', 'hi-IN') == (None, None)
+    synthesize.release.set()
+    assert prefetcher.attach(PIPELINE, 'running', 'hi-IN')[0] == b'hi-IN:running'
+    assert prefetcher.stats()['cancelled'] == 1
+    assert 'queued' not in synthesize.calls
+
+
+def test_speculation_is_shed_under_load():
+    """Nothing new is scheduled while max_pending jobs are outstanding"""
+    synthesize = FakeSynthesizer()
+    synthesize.release.clear()
+    prefetcher = SpeechPrefetcher(synthesize, workers=1, max_pending=2, cache_size=8, ttl=60, wait_timeout=5)
+
+    assert prefetcher.schedule(PIPELINE, 1, 'one', 'hi-IN', 'mp3')
+    assert prefetcher.schedule(PIPELINE, 1, 'two', 'hi-IN', 'mp3')
+    assert not prefetcher.schedule(PIPELINE, 1, 'three', 'hi-IN', 'mp3')
+    assert prefetcher.stats()['shed'] == 1
+    synthesize.release.set()
+    prefetcher.attach(PIPELINE, 'two', 'hi-IN')
+    # Done callbacks run just after the result is delivered
+    for _ in range(100):
+        if prefetcher.stats()['pending'] == 0:
+            break
+        time.sleep(0.01)
+    assert prefetcher.stats()['pending'] == 0
+    assert prefetcher.schedule(PIPELINE, 1, 'three', 'hi-IN', 'mp3')
+
+
+def test_failed_job_falls_back():
+    """A failed prefetch makes the caller synthesize itself"""
+    prefetcher = SpeechPrefetcher(FakeSynthesizer(fail=True), workers=1, max_pending=4, cache_size=8, ttl=60, wait_timeout=5)
+
+    prefetcher.schedule(PIPELINE, 1, 'text', 'hi-IN', 'mp3')
+    assert prefetcher.attach(PIPELINE, 'text', 'hi-IN') == (None, None)
+    assert prefetcher.stats()['failed'] == 1 and prefetcher.stats()['jobs'] == 0
+
+
+if __name__ == '__main__':
+    test_attach_reuses_prefetched_speech()
+    test_attach_waits_for_running_job()
+    test_queued_job_is_cancelled()
+    test_speculation_is_shed_under_load()
+    test_failed_job_falls_back()
+    print("✅ All speech prefetch tests passed")
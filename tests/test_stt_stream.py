@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test streaming speech recognition: the speech gate and stream lifecycle
+"""
+import sys
+import os
+import io
+import time
+import wave
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.stt_stream import (
+    BufferedStreamRecognizer, SpeechStreamService, StreamTooLongError, UnknownStreamError
+)
+from backend.utils.audio_vad import SpeechGate
+from backend.utils.cache import LRUCache
+
+RATE = 16000
+
+
+def pcm(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype('<i2')
+
+
+def noise(seconds, level, seed=0):
+    return pcm(np.random.default_rng(seed).normal(0, level, int(RATE * seconds)))
+
+
+def tone(seconds, level, frequency=220):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return pcm(level * np.sin(2 * np.pi * frequency * t))
+
+
+def chunks(samples, size=640):
+    return [samples[i:i + size].tobytes() for i in range(0, len(samples), size)]
+
+
+class FakeRecognizer:
+    """Records what a stream pushes to it"""
+
+    def __init__(self, text='namaste'):
+        self.text = text
+        self.pushed = []
+        self.cancelled = False
+        self.partial_text = ''
+
+    def push(self, data):
+        self.pushed.append(data)
+        self.partial_text = self.text[:len(self.pushed)]
+
+    def finish(self, timeout=None):
+        return self.text
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def test_gate_chunking():
+    """The gate forwards the same audio however the stream is chunked"""
+    audio = np.concatenate((noise(1.0, 0.002), tone(1.0, 0.3), noise(0.5, 0.002, seed=1)))
+    expected = None
+    for size in (1, 137, 320, 4000, len(audio)):
+        gate = SpeechGate(RATE, noise_floor=0.002, scale=1 / 32768)
+        forwarded = np.concatenate([gate.feed(audio[i:i + size]) for i in range(0, len(audio), size)])
+        # Speech starts at 1.0s; 200ms of pre-roll is kept
+        assert len(forwarded) == len(audio) - int(0.8 * RATE)
+        assert np.array_equal(forwarded, audio[-len(forwarded):])
+        assert gate.leading_silence_ms == 1000
+        assert abs(gate.noise_level() - 0.002) < 0.0005
+        expected = forwarded if expected is None else expected
+        assert np.array_equal(forwarded, expected)
+
+    gate = SpeechGate(RATE, padding_ms=0, scale=1 / 32768)
+    assert len(gate.feed(noise(0.5, 0.001))) == 0
+    assert len(gate.feed(tone(0.1, 0.3))) == int(0.1 * RATE)
+
+
+def test_silent_stream_skips_recognition():
+    """A stream that never opens its gate never creates a recognizer"""
+    created = []
+    service = SpeechStreamService(max_streams=4, idle_ttl=60, max_seconds=10, finish_timeout=1)
+    stream_id = service.start(lambda: created.append(FakeRecognizer()) or created[-1], RATE)
+
+    for chunk in chunks(noise(1.0, 0.002)):
+        status, error = service.push(stream_id, chunk)
+        assert error is None and not status['speech']
+
+    assert service.finish(stream_id) == (None, False)
+    assert not created
+    assert service.stats()['empty'] == 1
+
+
+def test_speech_stream_recognized_incrementally():
+    """Speech chunks reach the recognizer while the stream is still open"""
+    recognizer = FakeRecognizer()
+    service = SpeechStreamService(max_streams=4, idle_ttl=60, max_seconds=10, finish_timeout=1)
+    stream_id = service.start(lambda: recognizer, RATE)
+
+    audio = np.concatenate((noise(0.5, 0.002), tone(1.0, 0.3)))
+    for chunk in chunks(audio):
+        status, _ = service.push(stream_id, chunk)
+    assert status['speech'] and status['received_ms'] == 1500 and status['partial']
+    assert len(b''.join(recognizer.pushed)) // 2 == len(audio) - int(0.3 * RATE)
+
+    assert service.push(stream_id, b'\x00')[1] is not None
+    assert service.finish(stream_id) == ('namaste', True)
+    try:
+        service.push(stream_id, chunks(audio)[0])
+        assert False, "finished stream accepted a chunk"
+    except UnknownStreamError:
+        pass
+
+
+def test_stream_limits():
+    """Over-long streams are rejected; idle streams expire and are cancelled"""
+    recognizer = FakeRecognizer()
+    service = SpeechStreamService(max_streams=4, idle_ttl=60, max_seconds=1, finish_timeout=1)
+    stream_id = service.start(lambda: recognizer, RATE)
+    try:
+        for chunk in chunks(tone(2.0, 0.3)):
+            service.push(stream_id, chunk)
+        assert False, "stream longer than max_seconds accepted"
+    except StreamTooLongError:
+        pass
+    assert recognizer.cancelled and service.cancel(stream_id) is False
+
+    recognizer = FakeRecognizer()
+    service = SpeechStreamService(max_streams=4, idle_ttl=0.05, max_seconds=10, finish_timeout=1)
+    stream_id = service.start(lambda: recognizer, RATE)
+    service.push(stream_id, tone(0.2, 0.3).tobytes())
+    time.sleep(0.1)
+    service.start(FakeRecognizer, RATE)
+    assert recognizer.cancelled
+    assert service.stats()['abandoned'] == 1 and service.stats()['open'] == 1
+
+
+def test_buffered_recognizer():
+    """The buffered fallback recognizes the gated audio as one WAV"""
+    received = []
+    recognizer = BufferedStreamRecognizer(8000, lambda wav_bytes: received.append(wav_bytes) or 'ok')
+    recognizer.push(b'\x01\x00' * 800)
+    recognizer.push(b'\x02\x00' * 800)
+    assert recognizer.finish() == 'ok'
+
+    with wave.open(io.BytesIO(received[0])) as wav_file:
+        assert wav_file.getframerate() == 8000 and wav_file.getnframes() == 1600
+
+
+def test_cache_on_evict():
+    """LRUCache reports evicted and expired entries, not removed ones"""
+    evicted = []
+    cache = LRUCache(maxsize=2, ttl=0.05, on_evict=lambda key, value: evicted.append(key))
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)
+    assert evicted == ['a']
+    cache.pop('b')
+    time.sleep(0.1)
+    assert cache.get('c') is None
+    assert evicted == ['a', 'c']
+
+
+if __name__ == '__main__':
+    test_gate_chunking()
+    test_silent_stream_skips_recognition()
+    test_speech_stream_recognized_incrementally()
+    test_stream_limits()
+    test_buffered_recognizer()
+    test_cache_on_evict()
+    print("✅ All streaming STT tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory token generation map used for stateless device auth
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.token_epochs import TokenEpochStore
+
+
+class FakeDevices:
+    """Device generations as the database would return them"""
+
+    def __init__(self, generations):
+        self.generations = dict(generations)
+        self.reads = 0
+
+    def get_token_generation(self, device_id):
+        self.reads += 1
+        return self.generations.get(device_id)
+
+    def get_token_generations_since(self, since):
+        return dict(self.generations)
+
+
+def test_generation_loaded_once():
+    """A device's generation is read from the database only on first use"""
+    devices = FakeDevices({1201: 3})
+    store = TokenEpochStore(devices, sync_interval=60, overlap=0)
+
+    assert store.current(1201) == 3
+    assert store.current(1201) == 3
+    assert devices.reads == 1
+    assert store.current(9999) is None
+
+
+def test_sync_picks_up_revocations():
+    """Generation changes from other workers apply after the sync interval"""
+    devices = FakeDevices({1201: 3})
+    store = TokenEpochStore(devices, sync_interval=0, overlap=0)
+    assert store.current(1201) == 3
+
+    devices.generations[1201] = 4
+    assert store.current(1201) == 4
+    assert store.stats()['syncs'] >= 1
+
+
+def test_invalidate_reloads():
+    """Forgotten devices are reloaded from the database"""
+    devices = FakeDevices({1201: 1})
+    store = TokenEpochStore(devices, sync_interval=60, overlap=0)
+    store.set(1201, 1)
+
+    devices.generations[1201] = 2
+    store.invalidate(1201)
+    assert store.current(1201) == 2
+
+
+if __name__ == '__main__':
+    test_generation_loaded_once()
+    test_sync_picks_up_revocations()
+    test_invalidate_reloads()
+    print("✅ All token epoch tests passed")
@@ -173,9 +173,8 @@ class TestDatabaseManager(unittest.TestCase):
         self.db_manager.users.find_one.assert_called_with({'phone': '+919876543210'})
     
     def test_create_conversation(self):
-        """Test saving conversation"""
-        # Mock database response
-        self.db_manager.conversations.insert_one.return_value = Mock(inserted_id='conv123')
+        """Test saving conversation synchronously"""
+        self.db_manager.conversation_writer = None
         
         result = self.db_manager.create_conversation(
             'user123', 
@@ -184,8 +183,20 @@ class TestDatabaseManager(unittest.TestCase):
             'session123'
         )
         
-        self.assertEqual(result, 'conv123')
+        saved = self.db_manager.conversations.insert_one.call_args[0][0]
+        self.assertEqual(result, saved['_id'])
         self.db_manager.conversations.insert_one.assert_called_once()
+    
+    def test_create_conversation_write_behind(self):
+        """Test that async write mode queues the conversation instead of inserting"""
+        self.db_manager.conversation_writer = Mock()
+        self.db_manager.conversation_writer.submit.return_value = True
+        
+        result = self.db_manager.create_conversation('user123', 'नमस्ते', 'आपका स्वागत है!')
+        
+        queued = self.db_manager.conversation_writer.submit.call_args[0][0]
+        self.assertEqual(result, queued['_id'])
+        self.db_manager.conversations.insert_one.assert_not_called()
 
 
 class TestSpeechService(unittest.TestCase):
@@ -302,6 +313,27 @@ class TestVoiceRoutes(unittest.TestCase):
                 self.assertEqual(data['language'], 'hindi')
 
 
+    def test_text_to_speech_uses_prefetched_speech(self):
+        """Speech prefetched after generate_response is served to the device's TTS request"""
+        from backend.routes.voice_routes import pipeline_service
+        pipeline = Mock()
+        pipeline.text_to_speech_bytes.return_value = (b'ID3 prefetched', 'mp3')
+        
+        with patch.object(pipeline_service, '_get_device_settings', return_value=(pipeline, 'mp3')), \
+             patch.object(Config, 'TTS_PREFETCH_ENABLED', True), \
+             patch.object(Config, 'TTS_IN_MEMORY', True):
+            attached = pipeline_service.speech_prefetcher.stats()['attached']
+            self.assertTrue(pipeline_service.prefetch_speech(1201, 'आपका स्वागत है!', 'hi-IN'))
+            
+            response = self.client.post('/api/voice/text_to_speech',
+                                      json={'text': 'आपका स्वागत है!', 'language': 'hindi', 'device_id': 1201})
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, b'ID3 prefetched')
+            pipeline.text_to_speech_bytes.assert_called_once()
+            self.assertEqual(pipeline_service.speech_prefetcher.stats()['attached'], attached + 1)
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests for the complete workflow"""
     